@@ -1,12 +1,31 @@
 from __future__ import annotations
-from typing import List
-from .core import WORD_BITS, bits_needed_unsigned, ceil_div
-from .header import PackedData, KIND_ALIGNED
+
+from array import array
+from typing import List, MutableSequence, Optional, Sequence
+
+from .core import (
+    WORD_BITS,
+    as_values,
+    batch_order,
+    batch_out,
+    bits_needed_unsigned,
+    buffer_output,
+    ceil_div,
+    check_indices,
+    check_range,
+    mask,
+    new_words,
+    read_lanes,
+)
+from .header import KIND_ALIGNED, PackedData
+
 
 class BitPackingAligned:
+    """cap = word_bits // k valeurs par mot, jamais à cheval (word_bits=64 : k=12 => 5 par mot)."""
+
     def __init__(self, word_bits: int = WORD_BITS):
-        if word_bits != 32:
-            raise ValueError("only 32-bit words supported")
+        if word_bits not in (32, 64):
+            raise ValueError("word_bits must be 32 or 64")
         self.word_bits = word_bits
 
     def _k_from_data(self, arr: List[int]) -> int:
@@ -15,15 +34,33 @@ class BitPackingAligned:
         return min(k, 32)
 
     def compress(self, arr: List[int]) -> PackedData:
+        arr = as_values(arr)
         n = len(arr)
         k = self._k_from_data(arr)
+        wb = self.word_bits
         if k == 0:
-            return PackedData(words=[], n=n, kind=KIND_ALIGNED, k=0, cap=0)
-        cap = self.word_bits // k
+            return PackedData(
+                words=new_words(0, wb), n=n, kind=KIND_ALIGNED, k=0, cap=0, word_bits=wb
+            )
+        cap = wb // k
         if cap <= 0:
             cap = 1  # k==32 => cap=1
-        words_count = ceil_div(n, cap)
-        words = [0] * words_count
+        return PackedData(
+            words=self.pack_words(arr, k, cap, wb),
+            n=n,
+            kind=KIND_ALIGNED,
+            k=k,
+            cap=cap,
+            word_bits=wb,
+        )
+
+    def pack_words(self, arr: Sequence[int], k: int, cap: int, word_bits: int = WORD_BITS) -> array:
+        """Mots alignés de arr (cap valeurs de k bits par mot) ; brique de compress().
+
+        word_bits=64 : mots array('Q') (cap * k <= 64).
+        """
+        words_count = ceil_div(len(arr), cap)
+        words = new_words(words_count, word_bits)
         limit = (1 << k)
         for i, x in enumerate(arr):
             if x < 0 or x >= (1 << 32):
@@ -32,14 +69,8 @@ class BitPackingAligned:
                 raise ValueError(f"value {x} exceeds {k} bits; use overflow variant")
             w = i // cap
             shift = (i % cap) * k
-            words[w] = (words[w] | (x << shift)) & 0xFFFFFFFF
-        return PackedData(
-            words=words,
-            n=n,
-            kind=KIND_ALIGNED,
-            k=k,
-            cap=cap,
-        )
+            words[w] = words[w] | (x << shift)
+        return words
 
     def get(self, i: int, data: PackedData) -> int:
         if i < 0 or i >= data.n:
@@ -47,13 +78,60 @@ class BitPackingAligned:
         k = data.k
         if k == 0:
             return 0
-        cap = data.cap if data.cap else (32 // k or 1)
+        cap = data.cap if data.cap else (data.word_bits // k or 1)
         w = i // cap
         shift = (i % cap) * k
-        return (data.words[w] >> shift) & ((1 << k) - 1 if k < 32 else 0xFFFFFFFF)
+        return (data.words[w] >> shift) & mask(k)
+
+    def get_many(
+        self,
+        indices: Sequence[int],
+        data: PackedData,
+        out: Optional[MutableSequence[int]] = None,
+        sort: bool = False,
+    ) -> MutableSequence[int]:
+        """get(i) pour tout un lot : bornes, cap et masque calculés une fois, mot courant
+        réutilisé."""
+        check_indices(indices, data.n)
+        out = batch_out(out, len(indices))
+        k = data.k
+        if k == 0:
+            for j in range(len(indices)):
+                out[j] = 0
+            return out
+        cap = data.cap if data.cap else (data.word_bits // k or 1)
+        words = data.words
+        m = mask(k)
+        cur_w = -1
+        word = 0
+        for j in batch_order(indices, sort):
+            w, lane = divmod(indices[j], cap)
+            if w != cur_w:
+                cur_w = w
+                word = words[w]
+            out[j] = (word >> (lane * k)) & m
+        return out
+
+    @buffer_output(direct=True)
+    def decompress_range(
+        self, start: int, stop: int, out: MutableSequence[int], data: PackedData
+    ) -> None:
+        """Décode [start, stop) dans out en partant du mot start // cap."""
+        check_range(start, stop, data.n)
+        count = stop - start
+        if len(out) != count:
+            raise ValueError("output buffer length must equal stop - start")
+        k = data.k
+        if k == 0:
+            for j in range(count):
+                out[j] = 0
+            return
+        cap = data.cap if data.cap else (data.word_bits // k or 1)
+        w, lane = divmod(start, cap)
+        read_lanes(data.words, w, lane, k, cap, out, 0, count)
 
+    @buffer_output(direct=True)
     def decompress(self, out: List[int], data: PackedData) -> None:
         if len(out) != data.n:
             raise ValueError("output buffer length must equal n")
-        for i in range(data.n):
-            out[i] = self.get(i, data)
+        self.decompress_range(0, data.n, out, data)
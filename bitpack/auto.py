@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import inspect
+from dataclasses import dataclass
+from typing import Dict, List, MutableSequence, Optional, Sequence
+
+from .blocked import DEFAULT_BLOCK_SIZE, DIR_WORDS_PER_BLOCK, block_layout
+from .core import WORD_BITS, as_values, bits_needed_unsigned, ceil_div
+from .dictionary import code_width
+from .eliasfano import DEFAULT_SAMPLE_RATE, low_width
+from .eliasfano import _layout as _ef_layout
+from .factory import create, for_data
+from .header import HEADER_SIZE, PackedData
+from .overflow import params_from_histogram
+from .timing import total_time_with_compression
+
+OBJECTIVES = ("size", "get", "t_yes")
+CANDIDATES = ("crossing", "aligned", "overflow", "overflow_rank", "blocked", "eliasfano", "dict")
+
+# Coûts indicatifs (ns par valeur) : (compress, decompress, get aléatoire).
+# Ordres de grandeur mesurés avec bench sur CPython 3.11 (moteurs par défaut) ;
+# seuls les rapports entre variantes comptent pour le choix.
+DEFAULT_COST_NS: Dict[str, tuple] = {
+    "crossing": (70.0, 35.0, 600.0),
+    "aligned": (190.0, 100.0, 270.0),
+    "overflow": (780.0, 215.0, 800.0),
+    "overflow_rank": (200.0, 90.0, 600.0),
+    "blocked": (240.0, 40.0, 520.0),
+    "eliasfano": (1330.0, 410.0, 2300.0),
+    "dict": (120.0, 150.0, 850.0),
+}
+
+@dataclass
+class DataProfile:
+    n: int
+    max_value: int
+    hist: List[int]           # hist[b] = nb de valeurs de largeur b bits
+    block_widths: List[tuple]  # (k, nb de valeurs) par bloc de DEFAULT_BLOCK_SIZE
+    monotone: bool = False     # suite croissante au sens large (eliasfano possible)
+    # valeurs distinctes (taille du dictionnaire) ; distinct_capped : comptage arrêté dès que
+    # dictionnaire + codes dépassaient n mots (crossing au pire, 32 bits) : dict écarté
+    distinct: int = 0
+    distinct_capped: bool = False
+
+    @property
+    def kmax(self) -> int:
+        return bits_needed_unsigned(self.max_value)
+
+def _dict_limit(n: int) -> int:
+    """Plus grand nombre de valeurs distinctes d pour lequel dict (d mots + codes de
+    bits(d - 1) <= c bits) peut encore tenir en moins de n mots, crossing le plus large."""
+    limit = 0
+    for c in range(WORD_BITS + 1):
+        limit = max(limit, min(1 << c, n - ceil_div(n * c, WORD_BITS) - 1))
+    return limit
+
+def profile(arr: Sequence[int], block_size: int = DEFAULT_BLOCK_SIZE) -> DataProfile:
+    """Profil en une passe : histogramme des largeurs, max, largeur de chaque bloc, monotonie
+    et cardinalité, comptée seulement tant que dict peut encore gagner."""
+    n = len(arr)
+    hist = [0] * (WORD_BITS + 1)
+    block_widths = []
+    max_value = block_max = prev = fill = 0
+    monotone = True
+    seen: Optional[set] = set()
+    limit = _dict_limit(n)
+    distinct = 0
+    for v in arr:
+        hist[v.bit_length()] += 1
+        if v > block_max:
+            block_max = v
+        if v < prev:
+            monotone = False
+        prev = v
+        if seen is not None:
+            seen.add(v)
+            if len(seen) > limit:
+                distinct, seen = len(seen), None
+        fill += 1
+        if fill == block_size:
+            block_widths.append((block_max.bit_length(), fill))
+            max_value = max(max_value, block_max)
+            block_max = fill = 0
+    if fill:
+        block_widths.append((block_max.bit_length(), fill))
+        max_value = max(max_value, block_max)
+    return DataProfile(
+        n=n,
+        max_value=max_value,
+        hist=hist,
+        block_widths=block_widths,
+        monotone=monotone,
+        distinct=len(seen) if seen is not None else distinct,
+        distinct_capped=seen is None,
+    )
+
+def estimate_payload_bits(prof: DataProfile, kind: str) -> int:
+    """Taille prédite du .bp (en-tête + mots) en bits, sans compresser."""
+    n, k = prof.n, prof.kmax
+    if kind == "crossing":
+        words = ceil_div(n * k, WORD_BITS)
+    elif kind == "aligned":
+        words = ceil_div(n, WORD_BITS // k or 1) if k else 0
+    elif kind == "overflow":
+        words = ceil_div(params_from_histogram(prof.hist)[3], WORD_BITS)
+    elif kind == "overflow_rank":
+        words = ceil_div(params_from_histogram(prof.hist, layout="rank")[3], WORD_BITS)
+    elif kind == "blocked":
+        words = DIR_WORDS_PER_BLOCK * len(prof.block_widths)
+        words += sum(block_layout(bk, count)[1] for bk, count in prof.block_widths)
+    elif kind == "eliasfano":
+        low_bits = low_width(n, prof.max_value)
+        high_bits = n + (prof.max_value >> low_bits) + 1
+        words = _ef_layout(n, low_bits, high_bits, DEFAULT_SAMPLE_RATE)[3]
+    elif kind == "dict":
+        words = prof.distinct + block_layout(code_width(prof.distinct), n)[1]
+    else:
+        raise ValueError(f"unknown kind: {kind}")
+    return 8 * HEADER_SIZE + WORD_BITS * words
+
+def choose_kind(
+    prof: DataProfile,
+    objective: str = "size",
+    latency_ms: float = 30.0,
+    bandwidth_mbps: float = 10.0,
+    cost_ns: Optional[Dict[str, tuple]] = None,
+    candidates: Sequence[str] = CANDIDATES,
+) -> str:
+    """Variante qui minimise l'objectif :
+
+    - "size"  : taille du payload ;
+    - "get"   : coût d'un get(i) aléatoire (taille en cas d'égalité) ;
+    - "t_yes" : t + T_comp + S_comp/B + T_decomp, comme timing.total_time_with_compression.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"unknown objective: {objective}")
+    costs = cost_ns or DEFAULT_COST_NS
+
+    def score(kind: str) -> tuple:
+        bits = estimate_payload_bits(prof, kind)
+        comp_ns, decomp_ns, get_ns = costs[kind]
+        if objective == "size":
+            return (bits, get_ns)
+        if objective == "get":
+            return (get_ns, bits)
+        t_yes = total_time_with_compression(
+            bits, prof.n * comp_ns, prof.n * decomp_ns, bandwidth_mbps, latency_ms
+        )
+        return (t_yes, bits)
+
+    # eliasfano n'accepte que des suites croissantes ; dict est écarté par profile()
+    return min(
+        (
+            c for c in candidates
+            if (c != "eliasfano" or prof.monotone) and (c != "dict" or not prof.distinct_capped)
+        ),
+        key=score,
+    )
+
+class BitPackingAuto:
+    """Choisit la variante (crossing, aligned, overflow, overflow_rank, blocked, eliasfano,
+    dict) d'après un profil des données.
+
+    Le PackedData produit porte le kind retenu dans son en-tête : get/decompress
+    (ici ou via factory.for_data) n'ont pas besoin de connaître le choix. Les autres
+    options (engine, sample_size, block_size...) vont à la variante retenue si elle les accepte.
+    """
+
+    def __init__(
+        self,
+        objective: str = "size",
+        latency_ms: float = 30.0,
+        bandwidth_mbps: float = 10.0,
+        cost_ns: Optional[Dict[str, tuple]] = None,
+        **opts,
+    ):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"unknown objective: {objective}")
+        self.objective = objective
+        self.latency_ms = latency_ms
+        self.bandwidth_mbps = bandwidth_mbps
+        self.cost_ns = cost_ns
+        self.opts = opts
+        self.last_choice: Optional[str] = None
+
+    def choose(self, arr: Sequence[int]) -> str:
+        return choose_kind(
+            profile(arr), self.objective, self.latency_ms, self.bandwidth_mbps, self.cost_ns
+        )
+
+    def kind_opts(self, kind: str) -> dict:
+        """Options transmises au packer `kind` : celles que son constructeur accepte."""
+        params = inspect.signature(type(create(kind)).__init__).parameters
+        if kind == "overflow_rank":
+            params = {name: p for name, p in params.items() if name != "layout"}
+        return {name: v for name, v in self.opts.items() if name in params}
+
+    def compress(self, arr: Sequence[int]) -> PackedData:
+        arr = as_values(arr)
+        if len(arr) and (min(arr) < 0 or max(arr) >= (1 << 32)):
+            raise ValueError("values must be 0 <= x < 2^32")
+        self.last_choice = self.choose(arr)
+        kind = self.last_choice
+        return create(kind, **self.kind_opts(kind)).compress(arr)
+
+    def get(self, i: int, data: PackedData) -> int:
+        return for_data(data).get(i, data)
+
+    def get_many(
+        self,
+        indices: Sequence[int],
+        data: PackedData,
+        out: Optional[MutableSequence[int]] = None,
+        sort: bool = False,
+    ) -> MutableSequence[int]:
+        return for_data(data).get_many(indices, data, out, sort)
+
+    def decompress_range(
+        self, start: int, stop: int, out: MutableSequence[int], data: PackedData
+    ) -> None:
+        for_data(data).decompress_range(start, stop, out, data)
+
+    def decompress(self, out: List[int], data: PackedData) -> None:
+        for_data(data).decompress(out, data)
@@ -1,8 +1,21 @@
 from __future__ import annotations
-from typing import Protocol, List
+
+from typing import List, MutableSequence, Optional, Protocol, Sequence
+
 from .header import PackedData
 
+
 class BitPacking(Protocol):
     def compress(self, arr: List[int]) -> PackedData: ...
     def decompress(self, out: List[int], data: PackedData) -> None: ...
     def get(self, i: int, data: PackedData) -> int: ...
+    def get_many(
+        self,
+        indices: Sequence[int],
+        data: PackedData,
+        out: Optional[MutableSequence[int]] = None,
+        sort: bool = False,
+    ) -> MutableSequence[int]: ...
+    def decompress_range(
+        self, start: int, stop: int, out: MutableSequence[int], data: PackedData
+    ) -> None: ...
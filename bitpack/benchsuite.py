@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import csv
+import json
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from .factory import create
+from .header import PackedData
+from .scenarios import skewed, uniform_u32
+from .timing import time_repeated
+
+# Matrice de bancs : formats × k × n × scénarios, débit (valeurs/s et Mo/s de données
+# brutes u32) par opération. Les résultats (JSON ou CSV) servent aussi de référence :
+# compare() signale les cas dont le débit baisse de plus que le seuil de leur opération.
+OPS = ("compress", "decompress", "get", "to_bytes", "from_bytes")
+DEFAULT_FORMATS = ("crossing", "aligned", "overflow", "blocked", "dict", "eliasfano")
+DEFAULT_KS = tuple(range(1, 33))
+DEFAULT_SIZES = (10_000,)
+DEFAULT_SCENARIOS = ("uniform", "skewed", "sorted")
+DEFAULT_THRESHOLD = 0.10
+# Durée minimale d'un échantillon : les opérations courtes (to_bytes...) tournent en boucle
+MIN_SAMPLE_NS = 1_000_000
+KEY_FIELDS = ("format", "scenario", "k", "n", "op")
+FIELDS = KEY_FIELDS + ("median_ns", "values_per_s", "mb_per_s", "ratio")
+
+def _sorted_u32(n: int, k: int, seed: int) -> List[int]:
+    return sorted(uniform_u32(n, k, seed))
+
+def _skewed(n: int, k: int, seed: int) -> Optional[List[int]]:
+    # majorité sur k bits, 0,1 % de valeurs sur 32 bits (sans objet pour k = 32)
+    return skewed(n, k, 32, 0.001, seed) if k < 32 else None
+
+def _local(n: int, k: int, seed: int) -> List[int]:
+    # localement étroit : largeur tirée dans 1..k pour chaque tranche de 128 valeurs (blocked)
+    rnd = random.Random(seed)
+    out: List[int] = []
+    while len(out) < n:
+        limit = 1 << rnd.randint(1, k)
+        out.extend(rnd.randrange(limit) for _ in range(min(128, n - len(out))))
+    return out
+
+SCENARIOS: Dict[str, Callable[[int, int, int], Optional[List[int]]]] = {
+    "uniform": uniform_u32,
+    "skewed": _skewed,
+    "sorted": _sorted_u32,
+    "local": _local,
+}
+
+def parse_int_list(spec: str) -> List[int]:
+    """"1-32" ou "4,8,12" (ou un mélange : "1-4,16") -> liste d'entiers."""
+    out: List[int] = []
+    for part in spec.split(","):
+        lo, sep, hi = part.strip().partition("-")
+        out.extend(range(int(lo), int(hi) + 1) if sep else [int(lo)])
+    return out
+
+def _median_ns(fn: Callable[[], object], warmups: int, repeats: int) -> float:
+    """Médiane par appel de fn ; chaque échantillon boucle assez d'appels pour durer
+    MIN_SAMPLE_NS."""
+    t0 = time.perf_counter_ns()
+    fn()
+    loops = max(1, MIN_SAMPLE_NS // max(time.perf_counter_ns() - t0, 1))
+
+    def _loop() -> None:
+        for _ in range(loops):
+            fn()
+
+    return time_repeated(_loop, warmups=warmups, repeats=repeats).median_ns / loops
+
+def _row(
+    fmt: str, scenario: str, k: int, n: int, op: str, median_ns: float, count: int, ratio: float
+) -> dict:
+    seconds = max(median_ns, 1) / 1e9
+    return {
+        "format": fmt, "scenario": scenario, "k": k, "n": n, "op": op,
+        "median_ns": round(median_ns), "values_per_s": count / seconds,
+        "mb_per_s": 4 * count / seconds / 1e6, "ratio": ratio,
+    }
+
+def bench_case(
+    fmt: str, scenario: str, k: int, arr: Sequence[int], warmups: int = 1, repeats: int = 5,
+    get_samples: int = 10_000, seed: int = 12345,
+) -> List[dict]:
+    """Une ligne par opération (OPS) pour un jeu de données."""
+    n = len(arr)
+    packer = create(fmt)
+    data = packer.compress(arr)
+    blob = data.to_bytes()
+    ratio = len(blob) / (4 * n) if n else 1.0
+    out = [0] * n
+    rnd = random.Random(seed)
+    idxs = [rnd.randrange(n) for _ in range(min(n, get_samples))]
+
+    def _get() -> None:
+        for i in idxs:
+            packer.get(i, data)
+
+    cases = {
+        "compress": (lambda: packer.compress(arr), n),
+        "decompress": (lambda: packer.decompress(out, data), n),
+        "get": (_get, len(idxs)),
+        "to_bytes": (data.to_bytes, n),
+        "from_bytes": (lambda: PackedData.from_bytes(blob), n),
+    }
+    rows = []
+    for op in OPS:
+        fn, count = cases[op]
+        rows.append(_row(fmt, scenario, k, n, op, _median_ns(fn, warmups, repeats), count, ratio))
+    return rows
+
+def run_suite(
+    formats: Iterable[str] = DEFAULT_FORMATS,
+    ks: Iterable[int] = DEFAULT_KS,
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    scenarios: Iterable[str] = DEFAULT_SCENARIOS,
+    warmups: int = 1,
+    repeats: int = 5,
+    get_samples: int = 10_000,
+    seed: int = 123,
+    progress: Optional[Callable[[str], None]] = None,
+) -> List[dict]:
+    """Balaye la matrice ; eliasfano ne tourne que sur des données triées ("sorted")."""
+    rows: List[dict] = []
+    for scenario in scenarios:
+        if scenario not in SCENARIOS:
+            raise ValueError(f"unknown scenario: {scenario}")
+        for n in sizes:
+            for k in ks:
+                arr = SCENARIOS[scenario](n, k, seed)
+                if arr is None:
+                    continue
+                for fmt in formats:
+                    if fmt == "eliasfano" and scenario != "sorted":
+                        continue
+                    if progress:
+                        progress(f"{fmt} {scenario} k={k} n={n}")
+                    rows.extend(bench_case(fmt, scenario, k, arr, warmups, repeats, get_samples))
+    return rows
+
+def write_results(rows: List[dict], path: str, meta: Optional[dict] = None) -> None:
+    """Écrit les résultats en CSV si path finit par .csv, sinon en JSON ({"meta", "results"})."""
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return
+    meta = dict(meta or {}, python=sys.version.split()[0], platform=platform.platform())
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": rows}, f, indent=1)
+
+def load_results(path: str) -> List[dict]:
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            for field in ("k", "n", "median_ns"):
+                row[field] = int(row[field])
+            for field in ("values_per_s", "mb_per_s", "ratio"):
+                row[field] = float(row[field])
+        return rows
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+def compare(
+    rows: List[dict],
+    baseline: List[dict],
+    threshold: float = DEFAULT_THRESHOLD,
+    op_thresholds: Optional[Dict[str, float]] = None,
+) -> List[dict]:
+    """Cas dont le débit (values_per_s) est inférieur à baseline * (1 - seuil).
+
+    op_thresholds remplace le seuil pour certaines opérations ; les cas absents de la
+    référence sont ignorés. Chaque régression : clés du cas, baseline, current, change.
+    """
+    op_thresholds = op_thresholds or {}
+    ref = {tuple(row[f] for f in KEY_FIELDS): row["values_per_s"] for row in baseline}
+    regressions = []
+    for row in rows:
+        key = tuple(row[f] for f in KEY_FIELDS)
+        if key not in ref or ref[key] <= 0:
+            continue
+        change = row["values_per_s"] / ref[key] - 1.0
+        if change < -op_thresholds.get(row["op"], threshold):
+            case = {f: row[f] for f in KEY_FIELDS}
+            current = row["values_per_s"]
+            regressions.append(dict(case, baseline=ref[key], current=current, change=change))
+    return regressions
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from typing import List, MutableSequence, Optional, Sequence
+
+from . import kernels, npengine
+from .aligned import BitPackingAligned
+from .core import (
+    WORD_BITS,
+    as_values,
+    batch_order,
+    batch_out,
+    bits_needed_unsigned,
+    buffer_output,
+    ceil_div,
+    check_indices,
+    check_range,
+    mask,
+    new_words,
+    read_bits,
+    read_lanes,
+)
+from .crossing import BitPackingCrossing
+from .header import KIND_BLOCKED, PackedData
+
+# Répertoire : 2 mots par bloc
+#   mot 0 : indice (dans la zone de données) du premier mot du bloc
+#   mot 1 : k du bloc | variante << 8
+DIR_WORDS_PER_BLOCK = 2
+VARIANT_CROSSING = 0
+VARIANT_ALIGNED = 1
+
+DEFAULT_BLOCK_SIZE = 128
+
+def block_layout(k: int, count: int) -> tuple[int, int]:
+    """(variante, nb de mots) d'un bloc de count valeurs sur k bits : aligned si elle ne coûte
+    aucun mot de plus (accès sans chevauchement). Partagée avec auto (estimation) et dict."""
+    if k == 0:
+        return VARIANT_CROSSING, 0
+    crossing_words = ceil_div(count * k, WORD_BITS)
+    aligned_words = ceil_div(count, WORD_BITS // k)
+    if aligned_words <= crossing_words:
+        return VARIANT_ALIGNED, aligned_words
+    return VARIANT_CROSSING, crossing_words
+
+def _block_span(k: int, cap: int, block_size: int) -> Optional[int]:
+    """Mots d'un bloc complet s'il finit pile sur une frontière de champ (le bloc suivant de
+    même k et variante prolonge alors le même flux), sinon None."""
+    if k == 0:
+        return 0
+    if cap and WORD_BITS % k:
+        return block_size // cap if block_size % cap == 0 else None
+    return block_size * k // WORD_BITS if block_size * k % WORD_BITS == 0 else None
+
+class BitPackingBlocked:
+    """Découpe le tableau en blocs de block_size valeurs, chacun avec son propre k.
+
+    Une grande valeur n'élargit que son bloc. Un répertoire de 2 mots par bloc (début du
+    bloc + k/variante) garde get(i) en O(1) : bloc i // block_size, puis lecture directe.
+    En-tête : cap = block_size, k = plus grand k de bloc, main_bits = taille du répertoire,
+    over_bits = taille de la zone de données.
+    """
+
+    def __init__(
+        self, word_bits: int = WORD_BITS, block_size: int = DEFAULT_BLOCK_SIZE, engine: str = "auto"
+    ):
+        if word_bits != 32:
+            raise ValueError("only 32-bit words supported")
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self.word_bits = word_bits
+        self.block_size = block_size
+        # décodage : NumPy (blocs groupés par k) si disponible et block_size multiple de 32
+        self.engine = npengine.resolve_engine(engine)
+        self._crossing = BitPackingCrossing(engine="python")  # blocs courts : NumPy non rentable
+        self._aligned = BitPackingAligned()
+        self._cache: tuple = (None, None)
+
+    def compress(self, arr: Sequence[int]) -> PackedData:
+        arr = as_values(arr)
+        n = len(arr)
+        bs = self.block_size
+        if n and (min(arr) < 0 or max(arr) >= (1 << 32)):
+            raise ValueError("values must be 0 <= x < 2^32")
+        n_blocks = ceil_div(n, bs)
+        directory = new_words(DIR_WORDS_PER_BLOCK * n_blocks)
+        body = new_words(0)
+        kmax = 0
+        for b in range(n_blocks):
+            block = arr[b * bs:(b + 1) * bs]
+            k = bits_needed_unsigned(max(block))
+            variant, _ = block_layout(k, len(block))
+            directory[2 * b] = len(body)
+            directory[2 * b + 1] = k | (variant << 8)
+            if k:
+                packer = self._aligned if variant == VARIANT_ALIGNED else self._crossing
+                body.extend(packer.compress(block).words)
+            kmax = max(kmax, k)
+        dir_bits = len(directory) * WORD_BITS
+        directory.extend(body)
+        return PackedData(
+            words=directory, n=n, kind=KIND_BLOCKED,
+            k=kmax, cap=bs, main_bits=dir_bits, over_bits=len(body) * WORD_BITS,
+        )
+
+    def _directory(self, data: PackedData) -> List[tuple]:
+        """Répertoire décodé une fois par PackedData (en cache pour le dernier lu) : par bloc,
+        (premier mot du bloc, k, masque, cap), cap = valeurs par mot en aligned, 0 en crossing."""
+        cached, entries = self._cache
+        if cached is not data:
+            words = data.words
+            dir_words = data.main_bits // WORD_BITS
+            entries = []
+            for b in range(ceil_div(data.n, data.cap)):
+                info = words[2 * b + 1]
+                k = info & 0xFF
+                cap = WORD_BITS // k if k and info >> 8 == VARIANT_ALIGNED else 0
+                entries.append((dir_words + words[2 * b], k, mask(k), cap))
+            self._cache = (data, entries)
+        return entries
+
+    def get(self, i: int, data: PackedData) -> int:
+        if i < 0 or i >= data.n:
+            raise IndexError("index out of range")
+        b, j = divmod(i, data.cap)
+        base, k, m, cap = self._directory(data)[b]
+        if not k:
+            return 0
+        words = data.words
+        if cap:
+            return (words[base + j // cap] >> (j % cap * k)) & m
+        off = j * k
+        w = base + (off >> 5)
+        shift = off & 31
+        if shift + k <= WORD_BITS:
+            return (words[w] >> shift) & m
+        return ((words[w] | (words[w + 1] << WORD_BITS)) >> shift) & m
+
+    def get_many(
+        self,
+        indices: Sequence[int],
+        data: PackedData,
+        out: Optional[MutableSequence[int]] = None,
+        sort: bool = False,
+    ) -> MutableSequence[int]:
+        """get(i) pour un lot ; l'entrée de répertoire du bloc courant est réutilisée."""
+        check_indices(indices, data.n)
+        out = batch_out(out, len(indices))
+        words = data.words
+        bs = data.cap
+        entries = self._directory(data)
+        cur_b = -1
+        base = k = m = cap = 0
+        for j in batch_order(indices, sort):
+            b, r = divmod(indices[j], bs)
+            if b != cur_b:
+                cur_b = b
+                base, k, m, cap = entries[b]
+            if k == 0:
+                out[j] = 0
+            elif cap:
+                out[j] = (words[base + r // cap] >> (r % cap * k)) & m
+            else:
+                out[j] = read_bits(words, base * WORD_BITS + r * k, k)
+        return out
+
+    @buffer_output(direct=True)
+    def decompress_range(
+        self, start: int, stop: int, out: MutableSequence[int], data: PackedData
+    ) -> None:
+        """Décode [start, stop) en ne lisant que les blocs couverts. Les blocs consécutifs de
+        même k et variante, contigus dans la zone de données, sont décodés d'un seul appel."""
+        check_range(start, stop, data.n)
+        if len(out) != stop - start:
+            raise ValueError("output buffer length must equal stop - start")
+        words = data.words
+        bs = data.cap
+        if self.engine == "numpy" and bs % WORD_BITS == 0 and stop > start:
+            b0, b1 = start // bs, ceil_div(stop, bs)
+            dir_words = data.main_bits // WORD_BITS
+            vals = npengine.unpack_blocked(words, dir_words, bs, b0, b1, VARIANT_ALIGNED)
+            npengine.store(vals[start - b0 * bs:stop - b0 * bs], out)
+            return
+        entries = self._directory(data)
+        i = start
+        while i < stop:
+            b, r = divmod(i, bs)
+            base, k, m, cap = entries[b]
+            span = _block_span(k, cap, bs)
+            e = b + 1
+            if span is not None:
+                last = ceil_div(stop, bs)
+                while e < last and entries[e] == (base + (e - b) * span, k, m, cap):
+                    e += 1
+            count = min(stop, e * bs) - i
+            o = i - start
+            if k == 0:
+                out[o:o + count] = [0] * count if isinstance(out, list) else new_words(count)
+            elif cap and WORD_BITS % k:
+                read_lanes(words, base + r // cap, r % cap, k, cap, out, o, count)
+            else:
+                # crossing, ou aligned avec k diviseur de 32 (même disposition) : noyaux par k
+                kernels.unpack_into(words, k, r, count, out, base, o)
+            i += count
+
+    @buffer_output(direct=True)
+    def decompress(self, out: List[int], data: PackedData) -> None:
+        if len(out) != data.n:
+            raise ValueError("output buffer length must equal n")
+        self.decompress_range(0, data.n, out, data)
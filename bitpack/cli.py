@@ -1,31 +1,79 @@
 from __future__ import annotations
+
 import argparse
+import contextlib
 import csv
-from typing import List
+import sys
+from array import array
+from typing import BinaryIO, Iterator, Sequence
 
+from .benchsuite import (
+    DEFAULT_FORMATS,
+    DEFAULT_SCENARIOS,
+    DEFAULT_SIZES,
+    DEFAULT_THRESHOLD,
+    OPS,
+    compare,
+    load_results,
+    parse_int_list,
+    run_suite,
+    write_results,
+)
+from .core import WORD_TYPECODE
 from .factory import create
-from .header import PackedData, KIND_CROSSING, KIND_ALIGNED, KIND_OVERFLOW
+from .header import KIND_NAMES
+from .mapped import MappedPackedArray
+from .parallel import parallel_compress, parallel_decompress
+from .stream import DEFAULT_CHUNK_VALUES, compress_stream, decompress_stream, write_u32
 from .timing import (
     bench_pack,
-    total_time_without_compression,
-    total_time_with_compression,
     ns_to_s,
+    total_time_with_compression,
+    total_time_without_compression,
 )
+from .transform import DEFAULT_CHECKPOINT_INTERVAL, TRANSFORM_NAMES
+from .zonemap import add_zone_map
+
+FORMATS = list(KIND_NAMES.values())
+PACK_FORMATS = FORMATS + ["auto"]  # "auto" : la variante retenue est écrite dans l'en-tête
 
 def _kind_str_to_id(s: str) -> int:
-    return {"crossing": KIND_CROSSING, "aligned": KIND_ALIGNED, "overflow": KIND_OVERFLOW}[s]
+    return {name: kind for kind, name in KIND_NAMES.items()}[s]
+
+def _check_kind(kind: int, fmt: str | None) -> None:
+    """--format est optionnel en lecture : le kind est lu dans l'en-tête ; s'il est donné,
+    on vérifie."""
+    if fmt is not None and kind != _kind_str_to_id(fmt):
+        raise SystemExit(f"format mismatch: file contains kind={kind}, CLI asked for {fmt}")
+
+def _check_word_bits(fmt: str, word_bits: int) -> None:
+    """Les mots de 64 bits ne sont pris en charge que par crossing et aligned."""
+    if fmt not in ("crossing", "aligned"):
+        raise SystemExit(f"--word-bits {word_bits} requires --format crossing or aligned")
 
-def _read_u32_file(path: str) -> List[int]:
+def _read_u32_file(path: str) -> array:
+    """Fichier u32 little-endian -> array('I'), en une lecture."""
     with open(path, "rb") as f:
         data = f.read()
     if len(data) % 4 != 0:
         raise ValueError("input file length is not a multiple of 4 bytes (u32)")
-    return [int.from_bytes(data[i:i+4], "little") for i in range(0, len(data), 4)]
+    arr = array(WORD_TYPECODE, data)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
 
-def _write_u32_file(path: str, arr: List[int]) -> None:
-    with open(path, "wb") as f:
-        for x in arr:
-            f.write((x & 0xFFFFFFFF).to_bytes(4, "little"))
+def _write_u32_file(path: str, arr: Sequence[int]) -> None:
+    with _open_binary(path, "wb") as f:
+        write_u32(f, arr)
+
+@contextlib.contextmanager
+def _open_binary(path: str, mode: str) -> Iterator[BinaryIO]:
+    """Ouvre un fichier binaire ; "-" désigne stdin/stdout (pipes)."""
+    if path == "-":
+        yield sys.stdin.buffer if "r" in mode else sys.stdout.buffer
+        return
+    with open(path, mode) as f:
+        yield f
 
 def main(argv: list[str] | None = None) -> int:
     p = argparse.ArgumentParser(prog="bitpack")
@@ -33,27 +81,55 @@ def main(argv: list[str] | None = None) -> int:
 
     # --- compress ---
     pc = sub.add_parser("compress", help="compress a u32 file")
-    pc.add_argument("--input", required=True)
-    pc.add_argument("--format", choices=["crossing", "aligned", "overflow"], required=True)
-    pc.add_argument("--out", required=True)
+    pc.add_argument("--input", required=True, help="u32 file, or - for stdin")
+    pc.add_argument("--format", choices=PACK_FORMATS, required=True)
+    pc.add_argument("--objective", choices=["size", "get", "t_yes"], default="size",
+                    help="criterion for --format auto")
+    pc.add_argument("--latency-ms", type=float, default=30.0, help="latency for --objective t_yes")
+    pc.add_argument("--bandwidth-mbps", type=float, default=10.0,
+                    help="bandwidth for --objective t_yes")
+    pc.add_argument("--transform", choices=list(TRANSFORM_NAMES.values()), default="none",
+                    help="frame-of-reference or delta coding before packing (header v2)")
+    pc.add_argument("--checkpoint-interval", type=int, default=DEFAULT_CHECKPOINT_INTERVAL,
+                    help="values between delta checkpoints (bounds get cost)")
+    pc.add_argument("--word-bits", type=int, choices=[32, 64], default=32, dest="word_bits",
+                    help="word size (64: crossing and aligned only)")
+    pc.add_argument("--zone-map", type=int, default=0, dest="zone_block", metavar="BLOCK",
+                    help="store per-block min/max (BLOCK values per block) for scan_range")
+    pc.add_argument("--out", required=True, help="packed file, or - for stdout")
+    pc.add_argument("--chunk-size", type=int, dest="chunk_size",
+                    help="stream in frames of this many values (implied by - ; bounded memory)")
+    pc.add_argument("--jobs", type=int, default=1,
+                    help="compress on N processes (crossing/aligned/overflow)")
 
     # --- get ---
     pg = sub.add_parser("get", help="read i-th value from a packed file")
     pg.add_argument("--file", required=True)
-    pg.add_argument("--format", choices=["crossing", "aligned", "overflow"], required=True)
+    pg.add_argument("--format", choices=FORMATS, help="optional: checked against the file header")
     pg.add_argument("--index", type=int, required=True)
 
     # --- decompress ---
     pd = sub.add_parser("decompress", help="decompress to u32 file")
-    pd.add_argument("--file", required=True)
-    pd.add_argument("--format", choices=["crossing", "aligned", "overflow"], required=True)
-    pd.add_argument("--out", required=True)
+    pd.add_argument("--file", required=True, help="packed file, or - for stdin")
+    pd.add_argument("--format", choices=FORMATS, help="optional: checked against the file header")
+    pd.add_argument("--out", required=True, help="u32 file, or - for stdout")
+    pd.add_argument("--jobs", type=int, default=1,
+                    help="decompress on N workers (single-frame files)")
+
+    # --- slice ---
+    ps = sub.add_parser("slice", help="decompress values [start, stop) to u32 file")
+    ps.add_argument("--file", required=True)
+    ps.add_argument("--format", choices=FORMATS, help="optional: checked against the file header")
+    ps.add_argument("--start", type=int, required=True)
+    ps.add_argument("--stop", type=int, required=True)
+    ps.add_argument("--out", required=True)
 
     # --- bench ---
     pb = sub.add_parser("bench", help="benchmark compress/decompress/get and compute break-even")
-    pb.add_argument("--format", choices=["crossing", "aligned", "overflow"], required=True)
+    pb.add_argument("--format", choices=PACK_FORMATS, required=True)
     src = pb.add_mutually_exclusive_group(required=True)
-    src.add_argument("--input", help="optional u32 file as input dataset (mutually exclusive with generators)")
+    src.add_argument("--input",
+                     help="optional u32 file as input dataset (mutually exclusive with generators)")
     src.add_argument("--scenario", choices=["uniform", "skewed"], help="data generator scenario")
     pb.add_argument("--n", type=int, help="size for generator scenarios")
     pb.add_argument("--k", type=int, help="bits for uniform scenario")
@@ -66,11 +142,37 @@ def main(argv: list[str] | None = None) -> int:
     pb.add_argument("--get-samples", type=int, default=100000)
     pb.add_argument("--latency-ms", type=float, default=30.0, help="network latency (ms)")
     pb.add_argument("--bandwidth-mbps", type=float, default=10.0, help="network bandwidth (Mbps)")
+    pb.add_argument("--word-bits", type=int, choices=[32, 64], default=32, dest="word_bits",
+                    help="word size (64: crossing and aligned only)")
     pb.add_argument("--csv", help="optional path to write CSV results")
+    pb.add_argument("--engine", choices=["auto", "python", "numpy"], default="auto",
+                    help="crossing engine (numpy falls back to python if unavailable)")
+
+    # --- bench-suite ---
+    pbs = sub.add_parser(
+        "bench-suite", help="benchmark matrix (formats x k x n x scenarios) with baseline check"
+    )
+    pbs.add_argument("--formats", default=",".join(DEFAULT_FORMATS), help="comma-separated formats")
+    pbs.add_argument("--ks", default="1-32", help="bit widths, e.g. 1-32 or 4,8,12")
+    pbs.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                     help="n values, e.g. 10000,100000")
+    pbs.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                     help="comma-separated scenarios (uniform, skewed, sorted, local)")
+    pbs.add_argument("--warmups", type=int, default=1)
+    pbs.add_argument("--repeats", type=int, default=5)
+    pbs.add_argument("--get-samples", type=int, default=10000, dest="get_samples")
+    pbs.add_argument("--out", help="results file (.json or .csv)")
+    pbs.add_argument("--baseline", help="previous results file to compare against")
+    pbs.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                     help="allowed throughput drop (0.10 = 10%%)")
+    pbs.add_argument("--op-threshold", action="append", default=[], dest="op_thresholds",
+                     metavar="OP=FRAC", help="per-op threshold, e.g. get=0.25 (repeatable)")
 
     # --- validate (rapport accès direct) ---
-    pv = sub.add_parser("validate", help="validate random-access & decompression fidelity; emit Markdown")
-    pv.add_argument("--format", choices=["crossing", "aligned", "overflow"], required=True)
+    pv = sub.add_parser(
+        "validate", help="validate random-access & decompression fidelity; emit Markdown"
+    )
+    pv.add_argument("--format", choices=PACK_FORMATS, required=True)
     srcv = pv.add_mutually_exclusive_group(required=True)
     srcv.add_argument("--input", help="u32 file as input dataset")
     srcv.add_argument("--scenario", choices=["uniform", "skewed"], help="data generator scenario")
@@ -86,37 +188,69 @@ def main(argv: list[str] | None = None) -> int:
 
     # --- compress ---
     if args.cmd == "compress":
+        opts = {}
+        if args.transform != "none":
+            opts = {"transform": args.transform, "checkpoint_interval": args.checkpoint_interval}
+        if args.word_bits != 32:
+            _check_word_bits(args.format, args.word_bits)
+            opts["word_bits"] = args.word_bits
+        if args.format == "auto":
+            opts |= {
+                "objective": args.objective,
+                "latency_ms": args.latency_ms,
+                "bandwidth_mbps": args.bandwidth_mbps,
+            }
+        if args.chunk_size or args.input == "-" or args.out == "-":
+            if args.jobs > 1:
+                raise SystemExit("--jobs cannot be combined with stream mode")
+            with _open_binary(args.input, "rb") as src, _open_binary(args.out, "wb") as dst:
+                chunk = args.chunk_size or DEFAULT_CHUNK_VALUES
+                compress_stream(src, dst, args.format, chunk, args.zone_block, **opts)
+            return 0
         arr = _read_u32_file(args.input)
-        packer = create(args.format)
-        packed = packer.compress(arr)
+        if args.jobs > 1:
+            packed = parallel_compress(args.format, arr, args.jobs, **opts)
+        else:
+            packed = create(args.format, **opts).compress(arr)
+        if args.zone_block:
+            packed = add_zone_map(packed, args.zone_block, arr)
         with open(args.out, "wb") as f:
-            f.write(packed.to_bytes())
+            packed.write_to(f)
         return 0
 
     # --- get ---
     if args.cmd == "get":
-        with open(args.file, "rb") as f:
-            data = f.read()
-        packed = PackedData.from_bytes(data)
-        expected = _kind_str_to_id(args.format)
-        if packed.kind != expected:
-            raise SystemExit(f"format mismatch: file contains kind={packed.kind}, CLI asked for {args.format}")
-        packer = create(args.format)
-        val = packer.get(args.index, packed)
-        print(val)
+        with MappedPackedArray(args.file) as m:
+            _check_kind(m.kind, args.format)
+            print(m.get(args.index))
         return 0
 
     # --- decompress ---
     if args.cmd == "decompress":
-        with open(args.file, "rb") as f:
-            data = f.read()
-        packed = PackedData.from_bytes(data)
-        expected = _kind_str_to_id(args.format)
-        if packed.kind != expected:
-            raise SystemExit(f"format mismatch: file contains kind={packed.kind}, CLI asked for {args.format}")
-        packer = create(args.format)
-        out = [0] * packed.n
-        packer.decompress(out, packed)
+        if args.file == "-":
+            # flux : une trame à la fois (le kind de chaque trame est lu dans son en-tête et
+            # comparé à --format s'il est donné)
+            with _open_binary(args.out, "wb") as dst:
+                decompress_stream(
+                    sys.stdin.buffer, dst, lambda frame: _check_kind(frame.kind, args.format)
+                )
+            return 0
+        # fichier : décodage par plages bornées, écrites au fur et à mesure
+        with MappedPackedArray(args.file) as m, _open_binary(args.out, "wb") as dst:
+            _check_kind(m.kind, args.format)
+            if args.jobs > 1 and len(m.frames) == 1:
+                with parallel_decompress(m.data, args.jobs) as res:
+                    write_u32(dst, res.view)
+                return 0
+            for chunk in m.iter_chunks(chunk_values=DEFAULT_CHUNK_VALUES):
+                write_u32(dst, chunk)
+        return 0
+
+    # --- slice ---
+    if args.cmd == "slice":
+        with MappedPackedArray(args.file) as m:
+            _check_kind(m.kind, args.format)
+            out = m.decompress_range(args.start, args.stop)
         _write_u32_file(args.out, out)
         return 0
 
@@ -149,8 +283,14 @@ def main(argv: list[str] | None = None) -> int:
                 }
 
         # Bench (mesures)
+        opts = {"engine": args.engine} if args.format == "crossing" else {}
+        if args.word_bits != 32:
+            _check_word_bits(args.format, args.word_bits)
+            opts["word_bits"] = args.word_bits
         packed, stc, std, avg_get_ns = bench_pack(
-            args.format, arr, warmups=args.warmups, repeats=args.repeats, get_samples=args.get_samples
+            args.format, arr, warmups=args.warmups, repeats=args.repeats,
+            get_samples=args.get_samples,
+            **opts,
         )
 
         # Tailles & ratio (1 seul to_bytes)
@@ -166,7 +306,12 @@ def main(argv: list[str] | None = None) -> int:
         def _bits_to_seconds(bits: int, mbps: float) -> float:
             return bits / (mbps * 1_000_000.0) if mbps > 0 else float("inf")
 
-        T_yes = (args.latency_ms / 1000.0) + (stc.median_ns / 1e9) + _bits_to_seconds(payload_bits, args.bandwidth_mbps) + (std.median_ns / 1e9)
+        T_yes = (
+            (args.latency_ms / 1000.0)
+            + (stc.median_ns / 1e9)
+            + _bits_to_seconds(payload_bits, args.bandwidth_mbps)
+            + (std.median_ns / 1e9)
+        )
         gain_s = T_no - T_yes
 
 
@@ -187,7 +332,8 @@ def main(argv: list[str] | None = None) -> int:
         print(f"Bandwidth (Mbps) : {args.bandwidth_mbps}")
         print(f"T_no-compress    : {T_no*1000:.3f} ms")
         print(f"T_with-compress  : {T_yes*1000:.3f} ms")
-        print(f"Gain             : {gain_s*1000:.3f} ms  ({'beneficial' if gain_s>0 else 'not beneficial'})")
+        verdict = "beneficial" if gain_s > 0 else "not beneficial"
+        print(f"Gain             : {gain_s*1000:.3f} ms  ({verdict})")
 
         # CSV optionnel
         if args.csv:
@@ -219,6 +365,38 @@ def main(argv: list[str] | None = None) -> int:
             print(f"\nCSV écrit : {args.csv}")
         return 0
 
+    # --- bench-suite ---
+    if args.cmd == "bench-suite":
+        formats = [f for f in args.formats.split(",") if f]
+        unknown = [f for f in formats if f not in FORMATS]
+        if unknown:
+            raise SystemExit(f"unknown format(s): {', '.join(unknown)}")
+        op_thresholds = {}
+        for spec in args.op_thresholds:
+            op, sep, frac = spec.partition("=")
+            if not sep or op not in OPS:
+                raise SystemExit(f"--op-threshold expects OP=FRAC with OP in {', '.join(OPS)}")
+            op_thresholds[op] = float(frac)
+        rows = run_suite(
+            formats, parse_int_list(args.ks), parse_int_list(args.sizes),
+            [s for s in args.scenarios.split(",") if s],
+            args.warmups, args.repeats, args.get_samples,
+            progress=lambda case: print(case, file=sys.stderr),
+        )
+        if args.out:
+            write_results(rows, args.out, {"warmups": args.warmups, "repeats": args.repeats})
+            print(f"Résultats écrits : {args.out} ({len(rows)} lignes)")
+        if not args.baseline:
+            return 0
+        regressions = compare(rows, load_results(args.baseline), args.threshold, op_thresholds)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['format']} {r['scenario']} k={r['k']} n={r['n']} {r['op']}: "
+                f"{r['baseline']:.0f} -> {r['current']:.0f} values/s ({r['change']:+.1%})"
+            )
+        print(f"{len(regressions)} régression(s) par rapport à {args.baseline}")
+        return 1 if regressions else 0
+
     # --- validate ---
     if args.cmd == "validate":
         # charger ou générer les données
@@ -237,7 +415,7 @@ def main(argv: list[str] | None = None) -> int:
                 arr = skewed(args.n, args.k_small, args.k_large, args.ratio_large)
 
         # exécuter la validation et écrire le rapport
-        from .validate import validate_access, render_markdown_report
+        from .validate import render_markdown_report, validate_access
         res = validate_access(args.format, arr, samples=args.samples)
         md = render_markdown_report(res)
         with open(args.report, "w", encoding="utf-8") as f:
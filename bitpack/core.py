@@ -1,18 +1,68 @@
 from __future__ import annotations
-from typing import List
+
+import functools
+import inspect
+import sys
+from array import array
+from typing import Any, Callable, List, MutableSequence, Optional, Sequence, Union
 
 U32_MASK = 0xFFFFFFFF
 WORD_BITS = 32
 
+# Stockage compact des mots : array d'entiers non signés de 4 octets (pas de PyLong par mot)
+WORD_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+# Mots de 64 bits (crossing et aligned, word_bits=64)
+WORD_TYPECODES = {32: WORD_TYPECODE, 64: "Q"}
+Words = Union[array, memoryview, List[int]]
+
+def word_typecode(word_bits: int) -> str:
+    if word_bits not in WORD_TYPECODES:
+        raise ValueError("word_bits must be 32 or 64")
+    return WORD_TYPECODES[word_bits]
+
+def new_words(count: int, word_bits: int = WORD_BITS) -> array:
+    """Alloue `count` mots (u32, ou u64 si word_bits=64) à zéro dans un array compact."""
+    return array(word_typecode(word_bits), bytes(word_bits // 8 * count))
+
+def as_words(words: Words, word_bits: int = WORD_BITS) -> Words:
+    """Convertit une liste d'entiers en array compact ; laisse array/memoryview intacts."""
+    if isinstance(words, (array, memoryview)):
+        return words
+    return array(word_typecode(word_bits), words)
+
+def widen_words(words32: Words) -> array:
+    """Flux LSB-first de mots u32 -> mêmes bits en mots u64 (complété à un nombre pair)."""
+    count = len(words32) + len(words32) % 2
+    if sys.byteorder == "little":
+        wide = new_words(0, 64)
+        raw = memoryview(words32).cast("B")
+        wide.frombytes(raw if count == len(words32) else b"".join((raw, bytes(4))))
+        return wide
+    wide = new_words(count // 2, 64)
+    for j, w in enumerate(words32):
+        wide[j >> 1] |= w << (32 * (j & 1))
+    return wide
+
+def u32_view(words: Words) -> Words:
+    """Mots u64 vus comme le flux u32 équivalent (sans copie sur hôte little-endian)."""
+    if sys.byteorder == "little":
+        return memoryview(words).cast("B").cast(WORD_TYPECODE)
+    narrow = new_words(2 * len(words))
+    for j, w in enumerate(words):
+        narrow[2 * j] = w & U32_MASK
+        narrow[2 * j + 1] = w >> 32
+    return narrow
+
 def u32(x: int) -> int:
     return x & U32_MASK
 
 def mask(k: int) -> int:
     if k <= 0:
         return 0
-    if k >= WORD_BITS:
+    if k == WORD_BITS:
         # 32 bits => tous les bits à 1 sur 32
         return U32_MASK
+    # k > 32 possible pour un slot overflow (s = 1 + 32) : masque complet, pas tronqué
     return (1 << k) - 1
 
 def ceil_div(a: int, b: int) -> int:
@@ -24,33 +74,200 @@ def bits_needed_unsigned(x: int) -> int:
         return 0
     return x.bit_length()
 
-def read_bits(words: List[int], bit_off: int, k: int) -> int:
-    """Lit k bits à partir du décalage global bit_off dans words (LSB-first, 32b)."""
+def read_bits(words: Words, bit_off: int, k: int, word_bits: int = WORD_BITS) -> int:
+    """Lit k bits depuis le décalage global bit_off dans words (LSB-first, mots de word_bits)."""
     if k == 0:
         return 0
-    w = bit_off // WORD_BITS
-    shift = bit_off % WORD_BITS
-    if shift + k <= WORD_BITS:
+    w = bit_off // word_bits
+    shift = bit_off % word_bits
+    if shift + k <= word_bits:
         return (words[w] >> shift) & mask(k)
     # chevauchement sur deux mots
-    low = WORD_BITS - shift
+    low = word_bits - shift
     part1 = (words[w] >> shift) & mask(low)
     part2 = words[w + 1] & mask(k - low)
     return part1 | (part2 << low)
 
-def write_bits(words: List[int], bit_off: int, k: int, value: int) -> None:
+def write_bits(words: Words, bit_off: int, k: int, value: int, word_bits: int = WORD_BITS) -> None:
     """Écrit k bits de value à bit_off en LSB-first. words doit être déjà dimensionné."""
     if k == 0:
         return
     value &= mask(k)
-    w = bit_off // WORD_BITS
-    shift = bit_off % WORD_BITS
-    if shift + k <= WORD_BITS:
-        words[w] = u32(words[w] | (value << shift))
+    w = bit_off // word_bits
+    shift = bit_off % word_bits
+    if shift + k <= word_bits:
+        words[w] = words[w] | (value << shift)
         return
     # chevauchement
-    low = WORD_BITS - shift
+    low = word_bits - shift
     part1 = value & mask(low)
     part2 = value >> low
-    words[w] = u32(words[w] | (part1 << shift))
-    words[w + 1] = u32(words[w + 1] | part2)
+    words[w] = words[w] | (part1 << shift)
+    words[w + 1] = words[w + 1] | part2
+
+def put_bits(words: Words, bit_off: int, k: int, value: int, word_bits: int = WORD_BITS) -> None:
+    """Comme write_bits, mais efface d'abord les k bits en place (réécriture d'un slot)."""
+    if k == 0:
+        return
+    value &= mask(k)
+    w = bit_off // word_bits
+    shift = bit_off % word_bits
+    if shift + k <= word_bits:
+        words[w] = (words[w] & ~(mask(k) << shift)) | (value << shift)
+        return
+    low = word_bits - shift
+    words[w] = (words[w] & mask(shift)) | ((value & mask(low)) << shift)
+    words[w + 1] = (words[w + 1] & ~mask(k - low)) | (value >> low)
+
+def or_bits(dst: Words, bit_off: int, src: Words, nbits: int) -> None:
+    """OU les nbits premiers bits de src (LSB-first) dans dst à partir de bit_off.
+
+    Travaille mot à mot : un décalage constant suffit pour recoller un flux à une
+    position quelconque (frontière non alignée sur un mot comprise).
+    """
+    if nbits <= 0:
+        return
+    nw = ceil_div(nbits, WORD_BITS)
+    w = bit_off // WORD_BITS
+    shift = bit_off % WORD_BITS
+    inv = WORD_BITS - shift
+    tail = nbits % WORD_BITS
+    for j in range(nw):
+        v = src[j]
+        if tail and j == nw - 1:
+            v &= mask(tail)
+        if shift == 0:
+            dst[w + j] |= v
+            continue
+        dst[w + j] |= (v << shift) & U32_MASK
+        if v >> inv:
+            dst[w + j + 1] |= v >> inv
+
+def read_run(
+    words: Words, bit_off: int, k: int, out: MutableSequence[int], start: int, count: int
+) -> None:
+    """Lit `count` champs consécutifs de k bits depuis bit_off dans out[start:start+count].
+
+    Tampon de bits glissant : chaque mot n'est chargé qu'une fois (pas de division par valeur).
+    """
+    if k == 0:
+        for j in range(start, start + count):
+            out[j] = 0
+        return
+    m = mask(k)
+    w = bit_off // WORD_BITS
+    shift = bit_off % WORD_BITS
+    buf = words[w] >> shift if count else 0
+    avail = WORD_BITS - shift
+    w += 1
+    for j in range(start, start + count):
+        while avail < k:
+            buf |= words[w] << avail
+            w += 1
+            avail += WORD_BITS
+        out[j] = buf & m
+        buf >>= k
+        avail -= k
+
+def read_lanes(
+    words: Words, w: int, lane: int, k: int, cap: int,
+    out: MutableSequence[int], start: int, count: int,
+) -> None:
+    """Lit `count` valeurs alignées (cap valeurs de k bits par mot) depuis le mot w, voie lane."""
+    m = mask(k)
+    word = words[w] >> (lane * k) if count else 0
+    for j in range(start, start + count):
+        if lane == cap:
+            w += 1
+            lane = 0
+            word = words[w]
+        out[j] = word & m
+        word >>= k
+        lane += 1
+
+def check_range(start: int, stop: int, n: int) -> None:
+    if start < 0 or stop > n or start > stop:
+        raise IndexError("range out of bounds")
+
+def check_indices(indices: Sequence[int], n: int) -> None:
+    """Contrôle de bornes unique pour un lot d'indices (IndexError si l'un sort de [0, n))."""
+    if len(indices) and (min(indices) < 0 or max(indices) >= n):
+        raise IndexError("index out of range")
+
+def batch_out(out: Optional[MutableSequence[int]], count: int) -> MutableSequence[int]:
+    """Renvoie le buffer de sortie d'un lot : `out` (de longueur count) ou une nouvelle liste."""
+    if out is None:
+        return [0] * count
+    if len(out) != count:
+        raise ValueError("output buffer length must equal len(indices)")
+    return out
+
+def batch_order(indices: Sequence[int], sort: bool) -> Sequence[int]:
+    """Ordre de parcours d'un lot : positions triées par indice (localité par mot) ou ordre
+    d'origine."""
+    if sort:
+        return sorted(range(len(indices)), key=indices.__getitem__)
+    return range(len(indices))
+
+def _u32_format(view: memoryview) -> str:
+    """Format de view sans préfixe d'ordre natif ("@", "=", "<" sur hôte little-endian)."""
+    return view.format.lstrip("@=" + ("<" if sys.byteorder == "little" else ""))
+
+def as_values(arr: Any) -> Sequence[int]:
+    """Entrée de compress() : list, tuple, array et range tels quels ; un autre objet buffer
+    (bytes, memoryview, numpy uint32...) est vu sans copie comme une suite de u32 natifs
+    (octets bruts : u32 little-endian). Autres formats : convertis en liste."""
+    if isinstance(arr, (list, tuple, array, range)):
+        return arr
+    try:
+        view = memoryview(arr)
+    except TypeError:
+        return arr
+    fmt = _u32_format(view)
+    if view.c_contiguous and fmt in ("B", "b", "c"):
+        if view.nbytes % 4 != 0:
+            raise ValueError("input length is not a multiple of 4 bytes (u32)")
+        if sys.byteorder != "little":
+            values = array(WORD_TYPECODE, view.tobytes())
+            values.byteswap()
+            return values
+        return view.cast("B").cast(WORD_TYPECODE)
+    if view.c_contiguous and fmt in ("I", "L") and view.itemsize == 4:
+        return view.cast("B").cast(WORD_TYPECODE)
+    return view.tolist()
+
+def u32_buffer(out: Any) -> memoryview:
+    """Vue u32 inscriptible d'un buffer de sortie (array('I'), numpy uint32, bytearray...)."""
+    view = memoryview(out)
+    fmt = _u32_format(view)
+    if view.readonly or not view.c_contiguous:
+        raise ValueError("output buffer must be writable and contiguous")
+    if fmt in ("B", "b", "c") and view.nbytes % 4 == 0:
+        return view.cast("B").cast(WORD_TYPECODE)
+    if fmt in ("I", "L") and view.itemsize == 4:
+        return view.cast("B").cast(WORD_TYPECODE)
+    raise ValueError("output buffer must hold u32 values")
+
+def buffer_output(method: Optional[Callable] = None, *, direct: bool = False) -> Callable:
+    """decompress / decompress_range (paramètre out) acceptant aussi un buffer u32
+    inscriptible. direct=True : la méthode reçoit la vue u32 (u32_buffer) et y écrit sans
+    liste intermédiaire (kernels.unpack_into, read_lanes...) ; sinon, repli : décodage dans
+    une liste puis une seule copie en bloc dans le buffer."""
+    if method is None:
+        return functools.partial(buffer_output, direct=direct)
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        out = bound.arguments["out"]
+        if isinstance(out, list):
+            return method(*bound.args, **bound.kwargs)
+        view = u32_buffer(out)
+        if direct:
+            bound.arguments["out"] = view
+            return method(*bound.args, **bound.kwargs)
+        bound.arguments["out"] = values = [0] * len(view)
+        method(*bound.args, **bound.kwargs)
+        view[:] = array(WORD_TYPECODE, values)
+    return wrapper
@@ -1,13 +1,41 @@
 from __future__ import annotations
-from typing import List
-from .core import WORD_BITS, ceil_div, bits_needed_unsigned, write_bits, read_bits
-from .header import PackedData, KIND_CROSSING
+
+from array import array
+from typing import List, MutableSequence, Optional, Sequence
+
+from . import kernels, npengine
+from .core import (
+    WORD_BITS,
+    as_values,
+    batch_order,
+    batch_out,
+    bits_needed_unsigned,
+    buffer_output,
+    ceil_div,
+    check_indices,
+    check_range,
+    mask,
+    new_words,
+    read_bits,
+    u32_view,
+    widen_words,
+)
+from .header import KIND_CROSSING, PackedData
+
 
 class BitPackingCrossing:
-    def __init__(self, word_bits: int = WORD_BITS):
-        if word_bits != 32:
-            raise ValueError("only 32-bit words supported")
+    """Flux continu de valeurs sur k bits, à cheval sur deux mots si besoin.
+
+    word_bits=64 : le flux LSB-first est le même qu'en 32 bits (octets identiques, complétés
+    à 8) ; les mots de 64 bits réduisent les lectures à cheval dans get(i).
+    """
+
+    def __init__(self, word_bits: int = WORD_BITS, engine: str = "auto"):
+        if word_bits not in (32, 64):
+            raise ValueError("word_bits must be 32 or 64")
         self.word_bits = word_bits
+        # "auto" => NumPy si disponible, sinon Python pur (payload identique)
+        self.engine = npengine.resolve_engine(engine)
 
     def _k_from_data(self, arr: List[int]) -> int:
         maxv = max(arr) if arr else 0
@@ -15,29 +43,33 @@ class BitPackingCrossing:
         return min(k, 32)
 
     def compress(self, arr: List[int]) -> PackedData:
+        arr = as_values(arr)
         n = len(arr)
         k = self._k_from_data(arr)
+        wb = self.word_bits
         if k == 0:
-            return PackedData(words=[], n=n, kind=KIND_CROSSING, k=0)
-        total_bits = n * k
-        words_count = ceil_div(total_bits, self.word_bits)
-        words = [0] * (words_count if total_bits > 0 else 0)
-        bit_off = 0
-        limit = (1 << k)
-        for x in arr:
-            if x < 0 or x >= (1 << 32):
-                raise ValueError("values must be 0 <= x < 2^32")
-            if x >= limit:
-                raise ValueError(f"value {x} exceeds {k} bits; use overflow variant")
-            write_bits(words, bit_off, k, x)
-            bit_off += k
+            return PackedData(words=new_words(0, wb), n=n, kind=KIND_CROSSING, k=0, word_bits=wb)
+        words = self.pack_words(arr, k)
         return PackedData(
-            words=words,
+            words=widen_words(words) if wb == 64 else words,
             n=n,
             kind=KIND_CROSSING,
             k=k,
+            word_bits=wb,
         )
 
+    def pack_words(self, arr: Sequence[int], k: int) -> array:
+        """Mots u32 du flux crossing de arr sur k bits imposé (k >= 1) ; brique de compress()."""
+        if self.engine == "numpy":
+            return npengine.pack_crossing(arr, k)
+        if len(arr):
+            lo, hi = min(arr), max(arr)
+            if lo < 0 or hi >= (1 << 32):
+                raise ValueError("values must be 0 <= x < 2^32")
+            if hi >= (1 << k):
+                raise ValueError(f"value {hi} exceeds {k} bits; use overflow variant")
+        return kernels.pack(arr, k)
+
     def get(self, i: int, data: PackedData) -> int:
         if i < 0 or i >= data.n:
             raise IndexError("index out of range")
@@ -45,10 +77,67 @@ class BitPackingCrossing:
         if k == 0:
             return 0
         bit_off = i * k
-        return read_bits(data.words, bit_off, k)
+        return read_bits(data.words, bit_off, k, data.word_bits)
+
+    def get_many(
+        self,
+        indices: Sequence[int],
+        data: PackedData,
+        out: Optional[MutableSequence[int]] = None,
+        sort: bool = False,
+    ) -> MutableSequence[int]:
+        """get(i) pour tout un lot : bornes, masque et fenêtre de 2 mots calculés une fois.
+
+        sort=True parcourt les indices dans l'ordre croissant (écrits à leur position
+        d'origine dans out) : les accès voisins réutilisent la même fenêtre de mots.
+        """
+        check_indices(indices, data.n)
+        out = batch_out(out, len(indices))
+        k = data.k
+        if k == 0:
+            for j in range(len(indices)):
+                out[j] = 0
+            return out
+        words = data.words
+        last = len(words) - 1
+        wb = data.word_bits
+        log_wb = wb.bit_length() - 1
+        m = mask(k)
+        cur_w = -1
+        window = 0  # mots cur_w et cur_w+1 concaténés (2 * word_bits bits)
+        for j in batch_order(indices, sort):
+            off = indices[j] * k
+            w = off >> log_wb
+            if w != cur_w:
+                cur_w = w
+                window = words[w] | (words[w + 1] << wb) if w < last else words[w]
+            out[j] = (window >> (off & (wb - 1))) & m
+        return out
+
+    @buffer_output(direct=True)
+    def decompress_range(
+        self, start: int, stop: int, out: MutableSequence[int], data: PackedData
+    ) -> None:
+        """Décode [start, stop) dans out en partant directement du bit start*k."""
+        check_range(start, stop, data.n)
+        count = stop - start
+        if len(out) != count:
+            raise ValueError("output buffer length must equal stop - start")
+        k = data.k
+        # en 64 bits, même flux : on décode sa vue u32
+        words = data.words if data.word_bits == WORD_BITS else u32_view(data.words)
+        if self.engine == "numpy" and k > 0 and count > 0:
+            # repartir du début de la période de 32 valeurs (frontière de mot) qui contient start
+            first = start - start % WORD_BITS
+            w0 = first * k // WORD_BITS
+            w1 = ceil_div(stop * k, WORD_BITS)
+            vals = npengine.unpack_crossing(words[w0:w1], stop - first, k)
+            npengine.store(vals[start - first:], out)
+            return
+        kernels.unpack_into(words, k, start, count, out)
 
+    @buffer_output(direct=True)
     def decompress(self, out: List[int], data: PackedData) -> None:
         if len(out) != data.n:
             raise ValueError("output buffer length must equal n")
-        for i in range(data.n):
-            out[i] = self.get(i, data)
+        self.decompress_range(0, data.n, out, data)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterator, Optional
+
+from .base import BitPacking
+from .core import WORD_TYPECODE, check_range
+from .factory import for_data
+from .header import PackedData
+
+# Parcours séquentiel : [start, stop) est décodé par tranches de ITER_CHUNK_VALUES valeurs
+# avec decompress_range (départ direct au bon offset, noyaux par période en crossing),
+# au lieu d'un get(i) par valeur (contrôle de bornes, i*k et lecture de mot à chaque fois).
+ITER_CHUNK_VALUES = 4096
+
+def iter_chunks(
+    data: PackedData,
+    start: int = 0,
+    stop: Optional[int] = None,
+    chunk_values: int = ITER_CHUNK_VALUES,
+    packer: Optional[BitPacking] = None,
+) -> Iterator[array]:
+    """Valeurs de [start, stop) par tranches array('I') de chunk_values (la dernière plus courte).
+
+    packer : lecteur à utiliser (par défaut for_data(data)). Chaque tranche est un nouvel
+    array : le consommateur peut la garder.
+    """
+    if stop is None:
+        stop = data.n
+    check_range(start, stop, data.n)
+    if chunk_values <= 0:
+        raise ValueError("chunk_values must be positive")
+    if packer is None:
+        packer = for_data(data)
+    buf = [0] * min(chunk_values, stop - start)
+    for pos in range(start, stop, chunk_values):
+        end = min(pos + chunk_values, stop)
+        if end - pos != len(buf):
+            buf = [0] * (end - pos)
+        packer.decompress_range(pos, end, buf, data)
+        yield array(WORD_TYPECODE, buf)
+
+def iter_values(
+    data: PackedData,
+    start: int = 0,
+    stop: Optional[int] = None,
+    packer: Optional[BitPacking] = None,
+) -> Iterator[int]:
+    """Valeurs de [start, stop) une à une, décodées par tranches (voir iter_chunks)."""
+    for chunk in iter_chunks(data, start, stop, packer=packer):
+        yield from chunk
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import List, MutableSequence, Optional, Sequence
+
+from .aligned import BitPackingAligned
+from .blocked import VARIANT_ALIGNED, block_layout
+from .core import (
+    WORD_BITS,
+    as_values,
+    batch_order,
+    batch_out,
+    bits_needed_unsigned,
+    buffer_output,
+    check_indices,
+    check_range,
+    mask,
+    new_words,
+    read_bits,
+    read_lanes,
+    read_run,
+)
+from .crossing import BitPackingCrossing
+from .header import KIND_DICT, PackedData
+
+LAYOUTS = ("auto", "crossing", "aligned")
+
+def code_width(distinct: int) -> int:
+    """Largeur des codes 0..distinct-1."""
+    return bits_needed_unsigned(distinct - 1)
+
+class BitPackingDict:
+    """Colonnes à faible cardinalité : dictionnaire des valeurs distinctes + codes packés.
+
+    Le dictionnaire (valeurs triées, un mot chacune) est en tête du payload, suivi des codes
+    sur k = bits(d - 1) bits en crossing ou en aligned (layout="auto" : aligned s'il ne
+    coûte aucun mot de plus). Le code d'une valeur est son rang dans le dictionnaire, donc
+    get(i) = words[code] : une lecture de code et un accès table.
+    En-tête : k = largeur des codes, cap = valeurs par mot en aligned (0 = crossing),
+    main_bits = taille du dictionnaire, over_bits = taille de la zone des codes.
+    """
+
+    def __init__(self, word_bits: int = WORD_BITS, layout: str = "auto"):
+        if word_bits != 32:
+            raise ValueError("only 32-bit words supported")
+        if layout not in LAYOUTS:
+            raise ValueError(f"unknown layout: {layout}")
+        self.word_bits = word_bits
+        self.layout = layout
+        self._crossing = BitPackingCrossing()
+        self._aligned = BitPackingAligned()
+
+    def compress(self, arr: Sequence[int]) -> PackedData:
+        arr = as_values(arr)
+        n = len(arr)
+        if n and (min(arr) < 0 or max(arr) >= (1 << 32)):
+            raise ValueError("values must be 0 <= x < 2^32")
+        values = sorted(set(arr))
+        rank = {v: c for c, v in enumerate(values)}
+        codes = [rank[x] for x in arr]
+        k = code_width(len(values))
+        words = new_words(0)
+        words.extend(values)
+        cap = 0
+        if k:
+            aligned = block_layout(k, n)[0] == VARIANT_ALIGNED
+            if self.layout != "auto":
+                aligned = self.layout == "aligned"
+            if aligned:
+                cap = WORD_BITS // k
+                body = self._aligned.pack_words(codes, k, cap)
+            else:
+                body = self._crossing.pack_words(codes, k)
+            words.extend(body)
+        dict_bits = len(values) * WORD_BITS
+        return PackedData(
+            words=words, n=n, kind=KIND_DICT, k=k, cap=cap,
+            main_bits=dict_bits, over_bits=(len(words) - len(values)) * WORD_BITS,
+        )
+
+    def get(self, i: int, data: PackedData) -> int:
+        if i < 0 or i >= data.n:
+            raise IndexError("index out of range")
+        words = data.words
+        k = data.k
+        base = data.main_bits // WORD_BITS
+        if k == 0:
+            return words[0]
+        if data.cap:
+            w, lane = divmod(i, data.cap)
+            return words[(words[base + w] >> (lane * k)) & mask(k)]
+        return words[read_bits(words, base * WORD_BITS + i * k, k)]
+
+    def get_many(
+        self,
+        indices: Sequence[int],
+        data: PackedData,
+        out: Optional[MutableSequence[int]] = None,
+        sort: bool = False,
+    ) -> MutableSequence[int]:
+        """get(i) pour un lot : zone des codes, largeur et masque calculés une fois."""
+        check_indices(indices, data.n)
+        out = batch_out(out, len(indices))
+        words = data.words
+        k = data.k
+        cap = data.cap
+        base = data.main_bits // WORD_BITS
+        m = mask(k)
+        for j in batch_order(indices, sort):
+            i = indices[j]
+            if k == 0:
+                out[j] = words[0]
+            elif cap:
+                out[j] = words[(words[base + i // cap] >> ((i % cap) * k)) & m]
+            else:
+                out[j] = words[read_bits(words, base * WORD_BITS + i * k, k)]
+        return out
+
+    @buffer_output
+    def decompress_range(
+        self, start: int, stop: int, out: MutableSequence[int], data: PackedData
+    ) -> None:
+        """Décode les codes de [start, stop) puis les remplace par leur valeur."""
+        check_range(start, stop, data.n)
+        count = stop - start
+        if len(out) != count:
+            raise ValueError("output buffer length must equal stop - start")
+        words = data.words
+        k = data.k
+        base = data.main_bits // WORD_BITS
+        if count == 0:
+            return
+        if k == 0:
+            read_run(words, 0, 0, out, 0, count)
+        elif data.cap:
+            w, lane = divmod(start, data.cap)
+            read_lanes(words, base + w, lane, k, data.cap, out, 0, count)
+        else:
+            read_run(words, base * WORD_BITS + start * k, k, out, 0, count)
+        values = words[:base]
+        for j in range(count):
+            out[j] = values[out[j]]
+
+    @buffer_output
+    def decompress(self, out: List[int], data: PackedData) -> None:
+        if len(out) != data.n:
+            raise ValueError("output buffer length must equal n")
+        self.decompress_range(0, data.n, out, data)
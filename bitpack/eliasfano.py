@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+from typing import List, MutableSequence, Optional, Sequence, Tuple
+
+from .core import (
+    U32_MASK,
+    WORD_BITS,
+    as_values,
+    batch_order,
+    batch_out,
+    buffer_output,
+    ceil_div,
+    check_indices,
+    check_range,
+    new_words,
+    read_bits,
+    read_run,
+    write_bits,
+)
+from .header import KIND_ELIASFANO, PackedData
+
+# Échantillonnage de l'index de select : position d'un bit à 1 (resp. à 0) sur SAMPLE_RATE.
+DEFAULT_SAMPLE_RATE = 128
+
+# _SELECT8[b * 8 + r] = position du bit à 1 de rang r dans l'octet b (select dans un mot)
+_SELECT8 = bytes(
+    ([p for p in range(8) if b >> p & 1] + [0] * 8)[r] for b in range(256) for r in range(8)
+)
+
+def _select_in_word(word: int, r: int) -> int:
+    """Position du bit à 1 de rang r (r < popcount(word)), octet par octet."""
+    shift = 0
+    while True:
+        b = word & 0xFF
+        c = b.bit_count()
+        if r < c:
+            return shift + _SELECT8[b * 8 + r]
+        r -= c
+        word >>= 8
+        shift += 8
+
+def low_width(n: int, max_value: int) -> int:
+    """l = floor(log2(u / n)), u = max + 1 : largeur des bits bas."""
+    if n == 0:
+        return 0
+    return max(0, ((max_value + 1) // n).bit_length() - 1)
+
+def _layout(n: int, low_bits: int, high_bits: int, rate: int) -> Tuple[int, int, int, int]:
+    """Premiers mots des zones : (samples select0, bits bas, bits hauts, total)."""
+    s1 = ceil_div(n, rate)
+    s0 = ceil_div(high_bits - n, rate)
+    low_w = s1 + s0
+    high_w = low_w + ceil_div(n * low_bits, WORD_BITS)
+    return s1, low_w, high_w, high_w + ceil_div(high_bits, WORD_BITS)
+
+class BitPackingEliasFano:
+    """Suites croissantes (au sens large) : codage d'Elias-Fano.
+
+    Chaque valeur x est coupée en l bits bas (packés en crossing avec write_bits) et
+    h = x >> l bits hauts, notés en unaire : le bit h + i est mis à 1 dans la zone haute
+    (n + max >> l + 1 bits, un 0 termine chaque seau). Soit ~2 + log2(u/n) bits par valeur.
+
+    Un index de select (position du bit à 1 de rang j*cap, puis du bit à 0 de rang j*cap)
+    précède les zones : get(i) = select1(i) - i pour les bits hauts, en ne balayant que
+    quelques mots ; next_geq(x) part de select0(x >> l).
+    Mots : [select1][select0][bits bas][bits hauts] ; en-tête : k = l, cap = taux
+    d'échantillonnage, main_bits = n*l, over_bits = taille de la zone haute.
+    """
+
+    def __init__(self, word_bits: int = WORD_BITS, sample_rate: int = DEFAULT_SAMPLE_RATE):
+        if word_bits != 32:
+            raise ValueError("only 32-bit words supported")
+        if sample_rate <= 0:
+            raise ValueError("sample_rate must be positive")
+        self.word_bits = word_bits
+        self.sample_rate = sample_rate
+        self._cache: tuple = (None, None)
+
+    def compress(self, arr: Sequence[int]) -> PackedData:
+        arr = as_values(arr)
+        n = len(arr)
+        if n and (arr[0] < 0 or arr[-1] >= (1 << 32)):
+            raise ValueError("values must be 0 <= x < 2^32")
+        if any(arr[i] > arr[i + 1] for i in range(n - 1)):
+            raise ValueError("eliasfano requires a non-decreasing sequence")
+        rate = self.sample_rate
+        low_bits = low_width(n, arr[-1] if n else 0)
+        high_bits = n + (arr[-1] >> low_bits if n else 0) + 1
+        s1, low_w, high_w, total = _layout(n, low_bits, high_bits, rate)
+        words = new_words(total)
+        low_off = low_w * WORD_BITS
+        zeros = 0
+        for i, x in enumerate(arr):
+            write_bits(words, low_off + i * low_bits, low_bits, x)
+            h = x >> low_bits
+            # zéros (fins de seau) franchis entre la valeur précédente et celle-ci
+            while zeros < h:
+                if zeros % rate == 0:
+                    words[s1 + zeros // rate] = zeros + i
+                zeros += 1
+            pos = h + i
+            if i % rate == 0:
+                words[i // rate] = pos
+            words[high_w + pos // WORD_BITS] |= 1 << (pos % WORD_BITS)
+        while zeros < high_bits - n:
+            if zeros % rate == 0:
+                words[s1 + zeros // rate] = zeros + n
+            zeros += 1
+        return PackedData(
+            words=words, n=n, kind=KIND_ELIASFANO, k=low_bits, cap=rate,
+            main_bits=n * low_bits, over_bits=high_bits,
+        )
+
+    # --- select ---
+
+    def _zones(self, data: PackedData) -> Tuple[int, int, int, int]:
+        """_layout de data, mémorisé pour le dernier PackedData lu."""
+        cached, zones = self._cache
+        if cached is not data:
+            zones = _layout(data.n, data.k, data.over_bits, data.cap)
+            self._cache = (data, zones)
+        return zones
+
+    def _select(self, data: PackedData, rank: int, ones: bool) -> int:
+        """Position (dans la zone haute) du bit à 1 (ou à 0) de rang `rank`."""
+        words = data.words
+        rate = data.cap
+        s1, _, high_w, _ = self._zones(data)
+        j = rank // rate
+        pos = words[j if ones else s1 + j]
+        r = rank - j * rate
+        flip = 0 if ones else U32_MASK
+        w = pos // WORD_BITS
+        word = ((words[high_w + w] ^ flip) >> (pos % WORD_BITS)) << (pos % WORD_BITS)
+        while True:
+            c = word.bit_count()
+            if r < c:
+                break
+            r -= c
+            w += 1
+            word = words[high_w + w] ^ flip
+        return w * WORD_BITS + _select_in_word(word, r)
+
+    def _scan(
+        self, data: PackedData, i: int, pos: int, out: MutableSequence[int], start: int, count: int
+    ) -> None:
+        """Bits hauts des éléments i, i+1, ... (le premier est le bit à 1 en position pos)."""
+        words = data.words
+        high_w = self._zones(data)[2]
+        w = pos // WORD_BITS
+        word = (words[high_w + w] >> (pos % WORD_BITS)) << (pos % WORD_BITS)
+        for j in range(start, start + count):
+            while not word:
+                w += 1
+                word = words[high_w + w]
+            t = word & -word
+            out[j] = w * WORD_BITS + t.bit_length() - 1 - i
+            word ^= t
+            i += 1
+
+    # --- lecture ---
+
+    def get(self, i: int, data: PackedData) -> int:
+        if i < 0 or i >= data.n:
+            raise IndexError("index out of range")
+        low_bits = data.k
+        high = self._select(data, i, True) - i
+        low_w = self._zones(data)[1]
+        low = read_bits(data.words, low_w * WORD_BITS + i * low_bits, low_bits)
+        return (high << low_bits) | low
+
+    def get_many(
+        self,
+        indices: Sequence[int],
+        data: PackedData,
+        out: Optional[MutableSequence[int]] = None,
+        sort: bool = False,
+    ) -> MutableSequence[int]:
+        check_indices(indices, data.n)
+        out = batch_out(out, len(indices))
+        for j in batch_order(indices, sort):
+            out[j] = self.get(indices[j], data)
+        return out
+
+    def next_geq(self, x: int, data: PackedData) -> Tuple[int, Optional[int]]:
+        """(i, valeur) du premier élément >= x ; (n, None) s'il n'y en a pas."""
+        n, low_bits = data.n, data.k
+        h = max(x, 0) >> low_bits
+        if n == 0 or h >= data.over_bits - n:
+            return n, None
+        # les éléments de bits hauts >= h suivent le h-ième 0 (fin du seau h - 1)
+        if h == 0:
+            i, pos = 0, 0
+        else:
+            pos = self._select(data, h - 1, False)
+            i = pos - (h - 1)
+        words = data.words
+        _, low_w, high_w, _ = self._zones(data)
+        w = pos // WORD_BITS
+        word = (words[high_w + w] >> (pos % WORD_BITS)) << (pos % WORD_BITS)
+        while i < n:
+            while not word:
+                w += 1
+                word = words[high_w + w]
+            t = word & -word
+            high = w * WORD_BITS + t.bit_length() - 1 - i
+            v = (high << low_bits) | read_bits(words, low_w * WORD_BITS + i * low_bits, low_bits)
+            if v >= x:
+                return i, v
+            word ^= t
+            i += 1
+        return n, None
+
+    @buffer_output
+    def decompress_range(
+        self, start: int, stop: int, out: MutableSequence[int], data: PackedData
+    ) -> None:
+        """Décode [start, stop) : un select pour start, puis parcours des bits hauts."""
+        check_range(start, stop, data.n)
+        count = stop - start
+        if len(out) != count:
+            raise ValueError("output buffer length must equal stop - start")
+        if count == 0:
+            return
+        low_bits = data.k
+        low_w = self._zones(data)[1]
+        self._scan(data, start, self._select(data, start, True), out, 0, count)
+        lows = [0] * count
+        read_run(data.words, low_w * WORD_BITS + start * low_bits, low_bits, lows, 0, count)
+        for j in range(count):
+            out[j] = (out[j] << low_bits) | lows[j]
+
+    @buffer_output
+    def decompress(self, out: List[int], data: PackedData) -> None:
+        if len(out) != data.n:
+            raise ValueError("output buffer length must equal n")
+        self.decompress_range(0, data.n, out, data)
@@ -1,17 +1,59 @@
 from __future__ import annotations
+
 from typing import Literal
+
+from .aligned import BitPackingAligned
 from .base import BitPacking
+from .blocked import BitPackingBlocked
 from .crossing import BitPackingCrossing
-from .aligned import BitPackingAligned
+from .dictionary import BitPackingDict
+from .eliasfano import BitPackingEliasFano
+from .header import KIND_NAMES, PackedData
 from .overflow import BitPackingOverflow
+from .transform import DEFAULT_CHECKPOINT_INTERVAL, TRANSFORM_NAMES, BitPackingTransform
 
-Kind = Literal["crossing", "aligned", "overflow"]
+Kind = Literal[
+    "crossing", "aligned", "overflow", "blocked", "eliasfano", "dict", "overflow_rank", "auto"
+]
 
-def create(kind: Kind, **opts) -> BitPacking:
+def create(
+    kind: Kind,
+    transform: str = "none",
+    checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    **opts,
+) -> BitPacking:
+    """Packer `kind` ; transform ("for", "delta", "delta2") ajoute une étape avant le packing."""
+    if transform != "none":
+        return BitPackingTransform(create(kind, **opts), transform, checkpoint_interval)
     if kind == "crossing":
         return BitPackingCrossing(**opts)
     if kind == "aligned":
         return BitPackingAligned(**opts)
     if kind == "overflow":
         return BitPackingOverflow(**opts)
+    if kind == "overflow_rank":
+        return BitPackingOverflow(layout="rank", **opts)
+    if kind == "blocked":
+        return BitPackingBlocked(**opts)
+    if kind == "eliasfano":
+        return BitPackingEliasFano(**opts)
+    if kind == "dict":
+        return BitPackingDict(**opts)
+    if kind == "auto":
+        from .auto import BitPackingAuto  # import local : auto dépend de create()
+        return BitPackingAuto(**opts)
     raise ValueError(f"unknown kind: {kind}")
+
+def for_kind(kind_id: int, **opts) -> BitPacking:
+    """Retourne le packer capable de lire un PackedData dont l'en-tête indique `kind_id`."""
+    if kind_id not in KIND_NAMES:
+        raise ValueError(f"unknown kind id: {kind_id}")
+    return create(KIND_NAMES[kind_id], **opts)
+
+def for_data(data: PackedData, **opts) -> BitPacking:
+    """Lecteur d'un PackedData : variante de l'en-tête, précédée de sa transformation
+    éventuelle."""
+    packer = for_kind(data.kind, **opts)
+    if data.transform:
+        return BitPackingTransform(packer, TRANSFORM_NAMES[data.transform])
+    return packer
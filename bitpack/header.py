@@ -1,23 +1,56 @@
 from __future__ import annotations
-from dataclasses import dataclass
+
 import struct
-from typing import List
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import BinaryIO, Union
+
+from .core import Words, as_words, ceil_div, new_words, word_typecode
+
+Buffer = Union[bytes, bytearray, memoryview]  # + tout objet du protocole buffer (mmap...)
 
 # Header binaire: 13 champs uint32 little-endian => 52 octets
-# version, kind, endianness, word_bits, n, k, cap, k_prime, p, k_over, main_bits, over_bits, words_count
+# (corps : words_count mots de word_bits)
+# version, kind, endianness, word_bits, n, k, cap, k_prime, p, k_over, main_bits, over_bits,
+# words_count
 _HDR_FMT = "<13I"
 _HDR_SIZE = struct.calcsize(_HDR_FMT)
+HEADER_SIZE = _HDR_SIZE
+# Version 2 : + transform, t_ref, t_interval (transformation appliquée avant le packing).
+# Les champs de base gardent leur position : frame_size ne lit que les 52 premiers octets.
+_EXT_FMT = "<3I"
+_EXT_SIZE = struct.calcsize(_EXT_FMT)
+# Version 3 : + zone_block, zone_count ; la zone map (min, max en u32 par bloc de
+# zone_block valeurs) suit l'en-tête, avant les mots.
+_ZONE_FMT = "<2I"
+_ZONE_SIZE = struct.calcsize(_ZONE_FMT)
+HEADER_VERSIONS = {1: _HDR_SIZE, 2: _HDR_SIZE + _EXT_SIZE, 3: _HDR_SIZE + _EXT_SIZE + _ZONE_SIZE}
 
 KIND_CROSSING = 0
 KIND_ALIGNED = 1
 KIND_OVERFLOW = 2
+KIND_BLOCKED = 3
+KIND_ELIASFANO = 4
+KIND_DICT = 5
+KIND_OVERFLOW_RANK = 6
+
+KIND_NAMES = {
+    KIND_CROSSING: "crossing",
+    KIND_ALIGNED: "aligned",
+    KIND_OVERFLOW: "overflow",
+    KIND_BLOCKED: "blocked",
+    KIND_ELIASFANO: "eliasfano",
+    KIND_DICT: "dict",
+    KIND_OVERFLOW_RANK: "overflow_rank",
+}
 
 ENDIAN_LITTLE = 0
 ENDIAN_BIG = 1  # réservé, on n'utilise que L.E. mais on le note dans l'en-tête
 
 @dataclass
 class PackedData:
-    words: List[int]
+    words: Words  # array('I') compact (une liste est convertie à la construction)
     n: int
     kind: int
     # params Crossing/Aligned
@@ -33,10 +66,31 @@ class PackedData:
     endianness: int = ENDIAN_LITTLE
     word_bits: int = 32
     version: int = 1
+    # transformation (en-tête v2) : id, référence (min pour "for"), intervalle des checkpoints
+    transform: int = 0
+    t_ref: int = 0
+    t_interval: int = 0
+    # zone map (en-tête v3) : min, max de chaque bloc de zone_block valeurs (0 = absente)
+    zone_block: int = 0
+    zone_map: Words = field(default_factory=lambda: new_words(0))
 
-    def to_bytes(self) -> bytes:
+    def __post_init__(self) -> None:
+        self.words = as_words(self.words, self.word_bits)
+        self.zone_map = as_words(self.zone_map)
+        if self.transform and self.version < 2:
+            self.version = 2  # sans transformation, l'en-tête reste en v1 (52 octets)
+        if self.zone_block and self.version < 3:
+            self.version = 3
+        if len(self.zone_map) != 2 * self.zone_count:
+            raise ValueError("zone_map must hold (min, max) for each block")
+
+    @property
+    def zone_count(self) -> int:
+        return ceil_div(self.n, self.zone_block) if self.zone_block else 0
+
+    def _header_bytes(self) -> bytes:
         words_count = len(self.words)
-        header = struct.pack(
+        head = struct.pack(
             _HDR_FMT,
             self.version,
             self.kind,
@@ -52,15 +106,53 @@ class PackedData:
             self.over_bits,
             words_count,
         )
-        # sérialise chaque mot en u32 little-endian
-        body = b"".join((w & 0xFFFFFFFF).to_bytes(4, "little") for w in self.words)
-        return header + body
+        if self.version >= 2:
+            head += struct.pack(_EXT_FMT, self.transform, self.t_ref, self.t_interval)
+        if self.version >= 3:
+            head += struct.pack(_ZONE_FMT, self.zone_block, self.zone_count)
+        return head
+
+    @property
+    def header_size(self) -> int:
+        return HEADER_VERSIONS[self.version]
 
     @staticmethod
-    def from_bytes(data: bytes) -> "PackedData":
-        if len(data) < _HDR_SIZE:
+    def _le_view(words: Words, word_bits: int) -> memoryview:
+        """Mots en little-endian : vue directe (copie + byteswap si hôte big-endian)."""
+        if sys.byteorder == "little":
+            return memoryview(words).cast("B")
+        swapped = array(word_typecode(word_bits), words)
+        swapped.byteswap()
+        return memoryview(swapped).cast("B")
+
+    def _body_view(self) -> memoryview:
+        return self._le_view(self.words, self.word_bits)
+
+    def to_bytes(self) -> bytes:
+        # une seule copie en bloc : en-tête + zone map + mots
+        return b"".join((self._header_bytes(), self._le_view(self.zone_map, 32), self._body_view()))
+
+    def write_to(self, f: BinaryIO) -> int:
+        """Écrit l'en-tête puis le corps directement dans f (sans concaténation) ; renvoie la
+        taille écrite."""
+        zones = self._le_view(self.zone_map, 32)
+        body = self._body_view()
+        f.write(self._header_bytes())
+        f.write(zones)
+        f.write(body)
+        return self.header_size + len(zones) + len(body)
+
+    @staticmethod
+    def from_bytes(data: Buffer) -> "PackedData":
+        """Reconstruit un PackedData sans copie : les mots sont une vue sur `data`.
+
+        `data` peut être bytes, bytearray, memoryview ou mmap ; il doit rester vivant
+        (et, pour un mmap, ouvert) tant que le PackedData est utilisé.
+        """
+        buf = memoryview(data).cast("B")
+        if len(buf) < _HDR_SIZE:
             raise ValueError("buffer too small for header")
-        fields = struct.unpack(_HDR_FMT, data[:_HDR_SIZE])
+        fields = struct.unpack_from(_HDR_FMT, buf, 0)
         (
             version,
             kind,
@@ -78,10 +170,24 @@ class PackedData:
         ) = fields
         if endianness != ENDIAN_LITTLE:
             raise ValueError("only little-endian payloads are supported")
-        body = data[_HDR_SIZE:]
-        if len(body) != words_count * 4:
+        if version not in HEADER_VERSIONS:
+            raise ValueError(f"unsupported header version: {version}")
+        if len(buf) < HEADER_VERSIONS[version]:
+            raise ValueError("buffer too small for header")
+        transform = t_ref = t_interval = zone_block = zone_count = 0
+        if version >= 2:
+            transform, t_ref, t_interval = struct.unpack_from(_EXT_FMT, buf, _HDR_SIZE)
+        if version >= 3:
+            zone_block, zone_count = struct.unpack_from(_ZONE_FMT, buf, _HDR_SIZE + _EXT_SIZE)
+        typecode = word_typecode(word_bits)  # ValueError si ni 32 ni 64
+        start = HEADER_VERSIONS[version]
+        body = buf[start + 8 * zone_count:]
+        if len(body) != words_count * word_bits // 8:
             raise ValueError("payload size does not match words_count")
-        words = [int.from_bytes(body[i:i+4], "little") for i in range(0, len(body), 4)]
+        words = PackedData._words_view(body, typecode)
+        zone_map = new_words(0)
+        if zone_count:
+            zone_map = PackedData._words_view(buf[start:start + 8 * zone_count], "I")
         return PackedData(
             words=words,
             n=n,
@@ -96,4 +202,43 @@ class PackedData:
             endianness=endianness,
             word_bits=word_bits,
             version=version,
+            transform=transform,
+            t_ref=t_ref,
+            t_interval=t_interval,
+            zone_block=zone_block,
+            zone_map=zone_map,
         )
+
+    @staticmethod
+    def _words_view(raw: memoryview, typecode: str) -> Words:
+        """Mots little-endian de raw : vue sans copie (copie + byteswap si hôte big-endian)."""
+        if sys.byteorder == "little":
+            return raw.cast(typecode)
+        words = array(typecode)
+        words.frombytes(raw)
+        words.byteswap()
+        return words
+
+def frame_header_size(buf: Buffer, offset: int = 0) -> int:
+    """Taille de l'en-tête (selon sa version) de la trame qui commence à `offset`."""
+    if len(buf) - offset < _HDR_SIZE:
+        raise ValueError("buffer too small for header")
+    version = struct.unpack_from("<I", buf, offset)[0]
+    if version not in HEADER_VERSIONS:
+        raise ValueError(f"unsupported header version: {version}")
+    return HEADER_VERSIONS[version]
+
+def frame_size(buf: Buffer, offset: int = 0) -> int:
+    """Taille totale (en-tête + corps) de la trame .bp qui commence à `offset` dans buf.
+
+    Ne lit que l'en-tête : permet d'enchaîner les trames d'un flux sans décoder les mots.
+    """
+    size = frame_header_size(buf, offset)
+    if len(buf) - offset < size:
+        raise ValueError("buffer too small for header")
+    word_bits = struct.unpack_from("<I", buf, offset + 12)[0]
+    words_count = struct.unpack_from("<I", buf, offset + _HDR_SIZE - 4)[0]
+    zone_count = 0
+    if size == HEADER_VERSIONS[3]:
+        zone_count = struct.unpack_from("<I", buf, offset + size - 4)[0]
+    return size + 8 * zone_count + words_count * (word_bits // 8)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from functools import lru_cache
+from typing import Callable, MutableSequence, Sequence
+
+from .core import WORD_BITS, WORD_TYPECODE, Words, ceil_div, mask, new_words, read_run
+
+# Noyaux générés pour le layout crossing : 32 valeurs de k bits occupent exactement k mots
+# (une période). Pour un k donné, le mot et le décalage de chaque valeur de la période sont
+# constants : le code est déroulé sur la période, sans division ni branche par valeur.
+MAX_KERNEL_BITS = WORD_BITS
+# k = 8, 16, 32 : champs = octets / demi-mots / mots du flux, lus par une vue typée (hôte
+# little-endian) au lieu d'être décalés et masqués un par un
+FIELD_TYPECODES = {8: "B", 16: "H", 32: WORD_TYPECODE}
+
+def _unpack_source(k: int, buffered: bool = False) -> str:
+    m = mask(k)
+    regs = ", ".join(f"a{w}" for w in range(k)) + ("," if k == 1 else "")
+    exprs = []
+    for j in range(WORD_BITS):
+        w, s = divmod(j * k, WORD_BITS)
+        e = f"a{w}" if s == 0 else f"(a{w} >> {s})"
+        if s + k > WORD_BITS:
+            e = f"({e} | (a{w + 1} << {WORD_BITS - s}))"
+        if s + k != WORD_BITS:
+            e = f"({e} & {m:#x})"
+        exprs.append(e)
+    # buffer u32 (memoryview, array) : une tranche ne s'affecte qu'à partir d'un array
+    values = ", ".join(exprs)
+    values = f"_array({WORD_TYPECODE!r}, ({values}))" if buffered else f"[{values}]"
+    return (
+        f"def unpack_{k}(words, w, out, o, periods):\n"
+        f"    for _ in range(periods):\n"
+        f"        {regs} = words[w:w + {k}]\n"
+        f"        out[o:o + 32] = {values}\n"
+        f"        w += {k}\n"
+        f"        o += 32\n"
+    )
+
+def _pack_source(k: int) -> str:
+    terms: list[list[str]] = [[] for _ in range(k)]
+    crossing = [False] * k
+    for j in range(WORD_BITS):
+        w, s = divmod(j * k, WORD_BITS)
+        terms[w].append(f"v{j}" if s == 0 else f"(v{j} << {s})")
+        if s + k > WORD_BITS:
+            crossing[w] = True
+            terms[w + 1].append(f"(v{j} >> {WORD_BITS - s})")
+    exprs = []
+    for w in range(k):
+        e = " | ".join(terms[w])
+        exprs.append(f"({e}) & 0xffffffff" if crossing[w] else e)
+    regs = ", ".join(f"v{j}" for j in range(WORD_BITS))
+    return (
+        f"def pack_{k}(values, i, words, periods):\n"
+        f"    for _ in range(periods):\n"
+        f"        {regs} = values[i:i + 32]\n"
+        f"        words.extend(({', '.join(exprs)},))\n"
+        f"        i += 32\n"
+    )
+
+def _compile(source: str, name: str) -> Callable:
+    namespace: dict = {"_array": array}
+    exec(compile(source, f"<bitpack.kernels:{name}>", "exec"), namespace)
+    return namespace[name]
+
+@lru_cache(maxsize=None)
+def unpack_kernel(
+    k: int, buffered: bool = False
+) -> Callable[[Words, int, MutableSequence[int], int, int], None]:
+    """Noyau unpack_k(words, w, out, o, periods) : décode `periods` périodes depuis le mot w
+    dans out[o:o + 32*periods]. out est une liste, ou avec buffered un buffer u32 (memoryview
+    'I', array('I')) rempli sans liste intermédiaire. Généré au premier appel, puis en cache."""
+    if not 1 <= k <= MAX_KERNEL_BITS:
+        raise ValueError("kernel width must be in 1..32")
+    return _compile(_unpack_source(k, buffered), f"unpack_{k}")
+
+@lru_cache(maxsize=None)
+def pack_kernel(k: int) -> Callable[[Sequence[int], int, array, int], None]:
+    """Noyau pack_k(values, i, words, periods) : ajoute à words les k mots de chacune des
+    `periods` périodes qui commencent à values[i]. Valeurs déjà contrôlées (< 2^k)."""
+    if not 1 <= k <= MAX_KERNEL_BITS:
+        raise ValueError("kernel width must be in 1..32")
+    return _compile(_pack_source(k), f"pack_{k}")
+
+def pack(values: Sequence[int], k: int) -> array:
+    """Flux crossing de values sur k bits (1..32), période par période ; valeurs < 2^k."""
+    n = len(values)
+    full = n // WORD_BITS
+    words = new_words(0)
+    kernel = pack_kernel(k)
+    kernel(values, 0, words, full)
+    if n % WORD_BITS:
+        tail = list(values[full * WORD_BITS:])
+        tail.extend([0] * (WORD_BITS - len(tail)))
+        kernel(tail, 0, words, 1)
+        del words[ceil_div(n * k, WORD_BITS):]
+    return words
+
+def _typed_words(words: Words) -> bool:
+    """Mots u32 natifs lisibles par une vue typée (array ou memoryview, hôte little-endian)."""
+    return (
+        sys.byteorder == "little"
+        and isinstance(words, (array, memoryview))
+        and words.itemsize == 4
+    )
+
+def _u32_output(out: MutableSequence[int]) -> bool:
+    """Buffer u32 natif (memoryview 'I', array('I')) : tranches affectables depuis un array."""
+    if isinstance(out, memoryview):
+        return out.format == WORD_TYPECODE
+    return isinstance(out, array) and out.typecode == WORD_TYPECODE
+
+def unpack_into(
+    words: Words, k: int, start: int, count: int, out: MutableSequence[int], word_off: int = 0,
+    out_off: int = 0,
+) -> None:
+    """Décode les valeurs [start, start + count) d'un flux crossing de k bits commençant au
+    mot word_off dans out[out_off:out_off + count]. out est une liste ou un buffer u32
+    (core.u32_buffer), écrit directement. Noyau sur les périodes complètes, read_run en
+    bordure ; vue typée pour k = 8, 16, 32."""
+    listed = isinstance(out, list)
+    buffered = not listed and _u32_output(out)
+    if k in FIELD_TYPECODES and (listed or buffered) and _typed_words(words):
+        first = word_off * (WORD_BITS // k) + start
+        fields = memoryview(words).cast("B").cast(FIELD_TYPECODES[k])[first:first + count]
+        if listed:
+            fields = fields.tolist()
+        elif k != WORD_BITS or not isinstance(out, memoryview):
+            fields = array(WORD_TYPECODE, fields)
+        out[out_off:out_off + count] = fields
+        return
+    if k == 0 or k > MAX_KERNEL_BITS or not (listed or buffered):
+        read_run(words, word_off * WORD_BITS + start * k, k, out, out_off, count)
+        return
+    head = min(-start % WORD_BITS, count)
+    if head:
+        read_run(words, word_off * WORD_BITS + start * k, k, out, out_off, head)
+    first = start + head
+    periods = (count - head) // WORD_BITS
+    kernel = unpack_kernel(k, buffered)
+    kernel(words, word_off + first // WORD_BITS * k, out, out_off + head, periods)
+    done = head + periods * WORD_BITS
+    if done < count:
+        bit_off = word_off * WORD_BITS + (start + done) * k
+        read_run(words, bit_off, k, out, out_off + done, count - done)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import bisect
+import mmap
+from array import array
+from typing import Iterator, List, Optional
+
+from .core import WORD_TYPECODE, u32_buffer
+from .cursor import ITER_CHUNK_VALUES, iter_chunks
+from .factory import for_data
+from .header import PackedData, frame_size
+from .zonemap import scan_range
+
+
+class MappedPackedArray:
+    """Lecture en accès direct d'un fichier .bp via mmap.
+
+    Seuls les en-têtes (52 octets par trame) sont décodés à l'ouverture ; les mots restent
+    dans le fichier mappé et get(i) ne lit que le ou les mots u32 nécessaires (slot + zone
+    overflow pour la variante overflow). La mémoire résidente reste quasi nulle.
+    Un fichier produit par compression en flux (plusieurs trames) est vu comme un seul tableau.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # fichier vide : mmap refuse une taille nulle
+            self._f.close()
+            raise ValueError("buffer too small for header")
+        self.frames: List[PackedData] = []
+        try:
+            with memoryview(self._mm) as view:
+                off = 0
+                while off < len(view):
+                    size = frame_size(view, off)
+                    self.frames.append(PackedData.from_bytes(view[off:off + size]))
+                    off += size
+            self._starts = [0]
+            for frame in self.frames:
+                self._starts.append(self._starts[-1] + frame.n)
+            # chaque trame porte son kind (un flux "auto" peut en mélanger plusieurs)
+            self._packers = [for_data(frame) for frame in self.frames]
+            self.packer = self._packers[0]
+        except Exception:
+            self.close()
+            raise
+
+    @property
+    def data(self) -> PackedData:
+        """Le PackedData du fichier (fichiers d'une seule trame)."""
+        if len(self.frames) != 1:
+            raise ValueError("multi-frame file: use frames")
+        return self.frames[0]
+
+    @property
+    def n(self) -> int:
+        return self._starts[-1]
+
+    @property
+    def kind(self) -> int:
+        """Kind lu dans l'en-tête (celui de la première trame)."""
+        return self.frames[0].kind
+
+    def __len__(self) -> int:
+        return self._starts[-1]
+
+    def _locate(self, i: int) -> tuple[int, int]:
+        """(trame, indice local) de l'élément i."""
+        if i < 0 or i >= self._starts[-1]:
+            raise IndexError("index out of range")
+        f = bisect.bisect_right(self._starts, i) - 1
+        return f, i - self._starts[f]
+
+    def get(self, i: int) -> int:
+        if len(self.frames) == 1:
+            return self.packer.get(i, self.frames[0])
+        f, j = self._locate(i)
+        return self._packers[f].get(j, self.frames[f])
+
+    def __getitem__(self, i: int) -> int:
+        if i < 0:
+            i += self.n
+        return self.get(i)
+
+    def decompress(self, out: Optional[List[int]] = None) -> List[int]:
+        return self.decompress_range(0, self.n, out)
+
+    def decompress_range(
+        self, start: int, stop: int, out: Optional[List[int]] = None
+    ) -> List[int]:
+        """Décode [start, stop) ; seuls les mots couvrant la plage sont lus dans le mmap."""
+        if start < 0 or stop > self.n or start > stop:
+            raise IndexError("range out of bounds")
+        if out is None:
+            out = [0] * (stop - start)
+        dst = out if isinstance(out, list) else u32_buffer(out)  # out : liste ou buffer u32
+        if len(dst) != stop - start:
+            raise ValueError("output buffer length must equal stop - start")
+        if len(self.frames) == 1:
+            self.packer.decompress_range(start, stop, out, self.frames[0])
+            return out
+        pos = start
+        while pos < stop:
+            f, j = self._locate(pos)
+            frame = self.frames[f]
+            count = min(stop - pos, frame.n - j)
+            part = [0] * count
+            self._packers[f].decompress_range(j, j + count, part, frame)
+            lo = pos - start
+            dst[lo:lo + count] = part if dst is out else array(WORD_TYPECODE, part)
+            pos += count
+        return out
+
+    def iter_chunks(
+        self, start: int = 0, stop: Optional[int] = None, chunk_values: int = ITER_CHUNK_VALUES
+    ) -> Iterator[array]:
+        """[start, stop) par tranches array('I') d'au plus chunk_values valeurs (une tranche
+        ne chevauche jamais deux trames)."""
+        if stop is None:
+            stop = self.n
+        if start < 0 or stop > self.n or start > stop:
+            raise IndexError("range out of bounds")
+        pos = start
+        while pos < stop:
+            f, j = self._locate(pos)
+            frame = self.frames[f]
+            count = min(stop - pos, frame.n - j)
+            yield from iter_chunks(frame, j, j + count, chunk_values, self._packers[f])
+            pos += count
+
+    def scan_range(self, lo: int, hi: int) -> array:
+        """Positions des valeurs dans [lo, hi] ; les zone maps des trames évitent de lire
+        les blocs exclus (voir zonemap.scan_range)."""
+        out = array(WORD_TYPECODE)
+        for f, frame in enumerate(self.frames):
+            base = self._starts[f]
+            out.extend(base + i for i in scan_range(frame, lo, hi, self._packers[f]))
+        return out
+
+    def __iter__(self) -> Iterator[int]:
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def close(self) -> None:
+        # libérer les vues sur les mots avant de fermer le mmap (sinon BufferError) ;
+        # les lecteurs d'abord : un lecteur transform garde une vue dérivée en cache
+        self._packers = []
+        self.packer = None
+        for frame in self.frames:
+            for view in (frame.words, frame.zone_map):
+                if isinstance(view, memoryview):
+                    view.release()
+        self.frames = []
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._f.close()
+
+    def __enter__(self) -> "MappedPackedArray":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
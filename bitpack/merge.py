@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import List, Sequence
+
+from . import kernels
+from .aligned import BitPackingAligned
+from .core import WORD_BITS, Words, ceil_div, check_range, mask, new_words, u32_view, widen_words
+from .factory import create, for_data
+from .header import KIND_ALIGNED, KIND_CROSSING, KIND_NAMES, PackedData
+from .transform import TRANSFORM_NAMES
+
+# Concaténation et découpe au niveau des mots, sans repasser par compress(arr) :
+# - crossing : le flux de chaque segment (n*k bits) est lu comme un entier Python,
+#   décalé à la position de fin du résultat et ajouté en bloc ;
+# - aligned : copie de mots quand le résultat finit sur une frontière de mot, sinon
+#   décalage des voies en SWAR (une passe de masques par voie) ;
+# - seul un segment de k (ou de cap) différent est décodé puis repacké au k commun.
+# Les autres variantes (et les transformations) passent par décompression + compress().
+# Les zone maps ne sont pas reportées.
+
+def _to_int(words: Words) -> int:
+    """Entier LSB-first des mots (u32 ou u64) de words."""
+    view = memoryview(words)
+    if sys.byteorder == "little":
+        return int.from_bytes(view.cast("B"), "little")
+    raw = array(view.format, view)
+    raw.byteswap()
+    return int.from_bytes(raw, "little")
+
+def _from_int(value: int, count: int, word_bits: int = WORD_BITS) -> array:
+    """count mots de word_bits bits de value (inverse de _to_int)."""
+    words = new_words(0, word_bits)
+    words.frombytes(value.to_bytes(count * word_bits // 8, "little"))
+    if sys.byteorder != "little":
+        words.byteswap()
+    return words
+
+def _bits(words: Words, bit_off: int, nbits: int) -> int:
+    """Les nbits bits du flux u32 words à partir de bit_off, sous forme d'entier."""
+    if nbits == 0:
+        return 0
+    value = _to_int(memoryview(words)[bit_off // WORD_BITS:ceil_div(bit_off + nbits, WORD_BITS)])
+    return (value >> (bit_off % WORD_BITS)) & mask(nbits)
+
+def _append_bits(dst: array, dst_bits: int, value: int, nbits: int) -> None:
+    """Ajoute les nbits de value au flux u32 dst (dst_bits bits utilisés)."""
+    phase = dst_bits % WORD_BITS
+    if phase:
+        value = (value << phase) | dst.pop()
+    dst.extend(_from_int(value, ceil_div(phase + nbits, WORD_BITS)))
+
+def _relane(value: int, count: int, k: int, cap: int, word_bits: int, shift: int) -> int:
+    """Décale de shift voies (|shift| < cap) les valeurs alignées de value (count mots) :
+    une passe de masques par voie, la voie j passant en (j + shift) mod cap du mot voisin."""
+    lane0 = int.from_bytes(mask(k).to_bytes(word_bits // 8, "little") * count, "little")
+    out = 0
+    for j in range(cap):
+        lanes = (value >> (j * k)) & lane0
+        q, r = divmod(j + shift, cap)  # q : mot précédent (-1), même mot (0) ou suivant (1)
+        pos = q * word_bits + r * k
+        out |= lanes << pos if pos >= 0 else lanes >> -pos
+    return out
+
+def _decode(data: PackedData) -> List[int]:
+    out = [0] * data.n
+    for_data(data).decompress(out, data)
+    return out
+
+def _repack(kind: int, values: List[int], like: PackedData) -> PackedData:
+    """Voie générique : compress() avec la variante (et la transformation) de like."""
+    opts = {}
+    if like.transform:
+        opts = {"transform": TRANSFORM_NAMES[like.transform]}
+        if like.t_interval:
+            opts["checkpoint_interval"] = like.t_interval
+    if kind in (KIND_CROSSING, KIND_ALIGNED):
+        opts["word_bits"] = like.word_bits
+    return create(KIND_NAMES[kind], **opts).compress(values)
+
+def _crossing_words(data: PackedData) -> Words:
+    return data.words if data.word_bits == WORD_BITS else u32_view(data.words)
+
+def _crossing_result(stream: array, n: int, k: int, word_bits: int) -> PackedData:
+    words = widen_words(stream) if word_bits == 64 else stream
+    return PackedData(words=words, n=n, kind=KIND_CROSSING, k=k, word_bits=word_bits)
+
+def _concat_crossing(segments: Sequence[PackedData], k: int, word_bits: int) -> PackedData:
+    stream = new_words(0)
+    n = 0
+    for seg in segments:
+        nbits = seg.n * k
+        if seg.k == k:
+            value = _bits(_crossing_words(seg), 0, nbits)
+        else:  # élargissement au k commun
+            value = _bits(kernels.pack(_decode(seg), k), 0, nbits)
+        _append_bits(stream, n * k, value, nbits)
+        n += seg.n
+    return _crossing_result(stream, n, k, word_bits)
+
+def _concat_aligned(segments: Sequence[PackedData], k: int, word_bits: int) -> PackedData:
+    if k == 0:
+        n = sum(seg.n for seg in segments)
+        return PackedData(
+            words=new_words(0, word_bits), n=n, kind=KIND_ALIGNED, k=0, cap=0, word_bits=word_bits
+        )
+    cap = word_bits // k or 1
+    packer = BitPackingAligned(word_bits)
+    words = new_words(0, word_bits)
+    n = 0
+    for seg in segments:
+        rest = n % cap
+        same = (seg.k, seg.cap, seg.word_bits) == (k, cap, word_bits)
+        if same and not rest:
+            words.frombytes(memoryview(seg.words)[:ceil_div(seg.n, cap)].cast("B"))
+        elif same:
+            # le résultat finit au milieu d'un mot : voies décalées de rest, OR du dernier mot
+            count = ceil_div(seg.n, cap)
+            value = _relane(_to_int(memoryview(seg.words)[:count]), count, k, cap, word_bits, rest)
+            value |= words.pop()
+            words.extend(_from_int(value, ceil_div(rest + seg.n, cap), word_bits))
+        else:
+            # segment d'autre k/cap : décodé puis repacké (avec les voies du dernier mot)
+            values = []
+            if rest:
+                last = words.pop()
+                values = [(last >> (j * k)) & mask(k) for j in range(rest)]
+            values.extend(_decode(seg))
+            words.extend(packer.pack_words(values, k, cap, word_bits))
+        n += seg.n
+    return PackedData(words=words, n=n, kind=KIND_ALIGNED, k=k, cap=cap, word_bits=word_bits)
+
+def concat(segments: Sequence[PackedData]) -> PackedData:
+    """Un seul PackedData pour la suite des valeurs des segments (dans l'ordre).
+
+    Le résultat prend la variante et la taille de mot du premier segment, et le plus grand k.
+    """
+    if not segments:
+        raise ValueError("concat() needs at least one segment")
+    first = segments[0]
+    kind = first.kind
+    plain = all(seg.kind == kind and not seg.transform for seg in segments)
+    parts = [seg for seg in segments if seg.n]
+    if plain and kind == KIND_CROSSING:
+        return _concat_crossing(parts, max((seg.k for seg in parts), default=0), first.word_bits)
+    if plain and kind == KIND_ALIGNED:
+        return _concat_aligned(parts, max((seg.k for seg in parts), default=0), first.word_bits)
+    values: List[int] = []
+    for seg in parts:
+        values.extend(_decode(seg))
+    return _repack(kind, values, first)
+
+def slice(data: PackedData, start: int, stop: int) -> PackedData:
+    """PackedData des valeurs [start, stop) de data (même variante, même k)."""
+    check_range(start, stop, data.n)
+    n = stop - start
+    k = data.k
+    if data.transform or data.kind not in (KIND_CROSSING, KIND_ALIGNED):
+        values = [0] * n
+        for_data(data).decompress_range(start, stop, values, data)
+        return _repack(data.kind, values, data)
+    if data.kind == KIND_CROSSING:
+        stream = new_words(0)
+        _append_bits(stream, 0, _bits(_crossing_words(data), start * k, n * k), n * k)
+        return _crossing_result(stream, n, k, data.word_bits)
+    cap = data.cap
+    words = new_words(0, data.word_bits)
+    if k:
+        first = start // cap
+        src = memoryview(data.words)[first:ceil_div(stop, cap)]
+        count = ceil_div(n, cap)
+        if start % cap == 0:
+            words.frombytes(src[:count].cast("B"))
+        else:  # voies ramenées de start % cap vers la voie 0
+            value = _relane(_to_int(src), len(src), k, cap, data.word_bits, -(start % cap))
+            words = _from_int(value & mask(count * data.word_bits), count, data.word_bits)
+        if n % cap:  # voies au-delà de stop dans le dernier mot
+            words[-1] &= mask((n % cap) * k)
+    return PackedData(words=words, n=n, kind=KIND_ALIGNED, k=k, cap=cap, word_bits=data.word_bits)
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Iterator, List, Optional
+
+from . import kernels
+from .aligned import BitPackingAligned
+from .core import (
+    WORD_BITS,
+    bits_needed_unsigned,
+    ceil_div,
+    mask,
+    new_words,
+    or_bits,
+    put_bits,
+    read_bits,
+    read_run,
+    u32_view,
+    widen_words,
+    write_bits,
+)
+from .cursor import iter_values
+from .factory import create, for_data
+from .header import KIND_ALIGNED, KIND_CROSSING, KIND_NAMES, KIND_OVERFLOW, PackedData
+from .overflow import BitPackingOverflow
+
+# Tableau packé modifiable. Les mots sont gardés dans des array à capacité doublée
+# (append amorti O(1)) et les slots réécrits en place avec core.put_bits (effacement puis
+# écriture). Une valeur trop large :
+# - crossing / aligned : tout le tableau est repacké au nouveau k (au plus 32 fois) ;
+# - overflow : elle part dans la zone de débordement (index dans le slot) ; k', p et k_over
+#   sont réestimés (choose_params) quand le nombre d'outliers double.
+# to_packed() rend un PackedData ordinaire (mêmes formats que compress()).
+MUTABLE_KINDS = (KIND_CROSSING, KIND_ALIGNED, KIND_OVERFLOW)
+# Pas de réestimation des paramètres overflow avant ce nombre d'outliers
+RETUNE_MIN_OUTLIERS = 64
+
+def _check_value(v: int) -> None:
+    if v < 0 or v >> WORD_BITS:
+        raise ValueError("values must be 0 <= x < 2^32")
+
+def _reserve(words: array, count: int) -> None:
+    """Au moins count mots (à zéro au-delà des données) ; capacité doublée par extension."""
+    if count > len(words):
+        words.extend(new_words(max(count, 2 * len(words)) - len(words), 8 * words.itemsize))
+
+def _copy_words(words, count: int, word_bits: int = WORD_BITS) -> array:
+    """Copie (array) des count premiers mots de words."""
+    out = new_words(0, word_bits)
+    out.frombytes(memoryview(words)[:count].cast("B"))
+    return out
+
+class PackedArray:
+    """Tableau d'entiers u32 packé et modifiable : get/set(i), append, extend.
+
+    Variantes crossing (32 ou 64 bits), aligned (32 ou 64 bits) et overflow (disposition
+    inline), sans transformation. PackedArray(data) copie les mots de data.
+    """
+
+    def __init__(
+        self, data: Optional[PackedData] = None, kind: str = "crossing", word_bits: int = WORD_BITS
+    ):
+        if data is None:
+            data = create(kind, word_bits=word_bits).compress([])
+        if data.kind not in MUTABLE_KINDS or data.transform:
+            raise ValueError(
+                f"PackedArray supports crossing, aligned and overflow, not {KIND_NAMES[data.kind]}"
+            )
+        self.kind = data.kind
+        self.word_bits = data.word_bits
+        self.n = data.n
+        if self.kind == KIND_OVERFLOW:
+            self._load_overflow(data)
+            return
+        self.k = data.k
+        if self.kind == KIND_CROSSING:
+            # crossing 64 bits : même flux que 32 bits, gardé en u32 et réélargi par to_packed()
+            src = u32_view(data.words) if data.word_bits != WORD_BITS else data.words
+            self.words = _copy_words(src, ceil_div(self.n * self.k, WORD_BITS))
+        else:
+            self.cap = data.cap if self.k else 0
+            count = ceil_div(self.n, self.cap) if self.k else 0
+            self.words = _copy_words(data.words, count, self.word_bits)
+
+    @classmethod
+    def from_values(
+        cls, values: Iterable[int], kind: str = "crossing", word_bits: int = WORD_BITS
+    ) -> "PackedArray":
+        return cls(create(kind, word_bits=word_bits).compress(list(values)))
+
+    def _load_overflow(self, data: PackedData) -> None:
+        self.k_prime, self.p, self.k_over = data.k_prime, data.p, data.k_over
+        self.s = 1 + max(self.k_prime, self.p)
+        main_bits = self.n * self.s
+        self.words = _copy_words(data.words, ceil_div(main_bits, WORD_BITS))
+        if main_bits % WORD_BITS:  # début de la zone overflow dans le dernier mot
+            self.words[-1] &= mask(main_bits % WORD_BITS)
+        self.m = data.over_bits // self.k_over if self.k_over else 0
+        self.over = new_words(ceil_div(data.over_bits, WORD_BITS))
+        for j in range(self.m):
+            write_bits(self.over, j * self.k_over, self.k_over,
+                       read_bits(data.words, main_bits + j * self.k_over, self.k_over))
+        self._retune_at = max(2 * self.m, self.n // 2, RETUNE_MIN_OUTLIERS)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i: int) -> int:
+        return self.get(i)
+
+    def __setitem__(self, i: int, v: int) -> None:
+        self.set(i, v)
+
+    def __iter__(self) -> Iterator[int]:
+        # instantané : les modifications pendant le parcours ne sont pas vues
+        return iter_values(self.to_packed())
+
+    def get(self, i: int) -> int:
+        if i < 0 or i >= self.n:
+            raise IndexError("index out of range")
+        if self.kind == KIND_CROSSING:
+            return read_bits(self.words, i * self.k, self.k)
+        if self.kind == KIND_ALIGNED:
+            if not self.k:
+                return 0
+            w, lane = divmod(i, self.cap)
+            return (self.words[w] >> (lane * self.k)) & mask(self.k)
+        slot = read_bits(self.words, i * self.s, self.s)
+        if slot & 1:
+            return read_bits(self.over, (slot >> 1) * self.k_over, self.k_over)
+        return slot >> 1
+
+    def set(self, i: int, v: int) -> None:
+        """Remplace la valeur i (le slot est effacé puis réécrit)."""
+        if i < 0 or i >= self.n:
+            raise IndexError("index out of range")
+        _check_value(v)
+        if self.kind == KIND_OVERFLOW:
+            self._put_overflow(i, v)
+        else:
+            if v >> self.k:
+                self._rewiden(v.bit_length())
+            self._put(i, v)
+
+    def append(self, v: int) -> None:
+        _check_value(v)
+        if self.kind == KIND_OVERFLOW:
+            _reserve(self.words, ceil_div((self.n + 1) * self.s, WORD_BITS))
+            self.n += 1
+            self._put_overflow(self.n - 1, v)
+            return
+        if v >> self.k:
+            self._rewiden(v.bit_length())
+        self._reserve(self.n + 1)
+        self.n += 1
+        self._put(self.n - 1, v)
+
+    def extend(self, values: Iterable[int]) -> None:
+        values = list(values)
+        if not values:
+            return
+        if min(values) < 0 or max(values) >> WORD_BITS:
+            raise ValueError("values must be 0 <= x < 2^32")
+        if self.kind == KIND_OVERFLOW:
+            for v in values:
+                self.append(v)
+            return
+        width = bits_needed_unsigned(max(values))
+        if width > self.k:
+            self._rewiden(width)
+        n, k = self.n, self.k
+        self._reserve(n + len(values))
+        self.n += len(values)
+        if not k:
+            return
+        if self.kind == KIND_CROSSING:
+            # un seul pack du lot, recollé au bit n*k
+            or_bits(self.words, n * k, kernels.pack(values, k), len(values) * k)
+            return
+        # aligned : fin du mot entamé valeur par valeur, puis mots entiers
+        head = min(-n % self.cap, len(values))
+        for j in range(head):
+            self._put(n + j, values[j])
+        if head < len(values):
+            w = ceil_div(n, self.cap)
+            packer = BitPackingAligned(self.word_bits)
+            packed = packer.pack_words(values[head:], k, self.cap, self.word_bits)
+            self.words[w:w + len(packed)] = packed
+
+    def tolist(self) -> List[int]:
+        out = [0] * self.n
+        data = self.to_packed()
+        for_data(data).decompress(out, data)
+        return out
+
+    def to_packed(self) -> PackedData:
+        """PackedData (copie des mots utiles) au format de compress()."""
+        if self.kind == KIND_CROSSING:
+            words = _copy_words(self.words, ceil_div(self.n * self.k, WORD_BITS))
+            if self.word_bits != WORD_BITS:
+                words = widen_words(words)
+            return PackedData(
+                words=words, n=self.n, kind=KIND_CROSSING, k=self.k, word_bits=self.word_bits
+            )
+        if self.kind == KIND_ALIGNED:
+            count = ceil_div(self.n, self.cap) if self.k else 0
+            return PackedData(
+                words=_copy_words(self.words, count, self.word_bits), n=self.n, kind=KIND_ALIGNED,
+                k=self.k, cap=self.cap, word_bits=self.word_bits,
+            )
+        main_bits = self.n * self.s
+        over_bits = self.m * self.k_over
+        words = new_words(ceil_div(main_bits + over_bits, WORD_BITS))
+        main_count = ceil_div(main_bits, WORD_BITS)
+        words[:main_count] = self.words[:main_count]
+        or_bits(words, main_bits, self.over, over_bits)
+        return PackedData(
+            words=words, n=self.n, kind=KIND_OVERFLOW, k_prime=self.k_prime, p=self.p,
+            k_over=self.k_over, main_bits=main_bits, over_bits=over_bits,
+        )
+
+    # crossing / aligned
+
+    def _reserve(self, count: int) -> None:
+        if self.kind == KIND_CROSSING:
+            _reserve(self.words, ceil_div(count * self.k, WORD_BITS))
+        elif self.k:
+            _reserve(self.words, ceil_div(count, self.cap))
+
+    def _put(self, i: int, v: int) -> None:
+        if self.kind == KIND_CROSSING:
+            put_bits(self.words, i * self.k, self.k, v)
+        elif self.k:
+            w, lane = divmod(i, self.cap)
+            put_bits(self.words, w * self.word_bits + lane * self.k, self.k, v, self.word_bits)
+
+    def _rewiden(self, k: int) -> None:
+        """Repacke tout le tableau sur k bits."""
+        values = self.tolist()
+        self.k = k
+        if self.kind == KIND_CROSSING:
+            self.words = kernels.pack(values, k) if values else new_words(0)
+        else:
+            self.cap = self.word_bits // k or 1
+            packer = BitPackingAligned(self.word_bits)
+            self.words = packer.pack_words(values, k, self.cap, self.word_bits)
+
+    # overflow
+
+    def _put_overflow(self, i: int, v: int) -> None:
+        s = self.s
+        if not v >> self.k_prime:
+            put_bits(self.words, i * s, s, v << 1)
+            return
+        if v.bit_length() > self.k_over:
+            self._rewiden_over(v.bit_length())
+        slot = read_bits(self.words, i * s, s)
+        if slot & 1:  # déjà un outlier : son entrée est réutilisée
+            idx = slot >> 1
+        else:
+            idx = self.m
+            self.m += 1
+            if idx.bit_length() > self.p:
+                self._reslot(idx.bit_length())
+        _reserve(self.over, ceil_div(self.m * self.k_over, WORD_BITS))
+        put_bits(self.over, idx * self.k_over, self.k_over, v)
+        put_bits(self.words, i * self.s, self.s, (idx << 1) | 1)
+        if self.m >= self._retune_at:
+            self._retune()
+
+    def _reslot(self, p: int) -> None:
+        """Index overflow sur p bits : les slots sont réécrits si 1 + max(k', p) grandit."""
+        self.p = p
+        s = 1 + max(self.k_prime, p)
+        if s == self.s:
+            return
+        slots = [0] * self.n
+        read_run(self.words, 0, self.s, slots, 0, self.n)
+        if s <= kernels.MAX_KERNEL_BITS:
+            words = kernels.pack(slots, s)
+        else:  # slot de 33 bits (k' = 32) : hors noyaux
+            words = new_words(ceil_div(self.n * s, WORD_BITS))
+            for i, slot in enumerate(slots):
+                write_bits(words, i * s, s, slot)
+        self.words, self.s = words, s
+
+    def _rewiden_over(self, k_over: int) -> None:
+        over = new_words(ceil_div(self.m * k_over, WORD_BITS))
+        for j in range(self.m):
+            write_bits(over, j * k_over, k_over, read_bits(self.over, j * self.k_over, self.k_over))
+        self.over, self.k_over = over, k_over
+
+    def _retune(self) -> None:
+        """Paramètres recalculés sur les valeurs courantes ; les entrées overflow mortes
+        disparaissent."""
+        values = self.tolist()
+        packer = BitPackingOverflow()
+        k_prime, p, k_over, _ = packer.choose_params(values)
+        self.words, self.over, self.m = packer.pack_zones(values, k_prime, p, k_over)
+        self.k_prime, self.p, self.k_over = k_prime, p, k_over
+        self.s = 1 + max(k_prime, p)
+        self._retune_at = max(2 * self.m, self.n // 2, RETUNE_MIN_OUTLIERS)
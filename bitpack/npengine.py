@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Sequence
+
+try:  # NumPy est optionnel : sans lui, les packers restent en Python pur
+    import numpy as np
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    np = None
+
+from .core import WORD_BITS, WORD_TYPECODE, Words, ceil_div
+
+HAVE_NUMPY = np is not None
+
+ENGINES = ("auto", "python", "numpy")
+
+def resolve_engine(engine: str) -> str:
+    """Retourne le moteur effectif ("python" ou "numpy") ; repli Python si NumPy absent."""
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine: {engine}")
+    if engine == "python" or not HAVE_NUMPY:
+        return "python"
+    return "numpy"
+
+def store(vals, out) -> None:
+    """Copie un ndarray uint32 dans out : liste (tolist), ou buffer u32 écrit par une vue
+    ndarray, sans liste intermédiaire."""
+    if isinstance(out, list):
+        out[:] = vals.tolist()
+    else:
+        np.frombuffer(out, dtype=np.uint32)[:] = vals
+
+def _period_layout(k: int) -> list[tuple[int, int]]:
+    """Pour chacune des 32 valeurs d'une période (32 valeurs = k mots) : (mot, décalage)."""
+    return [((j * k) // WORD_BITS, (j * k) % WORD_BITS) for j in range(WORD_BITS)]
+
+def pack_crossing(arr: Sequence[int], k: int) -> array:
+    """Compacte arr sur k bits (layout crossing, LSB-first) par opérations vectorisées.
+
+    Le tableau est découpé en périodes de 32 valeurs, qui occupent exactement k mots :
+    chaque position j de la période a un mot et un décalage constants, d'où 32 opérations
+    shift/or sur des colonnes entières. Le résultat est identique à la version Python.
+    """
+    n = len(arr)
+    vals = np.asarray(arr, dtype=np.int64)
+    if n and (int(vals.min()) < 0 or int(vals.max()) >= (1 << 32)):
+        raise ValueError("values must be 0 <= x < 2^32")
+    if n and int(vals.max()) >= (1 << k):
+        raise ValueError(f"value {int(vals.max())} exceeds {k} bits; use overflow variant")
+    periods = ceil_div(n, WORD_BITS)
+    cols = np.zeros(periods * WORD_BITS, dtype=np.uint64)
+    cols[:n] = vals
+    cols = cols.reshape(periods, WORD_BITS)
+    words = np.zeros((periods, k + 1), dtype=np.uint64)  # +1 : débordement du dernier slot
+    for j, (w, shift) in enumerate(_period_layout(k)):
+        v = cols[:, j] << np.uint64(shift)
+        words[:, w] |= v & np.uint64(0xFFFFFFFF)
+        words[:, w + 1] |= v >> np.uint64(WORD_BITS)
+    # la colonne k ne reçoit jamais de bits (une période finit pile sur une frontière de mot)
+    flat = words[:, :k].reshape(-1)
+    words_count = ceil_div(n * k, WORD_BITS)
+    return array(WORD_TYPECODE, flat[:words_count].astype(np.uint32).tobytes())
+
+def unpack_crossing(words: Words, n: int, k: int):
+    """Décompacte n valeurs de k bits (layout crossing) ; renvoie un ndarray uint32.
+
+    Les périodes forment une matrice (périodes × k mots) : chaque position j de la période
+    est extraite d'une seule colonne (mot, décalage constants), les 32 positions en une
+    indexation ; seules les positions à cheval ajoutent les bits du mot suivant.
+    """
+    periods = ceil_div(n, WORD_BITS)
+    buf = np.zeros(periods * k, dtype=np.uint32)
+    if isinstance(words, list):
+        src = np.asarray(words, dtype=np.uint32)
+    else:
+        src = np.frombuffer(words, dtype=np.uint32)  # vue sans copie sur array/memoryview
+    buf[: len(src)] = src[: len(buf)]
+    rows = buf.reshape(periods, k)
+    bits = np.arange(WORD_BITS) * k
+    cols = bits // WORD_BITS
+    shifts = (bits % WORD_BITS).astype(np.uint32)
+    out = rows[:, cols] >> shifts
+    # une valeur à cheval ne déborde jamais de sa période : mot suivant = colonne + 1 < k
+    crossing = shifts + k > WORD_BITS
+    if crossing.any():
+        out[:, crossing] |= rows[:, cols[crossing] + 1] << (np.uint32(WORD_BITS) - shifts[crossing])
+    if k < WORD_BITS:
+        out &= np.uint32((1 << k) - 1)
+    return out.reshape(-1)[:n]
+
+_FIELD_DTYPES = {8: "uint8", 16: "uint16", 32: "uint32"}
+
+def unpack_blocked(
+    words: Words, dir_words: int, block_size: int, b0: int, b1: int, aligned_variant: int
+):
+    """Décompacte les blocs [b0, b1) d'un PackedData blocked ; renvoie un ndarray uint32 de
+    (b1 - b0) * block_size valeurs (block_size multiple de 32, dernier bloc complété).
+
+    Les blocs sont groupés par entrée de répertoire (k | variante << 8) : un seul passage
+    vectorisé par groupe. Crossing : les blocs d'un même k, mis bout à bout, forment un flux
+    crossing (unpack_crossing) ; k = 8, 16, 32 : simple vue typée ; aligned : voies décalées.
+    """
+    if isinstance(words, list):
+        src = np.asarray(words, dtype=np.uint32)
+    else:
+        src = np.frombuffer(words, dtype=np.uint32)
+    directory = src[2 * b0:2 * b1].reshape(-1, 2)
+    bases = directory[:, 0].astype(np.int64) + dir_words
+    infos = directory[:, 1]
+    # lecture au-delà du dernier bloc (partiel) : mots à zéro
+    buf = np.zeros(len(src) + block_size, dtype=np.uint32)
+    buf[: len(src)] = src
+    out = np.zeros((b1 - b0, block_size), dtype=np.uint32)
+    for info in np.unique(infos).tolist():
+        k = info & 0xFF
+        if k == 0:
+            continue
+        sel = np.flatnonzero(infos == info)
+        if info >> 8 == aligned_variant and WORD_BITS % k:
+            cap = WORD_BITS // k
+            span = ceil_div(block_size, cap)
+            blocks = buf[bases[sel, None] + np.arange(span)]
+            shifts = np.arange(cap, dtype=np.uint32) * np.uint32(k)
+            lanes = (blocks[:, :, None] >> shifts) & np.uint32((1 << k) - 1)
+            out[sel] = lanes.reshape(len(sel), -1)[:, :block_size]
+            continue
+        span = block_size * k // WORD_BITS
+        blocks = buf[bases[sel, None] + np.arange(span)]
+        if k in _FIELD_DTYPES and sys.byteorder == "little":
+            out[sel] = blocks.view(_FIELD_DTYPES[k])
+        else:
+            vals = unpack_crossing(blocks.reshape(-1), len(sel) * block_size, k)
+            out[sel] = vals.reshape(len(sel), block_size)
+    return out.reshape(-1)
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, NamedTuple, Optional, Tuple
+
+from .core import WORD_BITS, WORD_TYPECODE, ceil_div, mask, read_bits, read_run
+from .cursor import iter_chunks
+from .factory import for_data
+from .header import (
+    KIND_ALIGNED,
+    KIND_CROSSING,
+    KIND_DICT,
+    KIND_ELIASFANO,
+    KIND_OVERFLOW,
+    KIND_OVERFLOW_RANK,
+    PackedData,
+)
+from .transform import TRANSFORM_FOR
+
+# Agrégats sur le PackedData, sans décompression. Pour crossing, aligned, overflow (deux
+# dispositions), dict et "for", la zone des valeurs est lue comme un seul entier Python
+# et traitée en SWAR : les champs pairs puis impairs (un bit de garde libre au-dessus de
+# chacun) sont comparés à un seuil d'un seul coup, ((F | H) - X) & H laissant le bit de
+# garde à 1 quand la valeur est >= seuil ; un popcount compte les champs. La somme se
+# fait plan de bits par plan de bits (popcount de chaque plan). Les outliers d'overflow
+# (rares) sont ajoutés un par un. Les autres variantes décodent par tranches (iter_chunks).
+
+def _stream(words, first: int, count: int) -> int:
+    """Entier des mots [first, first + count) (LSB-first, comme le flux de bits)."""
+    view = memoryview(words)[first:first + count]
+    if sys.byteorder == "little":
+        return int.from_bytes(view.cast("B"), "little")
+    swapped = array(view.format, view)
+    swapped.byteswap()
+    return int.from_bytes(swapped, "little")
+
+def _repeat(offsets: Tuple[int, ...], period: int, count: int) -> int:
+    """Bit à 1 au début de chacun des count premiers champs (période period, multiple de 8)."""
+    full, rest = divmod(count, len(offsets))
+    size = period // 8
+    pattern = sum(1 << o for o in offsets).to_bytes(size, "little")
+    tail = sum(1 << o for o in offsets[:rest]).to_bytes(size, "little")
+    return int.from_bytes(pattern * full + tail, "little")
+
+def _set_bits(x: int) -> List[int]:
+    """Positions des bits à 1 de x, croissantes (parcours par mots de 64 bits)."""
+    raw = array("Q", x.to_bytes(ceil_div(x.bit_length(), 64) * 8, "little"))
+    if sys.byteorder != "little":
+        raw.byteswap()
+    out = []
+    for w in itertools.compress(itertools.count(), raw):  # mots non nuls seulement (filtrage en C)
+        word = raw[w]
+        while word:
+            t = word & -word
+            out.append(w * 64 + t.bit_length() - 1)
+            word ^= t
+    return out
+
+class _Fields:
+    """count champs de k bits dans bits : le champ i commence au bit
+    (i // len(offsets)) * period + offsets[i % len(offsets)].
+
+    exclude : bits de garde (début du champ + k) des champs à ignorer (mis à zéro).
+    """
+
+    def __init__(
+        self, bits: int, period: int, offsets: Tuple[int, ...], k: int, count: int, exclude: int = 0
+    ):
+        if len(offsets) % 2 and offsets[-1] + k == period:
+            # aligned k = 32 : pas de bit libre au-dessus du champ, on groupe deux mots
+            offsets = offsets + tuple(period + o for o in offsets)
+            period *= 2
+        self.period, self.offsets, self.k, self.count = period, offsets, k, count
+        self.valid = count - exclude.bit_count()
+        self._slot = {o: j for j, o in enumerate(offsets)}
+        m = mask(k)
+        self._ones = []
+        self._fh = []
+        self._guard = []
+        fields = 0
+        for g in (0, 1):
+            group = offsets[g::2]
+            full, rest = divmod(count, len(offsets))
+            fields_in_group = full * len(group) + len(offsets[g:rest:2])
+            ones = _repeat(group, period, fields_in_group) if group else 0
+            self._ones.append(ones)
+            self._guard.append((ones << k) & ~exclude)
+            fields |= ones * m
+        bits &= fields
+        if exclude:
+            bits &= ~((exclude >> k) * m)
+        self._all_ones = self._ones[0] | self._ones[1]
+        self.bits = bits
+        for g in (0, 1):
+            self._fh.append((bits & (self._ones[g] * m)) | (self._ones[g] << k))
+
+    def _ge(self, g: int, x: int) -> int:
+        """Bits de garde des champs du groupe g dont la valeur est >= x."""
+        if x <= 0:
+            return self._guard[g]
+        if x >> self.k:
+            return 0
+        return (self._fh[g] - self._ones[g] * x) & self._guard[g]
+
+    def count_ge(self, x: int) -> int:
+        return self._ge(0, x).bit_count() + self._ge(1, x).bit_count()
+
+    def sum(self) -> int:
+        ones = self._all_ones
+        return sum((self.bits & (ones << b)).bit_count() << b for b in range(self.k))
+
+    def max(self) -> Optional[int]:
+        if not self.valid:
+            return None
+        v = 0
+        for b in reversed(range(self.k)):
+            if self._ge(0, v | 1 << b) or self._ge(1, v | 1 << b):
+                v |= 1 << b
+        return v
+
+    def min(self) -> Optional[int]:
+        if not self.valid:
+            return None
+        v = 0
+        for b in reversed(range(self.k)):
+            y = v | 1 << b
+            # aucun champ < y : le minimum est >= y
+            if self._ge(0, y) == self._guard[0] and self._ge(1, y) == self._guard[1]:
+                v = y
+        return v
+
+    def positions(self, lo: int, hi: int) -> List[int]:
+        """Indices (croissants) des champs de valeur dans [lo, hi]."""
+        hits = (self._ge(0, lo) & ~self._ge(0, hi + 1)) | (self._ge(1, lo) & ~self._ge(1, hi + 1))
+        fpp = len(self.offsets)
+        out = []
+        for p in _set_bits(hits):
+            q, r = divmod(p - self.k, self.period)
+            out.append(q * fpp + self._slot[r])
+        return out
+
+class _View(NamedTuple):
+    """Valeur i = codes[champ] (dict) ou champ + bias ; outliers : (position, valeur) hors champs,
+    valeur finale (bias compris)."""
+    fields: _Fields
+    outliers: List[Tuple[int, int]]
+    bias: int = 0
+    codes: Optional[memoryview] = None
+
+def _zero_fields(count: int, exclude: int = 0) -> _Fields:
+    """count champs de largeur nulle (valeur 0), un par bit."""
+    return _Fields(0, WORD_BITS, tuple(range(WORD_BITS)), 0, count, exclude)
+
+def _crossing_fields(
+    words, first_word: int, k: int, count: int, exclude: int = 0, word_bits: int = WORD_BITS
+) -> _Fields:
+    if k == 0:
+        return _zero_fields(count, exclude)
+    bits = _stream(words, first_word, ceil_div(count * k, word_bits))
+    return _Fields(bits, WORD_BITS * k, tuple(j * k for j in range(WORD_BITS)), k, count, exclude)
+
+def _overflow_inline(data: PackedData) -> Optional[_View]:
+    n, words = data.n, data.words
+    s = 1 + max(data.k_prime, data.p)
+    if s == 1:  # k' = p = 0 : au plus un outlier, pas de champ de valeur
+        return None
+    period = WORD_BITS * s
+    bits = _stream(words, 0, ceil_div(n * s, WORD_BITS)) & ((1 << (n * s)) - 1)
+    flags = bits & _repeat(tuple(j * s for j in range(WORD_BITS)), period, n)
+    fields = _Fields(bits, period, tuple(j * s + 1 for j in range(WORD_BITS)), s - 1, n, flags << s)
+    m = data.over_bits // data.k_over if data.k_over else 0
+    values = [0] * m
+    read_run(words, data.main_bits, data.k_over, values, 0, m)
+    # les outliers sont rangés dans l'ordre des positions : j-ème drapeau <-> j-ème valeur
+    return _View(fields, list(zip((p // s for p in _set_bits(flags)), values)))
+
+def _overflow_rank(data: PackedData) -> _View:
+    n, words, kp = data.n, data.words, data.k_prime
+    flag_words = ceil_div(n, WORD_BITS)
+    slot_word = flag_words + ceil_div(n, data.cap)
+    hb = data.k_over - kp
+    positions = _set_bits(_stream(words, 0, flag_words))
+    highs = [0] * len(positions)
+    read_run(words, data.main_bits, hb, highs, 0, len(positions))
+    outliers = [
+        (i, read_bits(words, slot_word * WORD_BITS + i * kp, kp) | (h << kp))
+        for i, h in zip(positions, highs)
+    ]
+    # outliers exclus des slots : bit de garde i * k' + k' (bit i si k' = 0)
+    exclude = bytearray(ceil_div(n * max(kp, 1) + kp + 1, 8))
+    for i in positions:
+        g = i * kp + kp if kp else i
+        exclude[g >> 3] |= 1 << (g & 7)
+    fields = _crossing_fields(words, slot_word, kp, n, int.from_bytes(exclude, "little"))
+    return _View(fields, outliers)
+
+def _view(data: PackedData) -> Optional[_View]:
+    """Vue SWAR de data, ou None (variante sans chemin direct)."""
+    if data.transform == TRANSFORM_FOR:
+        inner = _view(dataclasses.replace(data, transform=0, t_ref=0, t_interval=0, version=1))
+        if inner is None or inner.codes is not None:
+            return None
+        ref = data.t_ref
+        return inner._replace(bias=ref, outliers=[(i, v + ref) for i, v in inner.outliers])
+    if data.transform:
+        return None
+    k, n = data.k, data.n
+    if n == 0:
+        return _View(_zero_fields(0), [])
+    if data.kind == KIND_CROSSING:
+        return _View(_crossing_fields(data.words, 0, k, n, word_bits=data.word_bits), [])
+    if data.kind == KIND_ALIGNED:
+        if k == 0:
+            return _View(_zero_fields(n), [])
+        wb = data.word_bits
+        cap = data.cap or wb // k
+        bits = _stream(data.words, 0, ceil_div(n, cap))
+        return _View(_Fields(bits, wb, tuple(j * k for j in range(cap)), k, n), [])
+    if data.kind == KIND_OVERFLOW:
+        return _overflow_inline(data)
+    if data.kind == KIND_OVERFLOW_RANK:
+        return _overflow_rank(data)
+    if data.kind == KIND_DICT:
+        d = data.main_bits // WORD_BITS
+        codes = memoryview(data.words)[:d]
+        if k == 0:
+            return _View(_zero_fields(n), [], codes=codes)
+        body = memoryview(data.words)[d:]
+        if data.cap:
+            bits = _stream(body, 0, ceil_div(n, data.cap))
+            fields = _Fields(bits, WORD_BITS, tuple(j * k for j in range(data.cap)), k, n)
+        else:
+            fields = _crossing_fields(body, 0, k, n)
+        return _View(fields, [], codes=codes)
+    return None
+
+def _threshold(view: _View, x: int) -> int:
+    """Seuil sur les champs équivalent à « valeur >= x »."""
+    if view.codes is not None:
+        return bisect_left(view.codes, x)  # codes = rangs dans le dictionnaire trié
+    return x - view.bias
+
+def _decode(view: _View, field: int) -> int:
+    return view.codes[field] if view.codes is not None else field + view.bias
+
+def _count_ge(data: PackedData, x: int) -> int:
+    if data.kind == KIND_ELIASFANO and not data.transform:
+        return data.n - for_data(data).next_geq(x, data)[0]
+    view = _view(data)
+    if view is None:
+        return sum(1 for chunk in iter_chunks(data) for v in chunk if v >= x)
+    outliers = sum(v >= x for _, v in view.outliers)
+    return view.fields.count_ge(_threshold(view, x)) + outliers
+
+# --- API ---
+
+def packed_sum(data: PackedData) -> int:
+    """Somme des n valeurs."""
+    view = _view(data)
+    if view is None or view.codes is not None:
+        return sum(sum(chunk) for chunk in iter_chunks(data))
+    fields = view.fields
+    return fields.sum() + view.bias * fields.valid + sum(v for _, v in view.outliers)
+
+def _extreme(data: PackedData, largest: bool) -> int:
+    if data.n == 0:
+        raise ValueError(f"packed_{'max' if largest else 'min'}() of an empty packed array")
+    pick = max if largest else min
+    if data.kind == KIND_ELIASFANO and not data.transform:
+        return for_data(data).get(data.n - 1 if largest else 0, data)
+    view = _view(data)
+    if view is None:
+        return pick(pick(chunk) for chunk in iter_chunks(data))
+    if view.codes is not None:
+        # toutes les valeurs du dictionnaire sont présentes
+        return view.codes[len(view.codes) - 1 if largest else 0]
+    field = view.fields.max() if largest else view.fields.min()
+    candidates = [v for _, v in view.outliers]
+    if field is not None:
+        candidates.append(_decode(view, field))
+    return pick(candidates)
+
+def packed_min(data: PackedData) -> int:
+    """Plus petite valeur (ValueError si n = 0)."""
+    return _extreme(data, False)
+
+def packed_max(data: PackedData) -> int:
+    """Plus grande valeur (ValueError si n = 0)."""
+    return _extreme(data, True)
+
+def count_eq(data: PackedData, x: int) -> int:
+    """Nombre de valeurs égales à x."""
+    return _count_ge(data, x) - _count_ge(data, x + 1)
+
+def count_lt(data: PackedData, x: int) -> int:
+    """Nombre de valeurs < x."""
+    return data.n - _count_ge(data, x)
+
+def count_gt(data: PackedData, x: int) -> int:
+    """Nombre de valeurs > x."""
+    return _count_ge(data, x + 1)
+
+def filter_positions(data: PackedData, lo: int, hi: int) -> array:
+    """Positions (croissantes, array('I')) des valeurs comprises dans [lo, hi]."""
+    if lo > hi or data.n == 0:
+        return array(WORD_TYPECODE)
+    if data.kind == KIND_ELIASFANO and not data.transform:
+        reader = for_data(data)
+        a = reader.next_geq(lo, data)[0]
+        b = reader.next_geq(hi + 1, data)[0]
+        return array(WORD_TYPECODE, range(a, b))
+    view = _view(data)
+    if view is None:
+        out = array(WORD_TYPECODE)
+        pos = 0
+        for chunk in iter_chunks(data):
+            out.extend(pos + j for j, v in enumerate(chunk) if lo <= v <= hi)
+            pos += len(chunk)
+        return out
+    if view.codes is not None:
+        flo, fhi = bisect_left(view.codes, lo), bisect_right(view.codes, hi) - 1
+    else:
+        flo, fhi = lo - view.bias, hi - view.bias
+    hits = view.fields.positions(flo, fhi) if flo <= fhi else []
+    extra = [i for i, v in view.outliers if lo <= v <= hi]
+    if extra:
+        hits = sorted(hits + extra)
+    return array(WORD_TYPECODE, hits)
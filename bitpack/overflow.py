@@ -1,113 +1,321 @@
 from __future__ import annotations
-from typing import List, Tuple
+
+from array import array
+from collections import Counter
+from typing import List, MutableSequence, Optional, Sequence, Tuple
+
+from . import kernels
 from .core import (
-    WORD_BITS, ceil_div, bits_needed_unsigned, read_bits, write_bits, mask
+    WORD_BITS,
+    as_values,
+    batch_order,
+    batch_out,
+    bits_needed_unsigned,
+    buffer_output,
+    ceil_div,
+    check_indices,
+    check_range,
+    mask,
+    new_words,
+    or_bits,
+    read_bits,
+    write_bits,
 )
-from .header import PackedData, KIND_OVERFLOW
+from .crossing import BitPackingCrossing
+from .header import KIND_OVERFLOW, KIND_OVERFLOW_RANK, PackedData
+
+LAYOUTS = ("inline", "rank", "auto")
+# Disposition rank : un rang cumulé (u32) par super-bloc de RANK_SUPERBLOCK drapeaux
+RANK_SUPERBLOCK = 256
 
 def _log2_ceil(n: int) -> int:
     if n <= 1:
         return 0
     return (n - 1).bit_length()
 
+def width_histogram(arr: Sequence[int]) -> List[int]:
+    """hist[b] = nombre de valeurs de largeur exacte b bits (b dans 0..32), en une passe."""
+    hist = [0] * (WORD_BITS + 1)
+    for b, c in Counter(map(bits_needed_unsigned, arr)).items():
+        hist[b] = c
+    return hist
+
+def _cost(n: int, k_prime: int, m: int, k_over: int) -> Tuple[int, int, int, int]:
+    p = 0 if m <= 1 else _log2_ceil(m)
+    s = 1 + max(k_prime, p)
+    return (k_prime, p, k_over, n * s + m * k_over)
+
+def _rank_cost(n: int, k_prime: int, m: int, k_over: int) -> Tuple[int, int, int, int]:
+    """Disposition rank : drapeaux + répertoire (mots entiers), slots de k' bits, puis les
+    k_over - k' bits hauts de chaque exception (les k' bits bas restent dans le slot)."""
+    dir_words = ceil_div(n, WORD_BITS) + ceil_div(n, RANK_SUPERBLOCK)
+    return (k_prime, 0, k_over, dir_words * WORD_BITS + n * k_prime + m * (k_over - k_prime))
+
+def params_from_histogram(
+    hist: List[int], k_prime: int | None = None, layout: str = "inline"
+) -> Tuple[int, int, int, int]:
+    """(k_prime, p, k_over, cost_bits_total) depuis l'histogramme des largeurs.
+
+    m(k') = somme cumulée des hist[b] pour b > k' ; k_over = plus grande largeur présente
+    (c'est exactement bits_needed(max des valeurs en overflow)).
+    Si k_prime est donné, évalue ce seul k' ; sinon renvoie le premier k' de coût minimal.
+    layout choisit le modèle de coût : "inline" (index dans le slot) ou "rank".
+    """
+    _cost_fn = _rank_cost if layout == "rank" else _cost
+    n = sum(hist)
+    if n == 0:
+        return (0, 0, 0, 0)
+    kmax = max(b for b, c in enumerate(hist) if c)
+    if k_prime is not None:
+        m = sum(hist[k_prime + 1:])
+        return _cost_fn(n, k_prime, m, kmax if m else 0)
+    best = None
+    m = n - hist[0]  # nombre de valeurs de largeur > k', mis à jour de façon cumulative
+    for kp in range(0, min(WORD_BITS, kmax) + 1):
+        if kp > 0:
+            m -= hist[kp]
+        cand = _cost_fn(n, kp, m, kmax if m else 0)
+        if best is None or cand[3] < best[3]:
+            best = cand
+    return best  # type: ignore
+
 class BitPackingOverflow:
-    def __init__(self, word_bits: int = WORD_BITS, k_prime: int | None = None, auto_select: bool = True):
+    """Valeurs sur k' bits + zone de débordement pour les outliers.
+
+    layout="inline" (KIND_OVERFLOW) : slot de 1 + max(k', p) bits, drapeau en LSB puis
+    valeur ou index p bits de l'outlier dans la zone overflow.
+    layout="rank" (KIND_OVERFLOW_RANK) : vecteur de drapeaux + répertoire de rangs par
+    super-bloc, slots de k' bits (bits bas de toutes les valeurs), bits hauts des outliers
+    dans une zone dense adressée par rank(i) ; get reste en O(1).
+    layout="auto" : la disposition la moins coûteuse d'après choose_params.
+    """
+
+    def __init__(
+        self,
+        word_bits: int = WORD_BITS,
+        k_prime: int | None = None,
+        auto_select: bool = True,
+        sample_size: int | None = None,
+        layout: str = "inline",
+    ):
         if word_bits != 32:
             raise ValueError("only 32-bit words supported")
+        if layout not in LAYOUTS:
+            raise ValueError(f"unknown layout: {layout}")
         self.word_bits = word_bits
+        self.layout = layout
         self.k_prime_opt = k_prime
         self.auto_select = auto_select
+        # au-delà de sample_size valeurs, k' est estimé sur un échantillon régulier
+        self.sample_size = sample_size
 
-    def _choose_params(self, arr: List[int]) -> Tuple[int, int, int, int]:
-        """Retourne (k_prime, p, k_over, cost_bits_total) minimal."""
+    def choose_params(
+        self, arr: Sequence[int], layout: str | None = None
+    ) -> Tuple[int, int, int, int]:
+        """Retourne (k_prime, p, k_over, cost_bits_total) minimal pour layout
+        (défaut : self.layout)."""
+        layout = layout or self.layout
+        if layout == "auto":
+            return self._choose_layout(arr)[1]
         if not arr:
             return (0, 0, 0, 0)
-        vmax = max(arr)
-        kmax = bits_needed_unsigned(vmax)
         if self.k_prime_opt is not None and not self.auto_select:
             k_prime = max(0, min(self.k_prime_opt, 32))
-            # compute cost for this k'
-            over_vals = [x for x in arr if bits_needed_unsigned(x) > k_prime]
-            m = len(over_vals)
-            p = 0 if m <= 1 else _log2_ceil(m)
-            k_over = bits_needed_unsigned(max(over_vals) if over_vals else 0)
-            s = 1 + max(k_prime, p)
-            total = len(arr) * s + m * k_over
-            return (k_prime, p, k_over, total)
-
-        # auto search over 0..kmax
-        best = None
-        for k_prime in range(0, min(32, kmax) + 1):
-            over_vals = [x for x in arr if bits_needed_unsigned(x) > k_prime]
-            m = len(over_vals)
-            p = 0 if m <= 1 else _log2_ceil(m)
-            k_over = bits_needed_unsigned(max(over_vals) if over_vals else 0)
-            s = 1 + max(k_prime, p)
-            total = len(arr) * s + m * k_over
-            cand = (k_prime, p, k_over, total)
-            if best is None or cand[3] < best[3]:
-                best = cand
-        return best  # type: ignore
+            return params_from_histogram(width_histogram(arr), k_prime, layout)
+        n = len(arr)
+        if self.sample_size is None or n <= self.sample_size:
+            return params_from_histogram(width_histogram(arr), layout=layout)
+        # mode échantillonné : k' choisi sur arr[::step], puis p/k_over/coût exacts pour ce k'
+        step = ceil_div(n, max(self.sample_size, 1))
+        k_prime = params_from_histogram(width_histogram(arr[::step]), layout=layout)[0]
+        limit = 1 << k_prime
+        over_vals = [x for x in arr if x >= limit]
+        k_over = bits_needed_unsigned(max(over_vals)) if over_vals else 0
+        cost = _rank_cost if layout == "rank" else _cost
+        return cost(n, k_prime, len(over_vals), k_over)
+
+    def _choose_layout(self, arr: Sequence[int]) -> Tuple[str, Tuple[int, int, int, int]]:
+        """(disposition, paramètres) : self.layout, ou la moins coûteuse des deux si "auto"."""
+        if self.layout != "auto":
+            return self.layout, self.choose_params(arr, self.layout)
+        candidates = [(layout, self.choose_params(arr, layout)) for layout in ("inline", "rank")]
+        return min(candidates, key=lambda c: c[1][3])
 
     def compress(self, arr: List[int]) -> PackedData:
+        arr = as_values(arr)
         n = len(arr)
         if n == 0:
-            return PackedData(words=[], n=0, kind=KIND_OVERFLOW, k_prime=0, p=0, k_over=0, main_bits=0, over_bits=0)
+            if self.layout == "rank":
+                return PackedData(
+                    words=new_words(0), n=0, kind=KIND_OVERFLOW_RANK, cap=RANK_SUPERBLOCK,
+                    k_prime=0, p=0, k_over=0, main_bits=0, over_bits=0,
+                )
+            return PackedData(
+                words=new_words(0), n=0, kind=KIND_OVERFLOW,
+                k_prime=0, p=0, k_over=0, main_bits=0, over_bits=0,
+            )
 
         # validation
-        for x in arr:
-            if x < 0 or x >= (1 << 32):
-                raise ValueError("values must be 0 <= x < 2^32")
+        if min(arr) < 0 or max(arr) >= (1 << 32):
+            raise ValueError("values must be 0 <= x < 2^32")
 
-        k_prime, p, k_over, _ = self._choose_params(arr)
+        layout, (k_prime, p, k_over, _) = self._choose_layout(arr)
+        if layout == "rank":
+            return self._compress_rank(arr, k_prime, k_over)
+        s = 1 + max(k_prime, p)
+
+        main_words, over_words, m = self.pack_zones(arr, k_prime, p, k_over)
+        main_bits = n * s
+        over_bits = m * k_over
+        total_bits = main_bits + over_bits
+        words_count = ceil_div(total_bits, self.word_bits) if total_bits > 0 else 0
+        words = new_words(words_count)
+        words[:len(main_words)] = main_words
+        # zone overflow accolée au bit près derrière la zone principale
+        or_bits(words, main_bits, over_words, over_bits)
+
+        return PackedData(
+            words=words, n=n, kind=KIND_OVERFLOW,
+            k_prime=k_prime, p=p, k_over=k_over,
+            main_bits=main_bits, over_bits=over_bits
+        )
+
+    def pack_zones(
+        self, arr: Sequence[int], k_prime: int, p: int, k_over: int, base_idx: int = 0
+    ) -> Tuple[array, array, int]:
+        """Construit (mots zone principale, mots zone overflow, m) pour des paramètres imposés.
+
+        Chaque zone commence au bit 0 de son propre tableau. base_idx est l'indice overflow
+        du premier outlier de arr (non nul quand arr est une tranche d'un tableau plus grand).
+        """
         s = 1 + max(k_prime, p)
 
         # marque les positions overflow + construit le tableau overflow
         overflow_values: List[int] = []
-        overflow_index_per_pos: List[int] = [-1] * n
+        overflow_index_per_pos: List[int] = [-1] * len(arr)
         limit_inline = 1 << k_prime
         for i, x in enumerate(arr):
-            if bits_needed_unsigned(x) > k_prime:
-                overflow_index_per_pos[i] = len(overflow_values)
+            if x >= limit_inline:
+                overflow_index_per_pos[i] = base_idx + len(overflow_values)
                 overflow_values.append(x)
 
-        m = len(overflow_values)
-        main_bits = n * s
-        over_bits = m * k_over
-        total_bits = main_bits + over_bits
-        words_count = ceil_div(total_bits, self.word_bits) if total_bits > 0 else 0
-        words = [0] * words_count
-
         # écrire zone principale
-        bit_off = 0
+        slots = [0] * len(arr)
         for i, x in enumerate(arr):
             if overflow_index_per_pos[i] == -1:
                 # inline
-                slot = (x & mask(k_prime)) << 1  # flag=0 en LSB
+                slots[i] = (x & mask(k_prime)) << 1  # flag=0 en LSB
             else:
                 idx = overflow_index_per_pos[i]
                 if p == 0 and idx != 0:
                     # impossible si p==0, mais gardons le garde-fou
                     raise ValueError("internal: p==0 but multiple overflow indices")
-                slot = ( (idx & mask(p)) << 1 ) | 0x1  # flag=1
-            write_bits(words, bit_off, s, slot)
-            bit_off += s
+                slots[i] = ( (idx & mask(p)) << 1 ) | 0x1  # flag=1
+        if s <= kernels.MAX_KERNEL_BITS:
+            main_words = kernels.pack(slots, s)
+        else:  # slot de 33 bits (k' = 32) : hors noyaux
+            main_words = new_words(ceil_div(len(arr) * s, self.word_bits))
+            for i, slot in enumerate(slots):
+                write_bits(main_words, i * s, s, slot)
 
         # écrire zone overflow (valeurs brutes en k_over bits)
-        bit_off_over = main_bits
+        m = len(overflow_values)
+        over_words = new_words(ceil_div(m * k_over, self.word_bits))
+        bit_off_over = 0
         for v in overflow_values:
-            write_bits(words, bit_off_over, k_over, v)
+            write_bits(over_words, bit_off_over, k_over, v)
             bit_off_over += k_over
+        return main_words, over_words, m
 
+    def _compress_rank(self, arr: Sequence[int], k_prime: int, k_over: int) -> PackedData:
+        """Disposition rank : [drapeaux][rangs par super-bloc][slots k' bits]
+        [bits hauts outliers]."""
+        n = len(arr)
+        sb = RANK_SUPERBLOCK
+        flag_words = ceil_div(n, WORD_BITS)
+        words = new_words(flag_words + ceil_div(n, sb))
+        limit = 1 << k_prime
+        highs: List[int] = []
+        for i, x in enumerate(arr):
+            if x >= limit:
+                words[i >> 5] |= 1 << (i & 31)
+                highs.append(x >> k_prime)
+        # rang cumulé au début de chaque super-bloc
+        per_sb = sb // WORD_BITS
+        rank = 0
+        for b in range(len(words) - flag_words):
+            words[flag_words + b] = rank
+            rank += sum(w.bit_count() for w in words[b * per_sb:min((b + 1) * per_sb, flag_words)])
+        crossing = BitPackingCrossing()
+        if k_prime:
+            m = mask(k_prime)
+            words.extend(crossing.pack_words([x & m for x in arr], k_prime))
+        main_bits = (flag_words + ceil_div(n, sb)) * WORD_BITS + n * k_prime
+        high_bits = k_over - k_prime
+        over_bits = len(highs) * high_bits
+        words.extend(new_words(ceil_div(main_bits + over_bits, WORD_BITS) - len(words)))
+        if over_bits:
+            or_bits(words, main_bits, crossing.pack_words(highs, high_bits), over_bits)
         return PackedData(
-            words=words, n=n, kind=KIND_OVERFLOW,
-            k_prime=k_prime, p=p, k_over=k_over,
-            main_bits=main_bits, over_bits=over_bits
+            words=words, n=n, kind=KIND_OVERFLOW_RANK, cap=sb,
+            k_prime=k_prime, p=0, k_over=k_over, main_bits=main_bits, over_bits=over_bits,
         )
 
+    @staticmethod
+    def _rank(words, flag_words: int, sb: int, i: int) -> int:
+        """Nombre d'outliers avant i : rang du super-bloc + popcount des mots qui précèdent."""
+        r = words[flag_words + i // sb]
+        w = i >> 5
+        for j in range((i // sb) * (sb // WORD_BITS), w):
+            r += words[j].bit_count()
+        return r + (words[w] & ((1 << (i & 31)) - 1)).bit_count()
+
+    def _get_rank(self, i: int, data: PackedData) -> int:
+        words = data.words
+        kp = data.k_prime
+        flag_words = ceil_div(data.n, WORD_BITS)
+        slot_off = (flag_words + ceil_div(data.n, data.cap)) * WORD_BITS
+        low = read_bits(words, slot_off + i * kp, kp)
+        if not (words[i >> 5] >> (i & 31)) & 1:
+            return low
+        hb = data.k_over - kp
+        r = self._rank(words, flag_words, data.cap, i)
+        return low | (read_bits(words, data.main_bits + r * hb, hb) << kp)
+
+    def _decompress_range_rank(
+        self, start: int, stop: int, out: MutableSequence[int], data: PackedData
+    ) -> None:
+        """Slots lus en continu, puis bits hauts ajoutés en parcourant les drapeaux à 1."""
+        if start == stop:
+            return
+        words = data.words
+        kp = data.k_prime
+        flag_words = ceil_div(data.n, WORD_BITS)
+        slot_off = (flag_words + ceil_div(data.n, data.cap)) * WORD_BITS
+        kernels.unpack_into(words, kp, start, stop - start, out, slot_off // WORD_BITS)
+        hb = data.k_over - kp
+        off = data.main_bits + self._rank(words, flag_words, data.cap, start) * hb
+        w = start >> 5
+        word = (words[w] >> (start & 31)) << (start & 31)
+        while True:
+            while word:
+                t = word & -word
+                i = w * WORD_BITS + t.bit_length() - 1
+                if i >= stop:
+                    return
+                out[i - start] |= read_bits(words, off, hb) << kp
+                off += hb
+                word ^= t
+            w += 1
+            if w * WORD_BITS >= stop:
+                return
+            word = words[w]
+
     def get(self, i: int, data: PackedData) -> int:
         if i < 0 or i >= data.n:
             raise IndexError("index out of range")
+        if data.kind == KIND_OVERFLOW_RANK:
+            return self._get_rank(i, data)
         s = 1 + max(data.k_prime, data.p)
         slot = read_bits(data.words, i * s, s)
         flag = slot & 1
@@ -121,8 +329,76 @@ class BitPackingOverflow:
         bit_off_over = data.main_bits + idx * data.k_over
         return read_bits(data.words, bit_off_over, data.k_over)
 
+    def get_many(
+        self,
+        indices: Sequence[int],
+        data: PackedData,
+        out: Optional[MutableSequence[int]] = None,
+        sort: bool = False,
+    ) -> MutableSequence[int]:
+        """get(i) pour tout un lot : s = 1 + max(k', p) et les masques ne sont calculés
+        qu'une fois."""
+        check_indices(indices, data.n)
+        out = batch_out(out, len(indices))
+        if data.kind == KIND_OVERFLOW_RANK:
+            for j in batch_order(indices, sort):
+                out[j] = self._get_rank(indices[j], data)
+            return out
+        words = data.words
+        last = len(words) - 1
+        s = 1 + max(data.k_prime, data.p)
+        slot_mask = mask(s)
+        inline_mask = mask(data.k_prime)
+        idx_mask = mask(data.p)
+        k_over = data.k_over
+        main_bits = data.main_bits
+        cur_w = -1
+        window = 0
+        for j in batch_order(indices, sort):
+            off = indices[j] * s
+            w = off >> 5
+            if w != cur_w:
+                cur_w = w
+                window = words[w] | (words[w + 1] << 32) if w < last else words[w]
+            slot = (window >> (off & 31)) & slot_mask
+            if slot & 1 == 0:
+                out[j] = (slot >> 1) & inline_mask
+            elif k_over == 0:
+                out[j] = 0
+            else:
+                out[j] = read_bits(words, main_bits + ((slot >> 1) & idx_mask) * k_over, k_over)
+        return out
+
+    @buffer_output
+    def decompress_range(
+        self, start: int, stop: int, out: MutableSequence[int], data: PackedData
+    ) -> None:
+        """Décode [start, stop) dans out : slots lus en continu depuis le bit start*s."""
+        check_range(start, stop, data.n)
+        count = stop - start
+        if len(out) != count:
+            raise ValueError("output buffer length must equal stop - start")
+        if data.kind == KIND_OVERFLOW_RANK:
+            self._decompress_range_rank(start, stop, out, data)
+            return
+        s = 1 + max(data.k_prime, data.p)
+        words = data.words
+        slots = [0] * count  # slots jusqu'à 33 bits : tampon local plutôt que out
+        kernels.unpack_into(words, s, start, count, slots)
+        inline_mask = mask(data.k_prime)
+        idx_mask = mask(data.p)
+        k_over = data.k_over
+        main_bits = data.main_bits
+        for j, slot in enumerate(slots):
+            if slot & 1 == 0:
+                out[j] = (slot >> 1) & inline_mask
+            elif k_over == 0:
+                out[j] = 0
+            else:
+                out[j] = read_bits(words, main_bits + ((slot >> 1) & idx_mask) * k_over, k_over)
+
+    @buffer_output
     def decompress(self, out: List[int], data: PackedData) -> None:
         if len(out) != data.n:
             raise ValueError("output buffer length must equal n")
-        for i in range(data.n):
-            out[i] = self.get(i, data)
+        self.decompress_range(0, data.n, out, data)
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import dataclasses
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Sequence, Tuple
+
+from .aligned import BitPackingAligned
+from .core import (
+    WORD_BITS,
+    WORD_TYPECODE,
+    as_values,
+    bits_needed_unsigned,
+    ceil_div,
+    or_bits,
+    word_typecode,
+)
+from .crossing import BitPackingCrossing
+from .factory import create, for_data
+from .header import KIND_ALIGNED, KIND_CROSSING, KIND_OVERFLOW, PackedData
+from .overflow import BitPackingOverflow, params_from_histogram, width_histogram
+
+# Les tranches font un multiple de 32 valeurs : n*k bits tombe alors sur une frontière de
+# mot pour tout k, et chaque worker écrit ses mots directement dans la sortie partagée.
+# Seule la zone overflow (m*k_over bits après main_bits) est recollée au bit près.
+PARALLEL_KINDS = ("crossing", "aligned", "overflow")
+MIN_CHUNK_VALUES = 1 << 14
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Ouvre un segment partagé existant ; seul le processus parent le détruit (unlink).
+
+    Avant Python 3.13, l'ouverture l'enregistre aussi auprès du resource tracker, partagé
+    avec le parent : l'enregistrement est idempotent et l'unlink du parent le retire.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+def _u32_view(shm: shared_memory.SharedMemory, count: int) -> memoryview:
+    return shm.buf[: 4 * count].cast(WORD_TYPECODE)
+
+def _chunk_bounds(n: int, jobs: int, unit: int) -> List[Tuple[int, int]]:
+    """Découpe [0, n) en au plus `jobs` tranches dont la taille est un multiple de unit."""
+    size = ceil_div(ceil_div(n, jobs), unit) * unit
+    size = max(size, min(ceil_div(MIN_CHUNK_VALUES, unit) * unit, ceil_div(n, unit) * unit))
+    return [(a, min(a + size, n)) for a in range(0, n, size)]
+
+# --- workers (fonctions de module : sérialisables par le pool) ---
+
+def _hist_worker(in_name: str, n: int, a: int, b: int) -> List[int]:
+    shm = _attach(in_name)
+    try:
+        view = _u32_view(shm, n)
+        try:
+            return width_histogram(view[a:b])
+        finally:
+            view.release()
+    finally:
+        shm.close()
+
+def _pack_worker(
+    kind: str, in_name: str, n: int, out_name: str, out_count: int, a: int, b: int, params: tuple
+) -> Tuple[bytes, int]:
+    """Compacte arr[a:b] et écrit ses mots dans la sortie partagée.
+
+    Renvoie (mots de la zone overflow de la tranche, nb d'outliers) pour overflow, (b"", 0) sinon.
+    """
+    shm_in = _attach(in_name)
+    shm_out = _attach(out_name)
+    src = _u32_view(shm_in, n)
+    dst = _u32_view(shm_out, out_count)
+    chunk = src[a:b]
+    try:
+        over = b""
+        m = 0
+        if kind == "crossing":
+            (k, engine) = params
+            words = BitPackingCrossing(engine=engine).pack_words(chunk, k)
+            w0 = a * k // WORD_BITS
+        elif kind == "aligned":
+            (k, cap) = params
+            words = BitPackingAligned().pack_words(chunk, k, cap)
+            w0 = a // cap
+        else:
+            (k_prime, p, k_over, base_idx) = params
+            packer = BitPackingOverflow()
+            words, over_words, m = packer.pack_zones(chunk, k_prime, p, k_over, base_idx)
+            w0 = a * (1 + max(k_prime, p)) // WORD_BITS
+            over = over_words.tobytes()
+        dst[w0:w0 + len(words)] = words
+        return over, m
+    finally:
+        chunk.release()
+        src.release()
+        dst.release()
+        shm_in.close()
+        shm_out.close()
+
+def parallel_compress(kind: str, arr: Sequence[int], jobs: int, **opts) -> PackedData:
+    """Compresse arr sur `jobs` processus ; résultat identique à create(kind).compress(arr).
+
+    L'entrée et la sortie transitent par multiprocessing.shared_memory (pas de listes
+    sérialisées). Les autres kinds, les transformations, les mots de 64 bits, jobs <= 1 ou
+    les petits tableaux passent par la voie série.
+    """
+    arr = as_values(arr)
+    packer = create(kind, **opts)
+    n = len(arr)
+    transform = opts.get("transform", "none")
+    if kind == "auto" and transform == "none" and jobs > 1 and n >= 2 * MIN_CHUNK_VALUES:
+        kind = packer.choose(arr)  # auto transformé : BitPackingTransform, voie série
+        opts = packer.kind_opts(kind)
+        packer = create(kind, **opts)
+    # parallèle : crossing, aligned et overflow en disposition inline, mots de 32 bits,
+    # sans transformation
+    serial = kind not in PARALLEL_KINDS or transform != "none"
+    serial = serial or opts.get("layout", "inline") != "inline"
+    serial = serial or opts.get("word_bits", WORD_BITS) != WORD_BITS
+    if jobs <= 1 or serial or n < 2 * MIN_CHUNK_VALUES:
+        return packer.compress(arr)
+    if min(arr) < 0 or max(arr) >= (1 << 32):
+        raise ValueError("values must be 0 <= x < 2^32")
+
+    shm_in = shared_memory.SharedMemory(create=True, size=4 * n)
+    shm_out = None
+    try:
+        src = _u32_view(shm_in, n)
+        typed = isinstance(arr, array) and arr.typecode == WORD_TYPECODE
+        if isinstance(arr, memoryview) or typed:
+            src[:] = arr  # as_values : memoryview déjà au format u32
+        else:
+            src[:] = array(WORD_TYPECODE, arr)
+        src.release()
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            if kind == "crossing":
+                k = min(bits_needed_unsigned(max(arr)), 32)
+                if k == 0:
+                    return packer.compress(arr)
+                words_count = ceil_div(n * k, WORD_BITS)
+                bounds = _chunk_bounds(n, jobs, WORD_BITS)
+                params = [(k, packer.engine)] * len(bounds)
+                header = dict(k=k)
+            elif kind == "aligned":
+                k = min(bits_needed_unsigned(max(arr)), 32)
+                if k == 0:
+                    return packer.compress(arr)
+                cap = WORD_BITS // k or 1
+                words_count = ceil_div(n, cap)
+                bounds = _chunk_bounds(n, jobs, cap)
+                params = [(k, cap)] * len(bounds)
+                header = dict(k=k, cap=cap)
+            else:
+                # phase 1 : histogrammes des largeurs par tranche => paramètres globaux
+                bounds = _chunk_bounds(n, jobs, WORD_BITS)
+                futures = [pool.submit(_hist_worker, shm_in.name, n, a, b) for a, b in bounds]
+                hists = [f.result() for f in futures]
+                total = [sum(col) for col in zip(*hists)]
+                fixed = None
+                if packer.k_prime_opt is not None and not packer.auto_select:
+                    fixed = max(0, min(packer.k_prime_opt, 32))
+                elif packer.sample_size is not None and n > packer.sample_size:
+                    # même k' que la voie série, choisi sur l'échantillon arr[::step]
+                    step = ceil_div(n, max(packer.sample_size, 1))
+                    fixed = params_from_histogram(width_histogram(arr[::step]))[0]
+                k_prime, p, k_over, _ = params_from_histogram(total, fixed)
+                s = 1 + max(k_prime, p)
+                # indice overflow du premier outlier de chaque tranche (somme préfixe)
+                params = []
+                base_idx = 0
+                for hist in hists:
+                    params.append((k_prime, p, k_over, base_idx))
+                    base_idx += sum(hist[k_prime + 1:])
+                main_bits = n * s
+                over_bits = base_idx * k_over
+                words_count = ceil_div(main_bits + over_bits, WORD_BITS)
+                header = dict(
+                    k_prime=k_prime, p=p, k_over=k_over, main_bits=main_bits, over_bits=over_bits
+                )
+
+            shm_out = shared_memory.SharedMemory(create=True, size=max(4 * words_count, 1))
+            shm_out.buf[: 4 * words_count] = bytes(4 * words_count)
+            futures = [
+                pool.submit(
+                    _pack_worker, kind, shm_in.name, n, shm_out.name, words_count, a, b, prm
+                )
+                for (a, b), prm in zip(bounds, params)
+            ]
+            results = [f.result() for f in futures]
+
+        words = array(WORD_TYPECODE)
+        words.frombytes(shm_out.buf[: 4 * words_count])  # une copie en bloc
+        if kind == "overflow":
+            # recolle les zones overflow des tranches au bit près (décalages quelconques)
+            bit_off = header["main_bits"]
+            for over, m in results:
+                if m:
+                    over_words = array(WORD_TYPECODE)
+                    over_words.frombytes(over)
+                    or_bits(words, bit_off, over_words, m * header["k_over"])
+                    bit_off += m * header["k_over"]
+        kind_id = {
+            "crossing": KIND_CROSSING, "aligned": KIND_ALIGNED, "overflow": KIND_OVERFLOW,
+        }[kind]
+        return PackedData(words=words, n=n, kind=kind_id, **header)
+    finally:
+        shm_in.close()
+        shm_in.unlink()
+        if shm_out is not None:
+            shm_out.close()
+            shm_out.unlink()
+
+# --- décompression parallèle ---
+
+def _gil_enabled() -> bool:
+    is_enabled = getattr(sys, "_is_gil_enabled", None)  # CPython >= 3.13
+    return True if is_enabled is None else is_enabled()
+
+class SharedU32Array:
+    """Résultat de parallel_decompress : n valeurs u32 dans un buffer partagé, sans copie.
+
+    view est une memoryview 'I' ; numpy() en donne une vue ndarray. close() libère le
+    buffer (et détruit le segment de mémoire partagée le cas échéant).
+    """
+
+    def __init__(self, n: int, shm: shared_memory.SharedMemory | None = None):
+        self.n = n
+        self._shm = shm
+        raw = shm.buf[: 4 * n] if shm is not None else memoryview(bytearray(4 * n))
+        self.view = raw.cast(WORD_TYPECODE)
+        raw.release()
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i):
+        return self.view[i]
+
+    def numpy(self):
+        import numpy as np
+        return np.frombuffer(self.view, dtype=np.uint32)
+
+    def tolist(self) -> List[int]:
+        return self.view.tolist()
+
+    def close(self) -> None:
+        self.view.release()
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> "SharedU32Array":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def _decode_range(data: PackedData, dst: memoryview, a: int, b: int) -> None:
+    part = [0] * (b - a)
+    for_data(data).decompress_range(a, b, part, data)
+    dst[a:b] = array(WORD_TYPECODE, part)
+
+def _decode_worker(
+    words_name: str, words_count: int, fields: dict, out_name: str, n: int, a: int, b: int
+) -> None:
+    """Décode [a, b) des mots partagés vers la sortie partagée, départ direct au bon bit."""
+    shm_words = _attach(words_name)
+    shm_out = _attach(out_name)
+    word_bits = fields["word_bits"]
+    words = shm_words.buf[: words_count * word_bits // 8].cast(word_typecode(word_bits))
+    dst = _u32_view(shm_out, n)
+    try:
+        _decode_range(PackedData(words=words, **fields), dst, a, b)
+    finally:
+        words.release()
+        dst.release()
+        shm_words.close()
+        shm_out.close()
+
+def parallel_decompress(
+    data: PackedData, jobs: int, threads: bool | None = None
+) -> SharedU32Array:
+    """Décompresse data sur `jobs` workers dans un buffer u32 partagé.
+
+    [0, n) est découpé en plages contiguës ; chaque worker part directement de l'offset de
+    sa plage (decompress_range). Processus + shared_memory par défaut ; threads si
+    threads=True ou par défaut sur un CPython sans GIL (free-threaded).
+    """
+    n = data.n
+    if threads is None:
+        threads = not _gil_enabled()
+    step = max(ceil_div(n, max(jobs, 1)), 1)
+    bounds = [(a, min(a + step, n)) for a in range(0, n, step)]
+    if threads or jobs <= 1 or n < 2 * MIN_CHUNK_VALUES:
+        result = SharedU32Array(n)
+        if not threads or jobs <= 1:
+            for a, b in bounds:
+                _decode_range(data, result.view, a, b)
+            return result
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            for f in [pool.submit(_decode_range, data, result.view, a, b) for a, b in bounds]:
+                f.result()
+        return result
+
+    words_count = len(data.words)
+    size = words_count * data.word_bits // 8
+    shm_words = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    result = SharedU32Array(n, shared_memory.SharedMemory(create=True, size=max(4 * n, 1)))
+    try:
+        shm_words.buf[:size] = memoryview(data.words).cast("B")
+        fields = {
+            f.name: getattr(data, f.name) for f in dataclasses.fields(data)
+            if f.name not in ("words", "zone_block", "zone_map")  # zone map : inutile au décodage
+        }
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            out_name = result._shm.name
+            futures = [
+                pool.submit(_decode_worker, shm_words.name, words_count, fields, out_name, n, a, b)
+                for a, b in bounds
+            ]
+            for f in futures:
+                f.result()
+    except BaseException:
+        result.close()
+        raise
+    finally:
+        shm_words.close()
+        shm_words.unlink()
+    return result
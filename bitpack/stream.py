@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import BinaryIO, Callable, Iterator, Optional, Sequence, Tuple
+
+from .core import WORD_TYPECODE
+from .factory import create, for_data
+from .header import HEADER_SIZE, PackedData, frame_header_size, frame_size
+from .zonemap import add_zone_map
+
+# Un flux compressé est une suite de trames .bp complètes (en-tête + mots), une par
+# tranche de l'entrée : un fichier .bp classique est simplement un flux d'une trame.
+DEFAULT_CHUNK_VALUES = 1 << 16
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    """Lit jusqu'à `size` octets (plusieurs read() au besoin : pipes) ; moins seulement à EOF."""
+    parts = []
+    remaining = size
+    while remaining > 0:
+        part = f.read(remaining)
+        if not part:
+            break
+        parts.append(part)
+        remaining -= len(part)
+    return b"".join(parts)
+
+def read_u32_chunks(f: BinaryIO, chunk_values: int = DEFAULT_CHUNK_VALUES) -> Iterator[array]:
+    """Lit un flux u32 little-endian par tranches de chunk_values valeurs (array('I'))."""
+    if chunk_values <= 0:
+        raise ValueError("chunk_values must be positive")
+    while True:
+        raw = _read_exact(f, 4 * chunk_values)
+        if len(raw) % 4 != 0:
+            raise ValueError("input length is not a multiple of 4 bytes (u32)")
+        if not raw:
+            return
+        chunk = array(WORD_TYPECODE, raw)
+        if sys.byteorder != "little":
+            chunk.byteswap()
+        yield chunk
+        if len(raw) < 4 * chunk_values:
+            return
+
+def write_u32(f: BinaryIO, values: Sequence[int]) -> None:
+    """Écrit des valeurs en u32 little-endian en une seule écriture."""
+    typed = isinstance(values, (array, memoryview)) and values.itemsize == 4
+    if sys.byteorder == "little" and typed:
+        f.write(values)  # déjà au bon format : pas de copie
+        return
+    buf = array(WORD_TYPECODE, values)
+    if sys.byteorder != "little":
+        buf.byteswap()
+    f.write(buf)
+
+def compress_stream(
+    src: BinaryIO,
+    dst: BinaryIO,
+    kind: str = "blocked",
+    chunk_values: int = DEFAULT_CHUNK_VALUES,
+    zone_block: int = 0,
+    **opts,
+) -> Tuple[int, int]:
+    """Compresse un flux u32 en trames indépendantes ; mémoire bornée par chunk_values.
+
+    Retourne (nombre de valeurs, nombre de trames). Une entrée vide produit une trame vide.
+    zone_block > 0 ajoute à chaque trame sa zone map (blocs de zone_block valeurs).
+    """
+    packer = create(kind, **opts)
+    n = 0
+    frames = 0
+    for chunk in read_u32_chunks(src, chunk_values):
+        frame = packer.compress(chunk)
+        if zone_block:
+            frame = add_zone_map(frame, zone_block, chunk)
+        frame.write_to(dst)
+        n += len(chunk)
+        frames += 1
+    if frames == 0:
+        packer.compress([]).write_to(dst)
+        frames = 1
+    return n, frames
+
+def iter_frames(src: BinaryIO) -> Iterator[PackedData]:
+    """Lit les trames d'un flux .bp une par une (une seule trame en mémoire)."""
+    while True:
+        head = _read_exact(src, HEADER_SIZE)
+        if not head:
+            return
+        head += _read_exact(src, frame_header_size(head) - HEADER_SIZE)  # extensions v2/v3
+        size = frame_size(head)
+        body = _read_exact(src, size - len(head))
+        if len(body) != size - len(head):
+            raise ValueError("truncated frame in packed stream")
+        yield PackedData.from_bytes(head + body)
+
+def decompress_stream(
+    src: BinaryIO, dst: BinaryIO, check: Optional[Callable[[PackedData], None]] = None
+) -> int:
+    """Décompresse un flux de trames vers dst au fil de l'eau ; renvoie le nombre de valeurs.
+    check(frame), s'il est donné, est appelé sur chaque trame avant son décodage."""
+    n = 0
+    for frame in iter_frames(src):
+        if check:
+            check(frame)
+        out = [0] * frame.n
+        for_data(frame).decompress(out, frame)
+        write_u32(dst, out)
+        n += frame.n
+    return n
@@ -1,13 +1,15 @@
 from __future__ import annotations
+
 import gc
+import random
 import statistics
 import time
-import random
 from dataclasses import dataclass
 from typing import Callable, Iterable, List, Tuple
 
-from .header import PackedData
 from .factory import create
+from .header import PackedData
+
 
 @dataclass
 class Stats:
@@ -16,7 +18,10 @@ class Stats:
     mean_ns: float
     stdev_ns: float
 
-def _time_repeated(fn: Callable[[], None], warmups: int = 3, repeats: int = 10, disable_gc: bool = True) -> Stats:
+def time_repeated(
+    fn: Callable[[], None], warmups: int = 3, repeats: int = 10, disable_gc: bool = True
+) -> Stats:
+    """Chronomètre fn : warmups appels à blanc puis repeats échantillons (ns), GC coupé."""
     if disable_gc:
         gc_was_enabled = gc.isenabled()
         gc.disable()
@@ -53,15 +58,17 @@ def total_time_without_compression(n: int, bandwidth_mbps: float, latency_ms: fl
     return (latency_ms / 1000.0) + bits_to_seconds(S_raw_bits, bandwidth_mbps)
 
 def total_time_with_compression(
-    packed: PackedData,
-    t_comp_ns: int,
-    t_decomp_ns: int,
+    packed: PackedData | int,
+    t_comp_ns: int | float,
+    t_decomp_ns: int | float,
     bandwidth_mbps: float,
     latency_ms: float,
 ) -> float:
-    """T_yes = t + T_comp + S_comp/B + T_decomp ; S_comp = taille totale du payload compressé (header + mots)."""
-    payload_bits = len(packed.to_bytes()) * 8
-    return (latency_ms / 1000.0) + ns_to_s(t_comp_ns) + bits_to_seconds(payload_bits, bandwidth_mbps) + ns_to_s(t_decomp_ns)
+    """T_yes = t + T_comp + S_comp/B + T_decomp ; S_comp = taille totale du payload compressé
+    (header + mots), ou directement sa taille en bits si packed est un entier (estimation)."""
+    payload_bits = packed if isinstance(packed, int) else len(packed.to_bytes()) * 8
+    transfer_s = bits_to_seconds(payload_bits, bandwidth_mbps)
+    return (latency_ms / 1000.0) + ns_to_s(t_comp_ns) + transfer_s + ns_to_s(t_decomp_ns)
 
 def compression_ratio(packed: PackedData, n: int) -> float:
     S_raw_bits = 32 * n
@@ -75,6 +82,7 @@ def bench_pack(
     repeats: int = 10,
     get_samples: int | None = None,
     seed: int = 12345,
+    **opts,
 ):
     """
     Mesure :
@@ -82,13 +90,14 @@ def bench_pack(
       - T_decomp (ns),
       - T_get_rand (ns par accès moyen) sur M accès aléatoires.
     Retourne (packed_ref, stats_comp, stats_decomp, avg_get_ns).
+    Les options supplémentaires (ex. engine="numpy") sont transmises à create().
     """
-    packer = create(kind)
+    packer = create(kind, **opts)
 
     # 1) Mesurer compress (repeats fois)
     def _do_compress() -> None:
         _ = packer.compress(arr)
-    stats_comp = _time_repeated(_do_compress, warmups=warmups, repeats=repeats, disable_gc=True)
+    stats_comp = time_repeated(_do_compress, warmups=warmups, repeats=repeats, disable_gc=True)
 
     # 2) Obtenir un PackedData de référence (hors mesures) pour chronométrer get & decompress
     packed_ref = packer.compress(arr)
@@ -97,7 +106,7 @@ def bench_pack(
     out = [0] * len(arr)
     def _do_decompress() -> None:
         packer.decompress(out, packed_ref)
-    stats_decomp = _time_repeated(_do_decompress, warmups=warmups, repeats=repeats, disable_gc=True)
+    stats_decomp = time_repeated(_do_decompress, warmups=warmups, repeats=repeats, disable_gc=True)
 
     # 4) Mesurer get(i) aléatoire, M accès
     n = len(arr)
@@ -110,9 +119,11 @@ def bench_pack(
         t0 = time.perf_counter_ns()
         s = 0
         for i in idxs:
-            s ^= packer.get(i, packed_ref)  # contrer "optimisation" du CPU (trivial en Python, mais on xore)
+            # contrer "optimisation" du CPU (trivial en Python, mais on xore)
+            s ^= packer.get(i, packed_ref)
         t1 = time.perf_counter_ns()
-        # on "utilise" s pour éviter qu'il ne soit optimisé (il ne le sera pas en CPython, mais par hygiène)
+        # on "utilise" s pour éviter qu'il ne soit optimisé
+        # (il ne le sera pas en CPython, mais par hygiène)
         if s == -1:
             print("", end="")  # no-op
         avg_get_ns = (t1 - t0) / M
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import dataclasses
+from itertools import accumulate, islice
+from typing import Iterator, List, MutableSequence, Optional, Sequence
+
+from .base import BitPacking
+from .core import (
+    U32_MASK,
+    as_values,
+    batch_order,
+    batch_out,
+    buffer_output,
+    ceil_div,
+    check_indices,
+    check_range,
+    new_words,
+)
+from .header import PackedData
+
+# Transformations appliquées avant le packing (champ transform de l'en-tête v2)
+TRANSFORM_NONE = 0
+TRANSFORM_FOR = 1      # frame-of-reference : x - min (t_ref = min)
+TRANSFORM_DELTA = 2    # x[i] - x[i-1]
+TRANSFORM_DELTA2 = 3   # delta de delta : (x[i] - x[i-1]) - (x[i-1] - x[i-2])
+
+TRANSFORM_NAMES = {
+    TRANSFORM_NONE: "none",
+    TRANSFORM_FOR: "for",
+    TRANSFORM_DELTA: "delta",
+    TRANSFORM_DELTA2: "delta2",
+}
+
+DEFAULT_CHECKPOINT_INTERVAL = 128
+
+def zigzag(d: int) -> int:
+    """u32 lu comme un entier signé 32 bits -> u32 (petits |d| => petites valeurs)."""
+    return ((d << 1) ^ -(d >> 31)) & U32_MASK
+
+def unzigzag(z: int) -> int:
+    """Inverse de zigzag ; renvoie l'entier signé."""
+    return (z >> 1) ^ -(z & 1)
+
+def _checkpoint_words(transform: int) -> int:
+    """Mots par checkpoint : x (delta), x et le delta entrant (delta2)."""
+    return {TRANSFORM_DELTA: 1, TRANSFORM_DELTA2: 2}.get(transform, 0)
+
+class BitPackingTransform:
+    """Applique une transformation puis compacte les résidus avec un packer interne.
+
+    "for" soustrait le minimum (gardé dans t_ref). "delta"/"delta2" stockent des différences
+    (modulo 2^32, en zigzag) et un checkpoint toutes les t_interval valeurs, placé avant les
+    mots du packer interne : get(i) repart du checkpoint i // t_interval et ne décode au
+    plus que t_interval résidus. Le PackedData garde le kind et les paramètres du packer
+    interne ; l'en-tête passe en v2.
+    """
+
+    def __init__(
+        self,
+        inner: BitPacking,
+        transform: str = "for",
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    ):
+        ids = {name: t for t, name in TRANSFORM_NAMES.items()}
+        if transform not in ids or ids[transform] == TRANSFORM_NONE:
+            raise ValueError(f"unknown transform: {transform}")
+        if checkpoint_interval <= 0:
+            raise ValueError("checkpoint_interval must be positive")
+        if getattr(inner, "word_bits", 32) != 32:
+            raise ValueError("transforms require 32-bit words")
+        self.inner = inner
+        self.transform = ids[transform]
+        self.checkpoint_interval = checkpoint_interval
+        self._cache: tuple = (None, None)
+
+    # --- compression ---
+
+    def compress(self, arr: Sequence[int]) -> PackedData:
+        arr = as_values(arr)
+        n = len(arr)
+        if n and (min(arr) < 0 or max(arr) >= (1 << 32)):
+            raise ValueError("values must be 0 <= x < 2^32")
+        t = self.transform
+        ref = interval = 0
+        ckpts = new_words(0)
+        if t == TRANSFORM_FOR:
+            ref = min(arr) if n else 0
+            residuals = [x - ref for x in arr]
+        else:
+            interval = self.checkpoint_interval
+            residuals, ckpts = self._deltas(arr, interval)
+        inner = self.inner.compress(residuals)
+        ckpts.extend(inner.words)
+        return dataclasses.replace(
+            inner, words=ckpts, transform=t, t_ref=ref, t_interval=interval
+        )
+
+    def _deltas(self, arr: Sequence[int], interval: int) -> tuple:
+        """Résidus zigzag et checkpoints ; le résidu 0 vaut 0 (valeur dans le checkpoint)."""
+        delta2 = self.transform == TRANSFORM_DELTA2
+        residuals = [0] * len(arr)
+        ckpts = new_words(0)
+        prev = arr[0] if len(arr) else 0
+        # delta "entrant" de l'indice 0 : on prend celui de l'indice 1 (résidu 1 nul en delta2)
+        first_d = (arr[1] - arr[0]) & U32_MASK if len(arr) > 1 else 0
+        prev_d = first_d
+        for i, x in enumerate(arr):
+            d = (x - prev) & U32_MASK if i else first_d
+            if i % interval == 0:
+                ckpts.append(x)
+                if delta2:
+                    ckpts.append(d)
+            if i:
+                residuals[i] = zigzag((d - prev_d) & U32_MASK if delta2 else d)
+            prev, prev_d = x, d
+        return residuals, ckpts
+
+    # --- lecture ---
+
+    def _inner_data(self, data: PackedData) -> PackedData:
+        """PackedData du packer interne : vue sur les mots qui suivent les checkpoints."""
+        cached, inner = self._cache
+        if cached is data:
+            return inner
+        skip = 0
+        if data.t_interval:
+            skip = ceil_div(data.n, data.t_interval) * _checkpoint_words(data.transform)
+        inner = dataclasses.replace(
+            data, words=memoryview(data.words)[skip:], transform=0, t_ref=0, t_interval=0, version=1
+        )
+        self._cache = (data, inner)
+        return inner
+
+    def _values(self, data: PackedData, base: int, residuals: List[int]) -> Iterator[int]:
+        """Valeurs depuis l'indice base (multiple de t_interval) ; residuals[0] est ignoré."""
+        b = base // data.t_interval
+        deltas = [(z >> 1) ^ -(z & 1) for z in islice(residuals, 1, None)]
+        if data.transform == TRANSFORM_DELTA:
+            x0 = data.words[b]
+        else:
+            x0 = data.words[2 * b]
+            deltas = accumulate(deltas, initial=data.words[2 * b + 1])
+            next(deltas)
+        return accumulate(deltas, initial=x0)
+
+    def get(self, i: int, data: PackedData) -> int:
+        if i < 0 or i >= data.n:
+            raise IndexError("index out of range")
+        inner = self._inner_data(data)
+        if data.transform == TRANSFORM_FOR:
+            return self.inner.get(i, inner) + data.t_ref
+        base = i - i % data.t_interval
+        residuals = [0] * (i + 1 - base)
+        self.inner.decompress_range(base, i + 1, residuals, inner)
+        *_, x = self._values(data, base, residuals)
+        return x & U32_MASK
+
+    def get_many(
+        self,
+        indices: Sequence[int],
+        data: PackedData,
+        out: Optional[MutableSequence[int]] = None,
+        sort: bool = False,
+    ) -> MutableSequence[int]:
+        check_indices(indices, data.n)
+        out = batch_out(out, len(indices))
+        if data.transform == TRANSFORM_FOR:
+            self.inner.get_many(indices, self._inner_data(data), out, sort)
+            for j in range(len(indices)):
+                out[j] += data.t_ref
+            return out
+        for j in batch_order(indices, sort):
+            out[j] = self.get(indices[j], data)
+        return out
+
+    @buffer_output
+    def decompress_range(
+        self, start: int, stop: int, out: MutableSequence[int], data: PackedData
+    ) -> None:
+        """Décode [start, stop) ; en delta, repart du checkpoint qui précède start."""
+        check_range(start, stop, data.n)
+        if len(out) != stop - start:
+            raise ValueError("output buffer length must equal stop - start")
+        inner = self._inner_data(data)
+        if data.transform == TRANSFORM_FOR:
+            self.inner.decompress_range(start, stop, out, inner)
+            ref = data.t_ref
+            for j in range(stop - start):
+                out[j] += ref
+            return
+        if start == stop:
+            return
+        base = start - start % data.t_interval
+        residuals = [0] * (stop - base)
+        self.inner.decompress_range(base, stop, residuals, inner)
+        values = islice(self._values(data, base, residuals), start - base, None)
+        out[:] = [x & U32_MASK for x in values]
+
+    @buffer_output
+    def decompress(self, out: List[int], data: PackedData) -> None:
+        if len(out) != data.n:
+            raise ValueError("output buffer length must equal n")
+        self.decompress_range(0, data.n, out, data)
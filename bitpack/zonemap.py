@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import dataclasses
+from array import array
+from typing import Optional, Sequence
+
+from .base import BitPacking
+from .core import WORD_TYPECODE, new_words
+from .cursor import iter_chunks
+from .factory import for_data
+from .header import PackedData
+
+# Zone map : (min, max) de chaque bloc de zone_block valeurs, stockée après l'en-tête
+# (v3). scan_range saute les blocs dont [min, max] ne rencontre pas [lo, hi], prend les
+# blocs entièrement compris sans les décoder et ne décode (decompress_range) que les autres.
+DEFAULT_ZONE_BLOCK = 1024
+
+def add_zone_map(
+    data: PackedData, zone_block: int = DEFAULT_ZONE_BLOCK, values: Optional[Sequence[int]] = None
+) -> PackedData:
+    """Copie de data avec sa zone map (mots partagés). values : valeurs d'origine si on les
+    a encore (évite le décodage)."""
+    if zone_block <= 0:
+        raise ValueError("zone_block must be positive")
+    zones = new_words(0)
+    if values is not None:
+        if len(values) != data.n:
+            raise ValueError("values length must equal n")
+        blocks = (values[a:a + zone_block] for a in range(0, data.n, zone_block))
+    else:
+        blocks = iter_chunks(data, chunk_values=zone_block)
+    for block in blocks:
+        zones.append(min(block))
+        zones.append(max(block))
+    return dataclasses.replace(data, zone_block=zone_block, zone_map=zones)
+
+def scan_range(
+    data: PackedData, lo: int, hi: int, packer: Optional[BitPacking] = None
+) -> array:
+    """Positions (croissantes, array('I')) des valeurs comprises dans [lo, hi].
+
+    Sans zone map, tout le tableau est décodé par tranches.
+    """
+    out = array(WORD_TYPECODE)
+    n = data.n
+    if lo > hi or n == 0:
+        return out
+    if packer is None:
+        packer = for_data(data)
+    if not data.zone_block:
+        pos = 0
+        for chunk in iter_chunks(data, packer=packer):
+            out.extend(pos + j for j, v in enumerate(chunk) if lo <= v <= hi)
+            pos += len(chunk)
+        return out
+    b = data.zone_block
+    zones = data.zone_map
+    part = [0] * b
+    for j in range(data.zone_count):
+        zmin, zmax = zones[2 * j], zones[2 * j + 1]
+        if zmax < lo or zmin > hi:
+            continue
+        a = j * b
+        e = min(a + b, n)
+        if lo <= zmin and zmax <= hi:
+            out.extend(range(a, e))
+            continue
+        if e - a != len(part):
+            part = [0] * (e - a)
+        packer.decompress_range(a, e, part, data)
+        out.extend(a + i for i, v in enumerate(part) if lo <= v <= hi)
+    return out
@@ -1,6 +1,7 @@
 from bitpack.aligned import BitPackingAligned
 from bitpack.header import KIND_ALIGNED
 
+
 def test_aligned_basic_k12():
     arr = [1, 2, 3, 4095, 4, 5]
     p = BitPackingAligned()
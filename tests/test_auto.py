@@ -0,0 +1,102 @@
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from bitpack.auto import CANDIDATES, BitPackingAuto, choose_kind, estimate_payload_bits, profile
+from bitpack.factory import create, for_kind
+from bitpack.header import KIND_NAMES, PackedData
+from bitpack.scenarios import skewed, uniform_u32
+
+
+def _locally_narrow(n, seed=5):
+    rnd = random.Random(seed)
+    arr = []
+    while len(arr) < n:
+        k = rnd.choice([1, 4, 12, 24])
+        arr.extend(rnd.randrange(1 << k) for _ in range(500))
+    return arr[:n]
+
+DATASETS = {
+    "uniform": uniform_u32(3000, 11),
+    "skewed": skewed(3000, 5, 28, 0.01),
+    "narrow": _locally_narrow(3000),
+    "zeros": [0] * 100,
+    "sorted": sorted(uniform_u32(3000, 24)),
+    "enum": [(x * 2654435761) & 0xFFFFFFFF for x in uniform_u32(3000, 7)],
+}
+
+@pytest.mark.parametrize("name", sorted(DATASETS))
+@pytest.mark.parametrize("kind", CANDIDATES)
+def test_estimate_matches_actual_size(name, kind):
+    arr = DATASETS[name]
+    if kind == "eliasfano" and not profile(arr).monotone:
+        pytest.skip("eliasfano needs sorted input")
+    prof = profile(arr)
+    actual = 8 * len(create(kind).compress(arr).to_bytes())
+    if kind == "dict" and prof.distinct_capped:
+        # cardinalité plafonnée : borne inférieure, dict n'est plus candidat
+        assert prof.distinct < len(set(arr)) and estimate_payload_bits(prof, "crossing") < actual
+        assert estimate_payload_bits(prof, kind) <= actual
+        assert choose_kind(prof, candidates=("crossing", "dict")) == "crossing"
+        return
+    assert estimate_payload_bits(prof, kind) == actual
+
+def test_profile_single_pass():
+    arr = [3, 3, 9, 200, 7, 7]
+    prof = profile(arr, block_size=4)
+    assert prof.max_value == 200 and prof.kmax == 8 and not prof.monotone
+    assert prof.block_widths == [(8, 4), (3, 2)]
+    assert prof.hist[2] == 2 and prof.hist[8] == 1 and sum(prof.hist) == len(arr)
+    assert prof.distinct == 4 and not prof.distinct_capped
+    assert profile([0] * 50 + [9, 4]).distinct == 3
+    # dict perdu d'avance : le comptage s'arrête dès que dictionnaire + codes dépassent n mots
+    ramp = profile(list(range(1000)))
+    assert ramp.monotone and ramp.distinct_capped and ramp.distinct < 1000
+
+def test_choice_follows_objective():
+    assert choose_kind(profile(DATASETS["skewed"]), "size") == "overflow_rank"
+    some = ("crossing", "overflow", "blocked")
+    assert choose_kind(profile(DATASETS["skewed"]), "size", candidates=some) == "overflow"
+    assert choose_kind(profile(DATASETS["narrow"]), "size") == "blocked"
+    assert choose_kind(profile(DATASETS["uniform"]), "get") == "aligned"
+    assert choose_kind(profile(DATASETS["sorted"]), "size") == "eliasfano"
+    assert choose_kind(profile(DATASETS["enum"]), "size") == "dict"
+    # lien très rapide : la taille ne compte plus, le coût CPU l'emporte
+    assert choose_kind(profile(DATASETS["skewed"]), "t_yes", bandwidth_mbps=1e6) == "crossing"
+    with pytest.raises(ValueError):
+        choose_kind(profile([1]), "speed")
+
+@pytest.mark.parametrize("name", sorted(DATASETS))
+def test_auto_roundtrip_through_header(name):
+    arr = DATASETS[name]
+    p = BitPackingAuto()
+    data = PackedData.from_bytes(p.compress(arr).to_bytes())
+    assert KIND_NAMES[data.kind] == p.last_choice
+    reader = for_kind(data.kind)
+    assert [reader.get(i, data) for i in range(len(arr))] == arr
+    out = [0] * len(arr)
+    create("auto").decompress(out, data)
+    assert out == arr
+
+def test_cli_auto_without_format_on_read(tmp_path):
+    arr = DATASETS["skewed"]
+    raw = tmp_path / "in.u32"
+    raw.write_bytes(b"".join(x.to_bytes(4, "little") for x in arr))
+    packed = tmp_path / "out.bp"
+    cmd = [sys.executable, "-m", "bitpack.cli"]
+    root = Path(__file__).resolve().parents[1]
+    subprocess.run(
+        cmd + ["compress", "--input", str(raw), "--format", "auto", "--out", str(packed)],
+        check=True, cwd=root,
+    )
+    got = subprocess.run(cmd + ["get", "--file", str(packed), "--index", "123"],
+                         check=True, capture_output=True, text=True, cwd=root)
+    assert int(got.stdout) == arr[123]
+    back = tmp_path / "back.u32"
+    subprocess.run(
+        cmd + ["decompress", "--file", str(packed), "--out", str(back)], check=True, cwd=root
+    )
+    assert back.read_bytes() == raw.read_bytes()
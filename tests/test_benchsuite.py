@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from bitpack import benchsuite
+from bitpack.benchsuite import OPS, compare, load_results, parse_int_list, run_suite, write_results
+from bitpack.cli import main
+
+
+@pytest.fixture(autouse=True)
+def _fast(monkeypatch):
+    monkeypatch.setattr(benchsuite, "MIN_SAMPLE_NS", 0)
+
+def test_parse_int_list():
+    assert parse_int_list("1-4,16") == [1, 2, 3, 4, 16]
+    assert parse_int_list("32") == [32]
+
+def test_run_suite_matrix():
+    rows = run_suite(["crossing", "eliasfano"], [5, 32], [300], ["uniform", "skewed", "sorted"],
+                     warmups=0, repeats=1, get_samples=50)
+    cases = {(r["format"], r["scenario"], r["k"]) for r in rows}
+    # eliasfano : données triées seulement ; skewed : sans objet à k = 32
+    assert ("eliasfano", "uniform", 5) not in cases and ("eliasfano", "sorted", 32) in cases
+    assert ("crossing", "skewed", 32) not in cases and ("crossing", "skewed", 5) in cases
+    assert len(rows) == len(cases) * len(OPS)
+    assert all(r["values_per_s"] > 0 for r in rows)
+    assert all(r["mb_per_s"] == pytest.approx(4 * r["values_per_s"] / 1e6) for r in rows)
+
+def test_local_scenario_widths():
+    arr = benchsuite.SCENARIOS["local"](1000, 12, 7)
+    assert len(arr) == 1000 and max(arr) < 1 << 12
+    widths = {max(arr[b:b + 128]).bit_length() for b in range(0, 1000, 128)}
+    assert len(widths) > 1
+
+@pytest.mark.parametrize("ext", ["json", "csv"])
+def test_results_round_trip(tmp_path, ext):
+    rows = run_suite(["aligned"], [7], [200], ["uniform"], warmups=0, repeats=1, get_samples=20)
+    path = str(tmp_path / f"res.{ext}")
+    write_results(rows, path)
+    assert load_results(path) == rows
+    assert compare(load_results(path), rows) == []
+
+def test_compare_thresholds():
+    case = {"format": "crossing", "scenario": "uniform", "k": 4, "n": 10}
+    base = [dict(case, op=op, values_per_s=100.0) for op in ("compress", "get")]
+    cur = [dict(r, values_per_s=80.0) for r in base] + [dict(base[0], k=5)]
+    regs = compare(cur, base, threshold=0.1, op_thresholds={"get": 0.25})
+    assert [(r["op"], round(r["change"], 2)) for r in regs] == [("compress", -0.2)]
+
+def test_cli_exit_code_on_regression(tmp_path, capsys):
+    out = str(tmp_path / "cur.json")
+    args = ["bench-suite", "--formats", "crossing", "--ks", "6", "--sizes", "200",
+            "--scenarios", "uniform", "--repeats", "1", "--warmups", "0", "--out", out]
+    assert main(args) == 0
+    doc = json.load(open(out))
+    for row in doc["results"]:
+        row["values_per_s"] *= 100  # référence fictive 100x plus rapide
+    base = tmp_path / "base.json"
+    base.write_text(json.dumps(doc))
+    assert main(args + ["--baseline", str(base)]) == 1
+    assert "REGRESSION crossing uniform k=6" in capsys.readouterr().out
+    assert main(args + ["--baseline", str(base), "--threshold", "0.999"]) == 0
+    with pytest.raises(SystemExit):
+        main(args + ["--op-threshold", "nope=1"])
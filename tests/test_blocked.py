@@ -0,0 +1,78 @@
+import random
+import time
+
+import pytest
+
+from bitpack.blocked import BitPackingBlocked
+from bitpack.crossing import BitPackingCrossing
+from bitpack.factory import create, for_kind
+from bitpack.header import KIND_BLOCKED, PackedData
+
+
+def _locally_narrow(n, seed=3):
+    # blocs de largeurs différentes, comme une colonne de télémétrie
+    rnd = random.Random(seed)
+    arr = []
+    while len(arr) < n:
+        k = rnd.choice([0, 3, 5, 8, 20])
+        arr.extend(rnd.randrange(1 << k) for _ in range(200))
+    return arr[:n]
+
+@pytest.mark.parametrize("block_size", [1, 7, 32, 128])
+def test_blocked_roundtrip(block_size):
+    arr = _locally_narrow(1500)
+    p = BitPackingBlocked(block_size=block_size)
+    data = PackedData.from_bytes(p.compress(arr).to_bytes())
+    assert data.kind == KIND_BLOCKED and data.cap == block_size
+    assert [p.get(i, data) for i in range(len(arr))] == arr
+    assert p.get_many(list(range(len(arr)))[::-1], data, sort=True) == arr[::-1]
+    out = [0] * len(arr)
+    p.decompress(out, data)
+    assert out == arr
+    part = [0] * 400
+    p.decompress_range(111, 511, part, data)
+    assert part == arr[111:511]
+
+def test_blocked_smaller_than_whole_array_variants():
+    arr = _locally_narrow(20000)
+    blocked = create("blocked").compress(arr)
+    assert len(blocked.words) < len(create("crossing").compress(arr).words)
+    assert len(blocked.words) < len(create("overflow").compress(arr).words)
+    assert isinstance(for_kind(KIND_BLOCKED), BitPackingBlocked)
+
+def _decode_seconds(packer, arr, repeats=7):
+    data = packer.compress(arr)
+    out = [0] * len(arr)
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        packer.decompress(out, data)
+        best = min(best, time.perf_counter() - t0)
+    assert out == arr
+    return best
+
+def test_blocked_decodes_faster_than_whole_array_variants():
+    # même colonne que le test de taille ; avec NumPy, blocked n'est qu'au niveau de crossing
+    arr = _locally_narrow(20000)
+    blocked = _decode_seconds(BitPackingBlocked(engine="python"), arr)
+    assert blocked < _decode_seconds(BitPackingCrossing(engine="python"), arr)
+    assert blocked < _decode_seconds(create("overflow"), arr)
+    assert _decode_seconds(create("blocked"), arr) < _decode_seconds(create("overflow"), arr)
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_blocked_engines_agree_on_ranges(engine):
+    arr = _locally_narrow(3000)
+    arr[1000:1300] = [7] * 300  # blocs consécutifs de même k (un seul appel de noyau)
+    p = BitPackingBlocked(engine=engine)
+    data = p.compress(arr)
+    for start, stop in [(0, 3000), (1, 2999), (127, 129), (1000, 1300), (2950, 3000), (5, 5)]:
+        out = [0] * (stop - start)
+        p.decompress_range(start, stop, out, data)
+        assert out == arr[start:stop]
+
+def test_blocked_empty_and_zeroes():
+    p = BitPackingBlocked()
+    assert p.compress([]).n == 0
+    data = p.compress([0] * 300)
+    assert data.over_bits == 0
+    assert p.get(299, data) == 0
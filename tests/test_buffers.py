@@ -0,0 +1,85 @@
+import random
+from array import array
+
+import pytest
+
+from bitpack.auto import CANDIDATES
+from bitpack.cli import _read_u32_file, _write_u32_file
+from bitpack.core import WORD_TYPECODE, as_values
+from bitpack.factory import create
+
+ARR = [random.Random(24).randrange(1 << 13) for _ in range(3000)]
+RAW = array(WORD_TYPECODE, ARR).tobytes()  # hôte little-endian
+
+@pytest.mark.parametrize("kind", CANDIDATES)
+def test_compress_accepts_buffers(kind):
+    arr = sorted(ARR) if kind == "eliasfano" else ARR
+    ref = create(kind).compress(arr).to_bytes()
+    words = array(WORD_TYPECODE, arr)
+    for src in [array(WORD_TYPECODE, arr), words.tobytes(), memoryview(words)]:
+        assert create(kind).compress(src).to_bytes() == ref
+
+@pytest.mark.parametrize("kind", CANDIDATES)
+def test_decompress_into_buffers(kind):
+    arr = sorted(ARR) if kind == "eliasfano" else ARR
+    data = create(kind, transform="delta" if kind == "crossing" else "none").compress(arr)
+    out = array(WORD_TYPECODE, bytes(4 * len(arr)))
+    create("auto").decompress(out, data)
+    assert out.tolist() == arr
+    raw = bytearray(4 * 100)
+    create("auto").decompress_range(50, 150, raw, data)
+    assert array(WORD_TYPECODE, raw).tolist() == arr[50:150]
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+@pytest.mark.parametrize("kind", ["crossing", "aligned", "blocked"])
+@pytest.mark.parametrize("k", [0, 3, 8, 13, 16, 32])
+def test_direct_buffer_decode(kind, k, engine):
+    # crossing, aligned et blocked écrivent dans la vue u32 elle-même (noyaux, read_lanes)
+    arr = [random.Random(k).randrange(1 << k) for _ in range(1000)]
+    opts = {} if kind == "aligned" else {"engine": engine}
+    packer = create(kind, **opts)
+    data = packer.compress(arr)
+    out = array(WORD_TYPECODE, bytes(4 * len(arr)))
+    packer.decompress(out, data)
+    assert out.tolist() == arr
+    raw = bytearray(4 * 700)
+    packer.decompress_range(37, 737, memoryview(raw), data)
+    assert array(WORD_TYPECODE, raw).tolist() == arr[37:737]
+
+def test_numpy_in_and_out():
+    np = pytest.importorskip("numpy")
+    src = np.array(ARR, dtype=np.uint32)
+    data = create("crossing", engine="numpy").compress(src)
+    assert data.to_bytes() == create("crossing").compress(ARR).to_bytes()
+    out = np.zeros(len(ARR), dtype=np.uint32)
+    create("crossing", engine="numpy").decompress(out, data)
+    assert out.tolist() == ARR
+    assert create("aligned").compress(src[::2]).n == len(ARR[::2])  # non contigu : converti
+
+def test_bad_buffers():
+    with pytest.raises(ValueError):
+        as_values(b"abc")
+    data = create("crossing").compress(ARR)
+    with pytest.raises(ValueError):
+        create("crossing").decompress(bytes(4 * len(ARR)), data)  # lecture seule
+    with pytest.raises(ValueError):
+        create("crossing").decompress(array("H", bytes(2 * len(ARR))), data)
+
+def test_u32_file_round_trip(tmp_path):
+    path = tmp_path / "values.u32"
+    _write_u32_file(str(path), ARR)
+    assert path.read_bytes() == RAW
+    arr = _read_u32_file(str(path))
+    assert arr.typecode == WORD_TYPECODE and arr.tolist() == ARR
+
+def test_keyword_arguments():
+    data = create("crossing").compress(ARR)
+    packer = create("crossing")
+    out = [0] * len(ARR)
+    packer.decompress(out=out, data=data)
+    assert out == ARR
+    buf = array(WORD_TYPECODE, bytes(12))
+    packer.decompress_range(5, 8, buf, data=data)
+    assert buf.tolist() == ARR[5:8]
+    packer.decompress_range(start=5, stop=8, out=buf, data=data)
+    assert buf.tolist() == ARR[5:8]
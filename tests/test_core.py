@@ -1,4 +1,5 @@
-from bitpack.core import write_bits, read_bits, ceil_div
+from bitpack.core import ceil_div, read_bits, write_bits
+
 
 def test_read_write_bits_crossing():
     words = [0, 0]
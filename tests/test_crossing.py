@@ -1,5 +1,10 @@
+import random
+
+import pytest
+
 from bitpack.crossing import BitPackingCrossing
-from bitpack.header import PackedData, KIND_CROSSING
+from bitpack.header import KIND_CROSSING, PackedData
+
 
 def test_crossing_basic_k12():
     arr = [1, 2, 3, 4095, 4, 5]  # k=12 (max=4095)
@@ -23,3 +28,23 @@ def test_crossing_zeroes_k0():
     out = [0]*3
     packer.decompress(out, data)
     assert out == arr
+
+def test_crossing_numpy_engine_identical_payload():
+    pytest.importorskip("numpy")
+    rnd = random.Random(7)
+    for k in (1, 5, 12, 17, 31, 32):
+        arr = [rnd.randrange(1 << k) for _ in range(1000)] + [(1 << k) - 1]
+        ref = BitPackingCrossing(engine="python").compress(arr)
+        fast = BitPackingCrossing(engine="numpy")
+        data = fast.compress(arr)
+        assert data.to_bytes() == ref.to_bytes()
+        out = [0] * len(arr)
+        fast.decompress(out, ref)
+        assert out == arr
+
+def test_crossing_engine_fallback_without_numpy(monkeypatch):
+    from bitpack import npengine
+    monkeypatch.setattr(npengine, "HAVE_NUMPY", False)
+    assert BitPackingCrossing(engine="numpy").engine == "python"
+    with pytest.raises(ValueError):
+        BitPackingCrossing(engine="simd")
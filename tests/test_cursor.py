@@ -0,0 +1,43 @@
+import io
+import random
+
+import pytest
+
+from bitpack.auto import CANDIDATES
+from bitpack.cursor import iter_chunks, iter_values
+from bitpack.factory import create
+from bitpack.mapped import MappedPackedArray
+from bitpack.stream import compress_stream
+
+ARR = [random.Random(9).randrange(1 << random.Random(i).choice([3, 11, 27])) for i in range(10000)]
+
+@pytest.mark.parametrize("kind", CANDIDATES)
+def test_iter_values_matches_get(kind):
+    arr = sorted(ARR) if kind == "eliasfano" else ARR
+    data = create(kind).compress(arr)
+    assert list(iter_values(data)) == arr
+    assert list(iter_values(data, 4000, 9000)) == arr[4000:9000]
+    assert list(iter_values(data, 17, 17)) == []
+
+def test_iter_chunks_sizes_and_transform():
+    data = create("crossing", transform="delta").compress(ARR)
+    chunks = list(iter_chunks(data, 5, 10000, chunk_values=4096))
+    assert [len(c) for c in chunks] == [4096, 4096, 1803]
+    assert all(c.typecode == "I" for c in chunks)
+    assert [x for c in chunks for x in c] == ARR[5:]
+    with pytest.raises(ValueError):
+        next(iter_chunks(data, chunk_values=0))
+    with pytest.raises(IndexError):
+        next(iter_chunks(data, 0, 10001))
+
+def test_mapped_iteration_across_frames(tmp_path):
+    src = io.BytesIO(b"".join(x.to_bytes(4, "little") for x in ARR))
+    path = tmp_path / "multi.bp"
+    with open(path, "wb") as dst:
+        compress_stream(src, dst, "blocked", chunk_values=3000)
+    with MappedPackedArray(str(path)) as m:
+        assert len(m.frames) == 4
+        assert list(m) == ARR
+        chunks = list(m.iter_chunks(2500, 7000, chunk_values=1000))
+        assert max(len(c) for c in chunks) <= 1000
+        assert [x for c in chunks for x in c] == ARR[2500:7000]
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from bitpack.dictionary import BitPackingDict
+from bitpack.factory import create, for_kind
+from bitpack.header import KIND_DICT, PackedData
+
+
+def _enum_column(n, distinct, seed=6):
+    rnd = random.Random(seed)
+    values = [rnd.randrange(1 << 32) for _ in range(distinct)]
+    return [rnd.choice(values) for _ in range(n)]
+
+@pytest.mark.parametrize("layout", ["auto", "crossing", "aligned"])
+@pytest.mark.parametrize("distinct", [1, 2, 300, 1000])
+def test_dict_roundtrip(layout, distinct):
+    arr = _enum_column(2000, distinct)
+    p = BitPackingDict(layout=layout)
+    data = PackedData.from_bytes(p.compress(arr).to_bytes())
+    assert data.kind == KIND_DICT and data.main_bits == 32 * len(set(arr))
+    assert [p.get(i, data) for i in range(len(arr))] == arr
+    assert p.get_many([1999, 0, 7], data, sort=True) == [arr[1999], arr[0], arr[7]]
+    part = [0] * 900
+    p.decompress_range(555, 1455, part, data)
+    assert part == arr[555:1455]
+    out = [0] * len(arr)
+    p.decompress(out, data)
+    assert out == arr
+
+def test_dict_layout_choice():
+    arr = _enum_column(3000, 300)  # codes sur 9 bits
+    assert create("dict", layout="aligned").compress(arr).cap == 3
+    assert create("dict").compress(arr).cap == 0  # crossing : 9 bits * 3000 < 1000 mots alignés
+    assert create("dict").compress(_enum_column(3000, 200)).cap == 4  # 8 bits : aligned gratuit
+
+def test_dict_size_win_on_low_cardinality():
+    arr = _enum_column(10000, 300)
+    assert create("crossing").compress(arr).k == 32
+    assert len(create("dict").compress(arr).words) < len(arr) * 9 / 32 + 300 + 1
+
+def test_dict_empty_and_registry():
+    data = create("dict").compress([])
+    assert data.n == 0 and len(data.words) == 0
+    assert isinstance(for_kind(KIND_DICT), BitPackingDict)
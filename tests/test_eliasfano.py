@@ -0,0 +1,57 @@
+import bisect
+import random
+
+import pytest
+
+from bitpack.eliasfano import BitPackingEliasFano, low_width
+from bitpack.factory import create, for_kind
+from bitpack.header import KIND_ELIASFANO, PackedData
+
+
+def _postings(n, universe, seed=8):
+    rnd = random.Random(seed)
+    return sorted(rnd.randrange(universe) for _ in range(n))
+
+@pytest.mark.parametrize(
+    "n,universe", [(1, 10), (2000, 1 << 32), (2000, 2500), (3000, 50), (4000, 1 << 20)]
+)
+@pytest.mark.parametrize("rate", [1, 5, 128])
+def test_eliasfano_roundtrip(n, universe, rate):
+    arr = _postings(n, universe)
+    p = BitPackingEliasFano(sample_rate=rate)
+    data = PackedData.from_bytes(p.compress(arr).to_bytes())
+    assert data.kind == KIND_ELIASFANO and data.k == low_width(n, arr[-1])
+    assert [p.get(i, data) for i in range(n)] == arr
+    assert p.get_many([n - 1, 0], data) == [arr[-1], arr[0]]
+    out = [0] * n
+    p.decompress(out, data)
+    assert out == arr
+    part = [0] * (n // 2)
+    p.decompress_range(n // 3, n // 3 + n // 2, part, data)
+    assert part == arr[n // 3:n // 3 + n // 2]
+
+def test_next_geq_matches_bisect():
+    arr = _postings(5000, 1 << 24) + [(1 << 32) - 1] * 3
+    p = create("eliasfano")
+    data = p.compress(arr)
+    rnd = random.Random(1)
+    probes = [rnd.randrange(1 << 24) for _ in range(500)]
+    for x in [0, arr[0], arr[100], arr[-4] + 1, (1 << 32) - 1] + probes:
+        i = bisect.bisect_left(arr, x)
+        assert p.next_geq(x, data) == (i, arr[i])
+    small = p.compress([3, 3, 9])
+    assert p.next_geq(10, small) == (3, None)
+    assert p.next_geq(4, small) == (2, 9)
+    assert p.next_geq(0, p.compress([])) == (0, None)
+
+def test_eliasfano_size_near_entropy():
+    n, universe = 10000, 1 << 24
+    data = create("eliasfano").compress(_postings(n, universe))
+    # 2 + log2(u/n) bits par valeur, plus l'index de select
+    assert 32 * len(data.words) / n < 2 + 11.3 + 0.6
+    assert len(data.words) < len(create("crossing").compress(_postings(n, universe)).words) / 1.5
+
+def test_rejects_unsorted():
+    with pytest.raises(ValueError):
+        create("eliasfano").compress([1, 3, 2])
+    assert isinstance(for_kind(KIND_ELIASFANO), BitPackingEliasFano)
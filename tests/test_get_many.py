@@ -0,0 +1,28 @@
+import random
+from array import array
+
+import pytest
+
+from bitpack.factory import create
+from bitpack.scenarios import skewed
+
+
+@pytest.mark.parametrize("kind", ["crossing", "aligned", "overflow"])
+def test_get_many_matches_get(kind):
+    arr = skewed(2000, 6, 20, 0.02)
+    packer = create(kind)
+    data = packer.compress(arr)
+    rnd = random.Random(1)
+    idxs = [rnd.randrange(len(arr)) for _ in range(500)]
+    assert packer.get_many(idxs, data) == [arr[i] for i in idxs]
+    out = array("I", bytes(4 * len(idxs)))
+    assert packer.get_many(idxs, data, out=out, sort=True) is out
+    assert list(out) == [arr[i] for i in idxs]
+    with pytest.raises(IndexError):
+        packer.get_many([0, len(arr)], data)
+
+def test_get_many_overflow_k_prime_32():
+    arr = [0xFFFFFFFF, 1, 0x80000000]
+    packer = create("overflow", k_prime=32, auto_select=False)
+    data = packer.compress(arr)
+    assert packer.get_many([2, 0, 1], data) == [0x80000000, 0xFFFFFFFF, 1]
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from bitpack.core import ceil_div, new_words, write_bits
+from bitpack.kernels import pack, pack_kernel, unpack_into, unpack_kernel
+
+
+def _reference(arr, k):
+    words = new_words(ceil_div(len(arr) * k, 32))
+    for i, x in enumerate(arr):
+        write_bits(words, i * k, k, x)
+    return words
+
+@pytest.mark.parametrize("k", range(1, 33))
+def test_kernels_match_write_bits(k):
+    rnd = random.Random(k)
+    for n in (0, 1, 31, 32, 33, 97):
+        arr = [rnd.randrange(1 << k) for _ in range(n)]
+        words = pack(arr, k)
+        assert words == _reference(arr, k)
+        out = [0] * n
+        unpack_into(memoryview(words), k, 0, n, out)
+        assert out == arr
+
+@pytest.mark.parametrize("k", [13, 8, 16, 32])
+def test_unpack_into_unaligned_ranges_and_offset(k):
+    arr = [random.Random(1).randrange(1 << k) for _ in range(500)]
+    words = new_words(3)
+    words.extend(pack(arr, k))  # flux au mot 3
+    for start, count in [(0, 500), (5, 27), (31, 1), (33, 400), (64, 64), (499, 1), (200, 0)]:
+        out = [0] * count
+        unpack_into(words, k, start, count, out, word_off=3)
+        assert out == arr[start:start + count]
+        # buffer u32 : écrit directement, à partir de out_off
+        buf = new_words(count + 2)
+        unpack_into(words, k, start, count, memoryview(buf), word_off=3, out_off=2)
+        assert buf.tolist() == [0, 0] + arr[start:start + count]
+
+def test_kernels_are_cached():
+    assert unpack_kernel(7) is unpack_kernel(7)
+    assert pack_kernel(7) is pack_kernel(7)
+    with pytest.raises(ValueError):
+        unpack_kernel(33)
@@ -0,0 +1,33 @@
+import pytest
+
+from bitpack import cli
+from bitpack.factory import create
+from bitpack.mapped import MappedPackedArray
+
+ARR = [1, 2, 3, 1024, 4, 5, 2048, 7]
+
+@pytest.mark.parametrize("kind", ["crossing", "aligned", "overflow"])
+def test_mapped_get_and_decompress(tmp_path, kind):
+    path = tmp_path / f"{kind}.bp"
+    path.write_bytes(create(kind).compress(ARR).to_bytes())
+    with MappedPackedArray(str(path)) as m:
+        assert len(m) == len(ARR)
+        assert [m.get(i) for i in range(len(ARR))] == ARR
+        assert m[-1] == ARR[-1]
+        assert m.decompress() == ARR
+        with pytest.raises(IndexError):
+            m.get(len(ARR))
+
+def test_cli_get_and_decompress_use_mapped_file(tmp_path, capsys):
+    src = tmp_path / "in.bin"
+    src.write_bytes(b"".join(x.to_bytes(4, "little") for x in ARR))
+    bp = tmp_path / "in.bp"
+    out = tmp_path / "out.bin"
+    args = ["--format", "overflow"]
+    assert cli.main(["compress", "--input", str(src), *args, "--out", str(bp)]) == 0
+    assert cli.main(["get", "--file", str(bp), "--format", "overflow", "--index", "6"]) == 0
+    assert capsys.readouterr().out.strip() == "2048"
+    assert cli.main(["decompress", "--file", str(bp), *args, "--out", str(out)]) == 0
+    assert out.read_bytes() == src.read_bytes()
+    with pytest.raises(SystemExit):
+        cli.main(["get", "--file", str(bp), "--format", "crossing", "--index", "0"])
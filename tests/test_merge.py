@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from bitpack.factory import create
+from bitpack.header import PackedData
+from bitpack.merge import concat, slice
+
+rnd = random.Random(22)
+
+def _values(data):
+    out = [0] * data.n
+    create("auto").decompress(out, data)
+    return out
+
+def _segments(kind, sizes, widths, **opts):
+    arrs = [[rnd.randrange(1 << k) for _ in range(n)] for n, k in zip(sizes, widths)]
+    return arrs, [create(kind, **opts).compress(a) for a in arrs]
+
+@pytest.mark.parametrize("kind", ["crossing", "aligned"])
+@pytest.mark.parametrize("word_bits", [32, 64])
+def test_concat_same_k_matches_compress(kind, word_bits):
+    # chaque segment non vide contient 4095 : k = 12 partout
+    arrs = [[rnd.randrange(4096) for _ in range(n)] + [4095] for n in (99, 6, 63, 32)]
+    arrs.insert(2, [])
+    segs = [create(kind, word_bits=word_bits).compress(a) for a in arrs]
+    whole = [x for a in arrs for x in a]
+    merged = concat(segs)
+    ref = create(kind, word_bits=word_bits).compress(whole)
+    assert merged.k == 12 and merged.word_bits == word_bits
+    assert merged.to_bytes() == ref.to_bytes()
+
+@pytest.mark.parametrize("kind", ["crossing", "aligned"])
+def test_concat_rewidens_smaller_k(kind):
+    arrs, segs = _segments(kind, [50, 70, 31, 5], [3, 17, 1, 9])
+    whole = [x for a in arrs for x in a]
+    merged = concat(segs)
+    assert merged.k == max(s.k for s in segs)
+    assert _values(PackedData.from_bytes(merged.to_bytes())) == whole
+
+@pytest.mark.parametrize("kind", ["overflow", "blocked", "dict"])
+def test_concat_other_kinds_fall_back(kind):
+    arrs, segs = _segments(kind, [300, 200], [20, 5])
+    merged = concat(segs)
+    assert merged.kind == segs[0].kind
+    assert _values(merged) == arrs[0] + arrs[1]
+
+@pytest.mark.parametrize("kind", ["crossing", "aligned", "overflow"])
+@pytest.mark.parametrize("word_bits", [32, 64])
+def test_slice(kind, word_bits):
+    if kind == "overflow" and word_bits == 64:
+        pytest.skip("overflow uses 32-bit words")
+    arr = [rnd.randrange(1 << 13) for _ in range(1000)]
+    data = create(kind, word_bits=word_bits).compress(arr)
+    for start, stop in [(0, 1000), (0, 10), (5, 5), (3, 998), (64, 640), (999, 1000)]:
+        part = slice(data, start, stop)
+        assert part.n == stop - start and part.kind == data.kind
+        assert _values(PackedData.from_bytes(part.to_bytes())) == arr[start:stop]
+        if kind != "overflow":
+            assert part.k == data.k
+    with pytest.raises(IndexError):
+        slice(data, 10, 1001)
+
+def test_slice_and_concat_with_transform():
+    arr = list(range(0, 30000, 3))
+    data = create("crossing", transform="delta", checkpoint_interval=64).compress(arr)
+    part = slice(data, 100, 5000)
+    assert part.transform == data.transform and part.t_interval == 64
+    merged = concat([part, slice(data, 5000, len(arr))])
+    assert _values(merged) == arr[100:]
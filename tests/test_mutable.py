@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from bitpack.core import put_bits, read_bits
+from bitpack.factory import create
+from bitpack.header import PackedData
+from bitpack.mutable import PackedArray
+
+rnd = random.Random(23)
+
+def _decoded(data):
+    data = PackedData.from_bytes(data.to_bytes())
+    out = [0] * data.n
+    create("auto").decompress(out, data)
+    return out
+
+def test_put_bits_clears_slot():
+    words = [0xFFFFFFFF, 0xFFFFFFFF]
+    put_bits(words, 28, 8, 0x5A)
+    assert read_bits(words, 28, 8) == 0x5A
+    assert words == [0xAFFFFFFF, 0xFFFFFFF5]
+
+@pytest.mark.parametrize("kind,word_bits", [
+    ("crossing", 32), ("crossing", 64), ("aligned", 32), ("aligned", 64), ("overflow", 32),
+])
+def test_random_updates_match_list(kind, word_bits):
+    arr = PackedArray(kind=kind, word_bits=word_bits)
+    ref = []
+    for _ in range(2000):
+        v = rnd.randrange(1 << rnd.choice([0, 3, 5, 5, 5, 11, 32]))
+        op = rnd.random()
+        if op < 0.5 or not ref:
+            arr.append(v)
+            ref.append(v)
+        elif op < 0.6:
+            more = [rnd.randrange(1 << rnd.choice([1, 4, 12])) for _ in range(rnd.randrange(40))]
+            arr.extend(more)
+            ref.extend(more)
+        else:
+            i = rnd.randrange(len(ref))
+            arr[i] = v
+            ref[i] = v
+    assert len(arr) == len(ref)
+    assert [arr[i] for i in range(len(ref))] == ref
+    assert list(arr) == ref
+    data = arr.to_packed()
+    assert data.word_bits == word_bits
+    assert _decoded(data) == ref
+
+@pytest.mark.parametrize("kind", ["crossing", "aligned"])
+def test_rewidens_k(kind):
+    arr = PackedArray.from_values([1, 2, 3] * 20, kind)
+    assert arr.k == 2
+    arr[7] = 1000
+    arr.append(70000)
+    assert arr.k == 17
+    assert arr.to_packed().to_bytes() == create(kind).compress(arr.tolist()).to_bytes()
+
+def test_overflow_spills_then_retunes():
+    values = [rnd.randrange(16) for _ in range(1000)]
+    arr = PackedArray.from_values(values, "overflow")
+    k_prime = arr.k_prime
+    arr[10] = 1 << 30
+    assert arr.k_prime == k_prime and arr.m == 1 and arr[10] == 1 << 30
+    arr[10] = 3  # l'entrée overflow devient morte, la valeur revient en ligne
+    assert arr[10] == 3
+    arr.extend([1 << 20] * 3000)  # outliers majoritaires : k' réestimé, zone overflow vidée
+    assert arr.k_prime == 21 and arr.m == 0
+    assert _decoded(arr.to_packed()) == values[:10] + [3] + values[11:] + [1 << 20] * 3000
+
+def test_loads_existing_data_and_rejects_others():
+    values = [rnd.randrange(1 << 9) for _ in range(333)]
+    arr = PackedArray(create("overflow").compress(values))
+    arr.append(5)
+    assert arr.tolist() == values + [5]
+    with pytest.raises(ValueError):
+        PackedArray(create("blocked").compress(values))
+    with pytest.raises(ValueError):
+        PackedArray(create("crossing", transform="delta").compress(values))
+    with pytest.raises(ValueError):
+        arr.append(1 << 32)
+    with pytest.raises(IndexError):
+        arr[334] = 1
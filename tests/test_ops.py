@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from bitpack import ops
+from bitpack.auto import CANDIDATES
+from bitpack.factory import create
+from bitpack.scenarios import skewed
+
+rnd = random.Random(5)
+DATASETS = {
+    "u1": [rnd.randrange(2) for _ in range(100)],
+    "u12": [rnd.randrange(1 << 12) for _ in range(777)],
+    "u32": [rnd.randrange(1 << 32) for _ in range(65)],
+    "zeros": [0] * 40,
+    "skewed": skewed(3000, 5, 28, 0.01),
+    "enum": [rnd.choice([3, 99, 12345, 1 << 31]) for _ in range(500)],
+}
+
+def _check(data, arr):
+    assert ops.packed_sum(data) == sum(arr)
+    assert ops.packed_min(data) == min(arr) and ops.packed_max(data) == max(arr)
+    for x in [0, 1, 7, 1000, 1 << 20, (1 << 32) - 1] + arr[:3]:
+        assert ops.count_eq(data, x) == arr.count(x)
+        assert ops.count_lt(data, x) == sum(v < x for v in arr)
+        assert ops.count_gt(data, x) == sum(v > x for v in arr)
+    for lo, hi in [(0, 0), (3, 900), (1, 1 << 32), (100, 50)]:
+        expected = [i for i, v in enumerate(arr) if lo <= v <= hi]
+        assert list(ops.filter_positions(data, lo, hi)) == expected
+
+@pytest.mark.parametrize("name", sorted(DATASETS))
+@pytest.mark.parametrize("kind", CANDIDATES)
+def test_ops_match_decoded_values(name, kind):
+    arr = sorted(DATASETS[name]) if kind == "eliasfano" else DATASETS[name]
+    _check(create(kind).compress(arr), arr)
+
+@pytest.mark.parametrize("name", sorted(DATASETS))
+def test_ops_word64_and_transforms(name):
+    arr = DATASETS[name]
+    _check(create("aligned", word_bits=64).compress(arr), arr)
+    _check(create("overflow", transform="for").compress(arr), arr)
+    _check(create("crossing", transform="delta").compress(arr), arr)
+
+def test_ops_empty():
+    data = create("aligned").compress([])
+    assert ops.packed_sum(data) == 0 and ops.count_lt(data, 5) == 0
+    assert len(ops.filter_positions(data, 0, 10)) == 0
+    with pytest.raises(ValueError):
+        ops.packed_max(data)
@@ -1,5 +1,10 @@
-from bitpack.overflow import BitPackingOverflow
-from bitpack.header import KIND_OVERFLOW
+import random
+
+from bitpack.factory import for_kind
+from bitpack.header import KIND_OVERFLOW, KIND_OVERFLOW_RANK, PackedData
+from bitpack.overflow import RANK_SUPERBLOCK, BitPackingOverflow
+from bitpack.scenarios import skewed
+
 
 def test_overflow_example_from_statement():
     # 1,2,3,1024,4,5,2048  -> k'=3, m=2, p=1 attendu
@@ -27,3 +32,71 @@ def test_overflow_no_overflow_case():
     p.decompress(out, data)
     assert out == arr
 
+
+def _brute_force_params(arr):
+    best = None
+    for k_prime in range(0, max(arr).bit_length() + 1):
+        over = [x for x in arr if x.bit_length() > k_prime]
+        m = len(over)
+        p = 0 if m <= 1 else (m - 1).bit_length()
+        k_over = max(over).bit_length() if over else 0
+        cand = (k_prime, p, k_over, len(arr) * (1 + max(k_prime, p)) + m * k_over)
+        if best is None or cand[3] < best[3]:
+            best = cand
+    return best
+
+def test_histogram_params_match_exhaustive_search():
+    rnd = random.Random(5)
+    p = BitPackingOverflow()
+    for _ in range(100):
+        arr = [rnd.randrange(1 << rnd.randrange(0, 33)) for _ in range(rnd.randrange(1, 150))]
+        assert p.choose_params(arr) == _brute_force_params(arr)
+
+def test_sampled_params_are_exact_for_chosen_k_prime():
+    arr = skewed(20000, 6, 20, 0.01)
+    p = BitPackingOverflow(sample_size=1000)
+    k_prime, _, k_over, cost = p.choose_params(arr)
+    fixed = BitPackingOverflow(k_prime=k_prime, auto_select=False)
+    assert (k_over, cost) == fixed.choose_params(arr)[2:]
+    data = p.compress(arr)
+    out = [0] * len(arr)
+    p.decompress(out, data)
+    assert out == arr
+
+def test_rank_layout_roundtrip_and_size():
+    arr = skewed(20000, 3, 30, 0.2)  # beaucoup d'outliers : p > k'
+    inline = BitPackingOverflow().compress(arr)
+    p = BitPackingOverflow(layout="rank")
+    data = PackedData.from_bytes(p.compress(arr).to_bytes())
+    assert data.kind == KIND_OVERFLOW_RANK and data.p == 0
+    # zone principale : k' + 1 bits par valeur (+ 1 mot de rang par super-bloc)
+    assert data.main_bits <= len(arr) * (data.k_prime + 1 + 32 / RANK_SUPERBLOCK) + 64
+    assert len(data.words) < len(inline.words) * 0.6
+    reader = for_kind(data.kind)
+    assert [reader.get(i, data) for i in range(len(arr))] == arr
+    assert reader.get_many([19999, 3, 256], data) == [arr[19999], arr[3], arr[256]]
+    part = [0] * 5000
+    reader.decompress_range(1234, 6234, part, data)
+    assert part == arr[1234:6234]
+    out = [0] * len(arr)
+    reader.decompress(out, data)
+    assert out == arr
+
+def test_rank_layout_empty_roundtrip():
+    data = PackedData.from_bytes(BitPackingOverflow(layout="rank").compress([]).to_bytes())
+    assert data.kind == KIND_OVERFLOW_RANK and data.n == 0 and data.cap == RANK_SUPERBLOCK
+    reader = for_kind(data.kind)
+    out = []
+    reader.decompress(out, data)
+    reader.decompress_range(0, 0, out, data)
+    assert out == []
+
+def test_auto_layout_picks_cheaper_cost():
+    for arr in (skewed(3000, 6, 20, 0.001), skewed(3000, 4, 25, 0.1), [7] * 40):
+        p = BitPackingOverflow(layout="auto")
+        costs = {lay: p.choose_params(arr, lay)[3] for lay in ("inline", "rank")}
+        best = min(costs, key=costs.get)
+        data = p.compress(arr)
+        assert data.kind == (KIND_OVERFLOW_RANK if best == "rank" else KIND_OVERFLOW)
+        assert 32 * len(data.words) == -(-costs[best] // 32) * 32
+        assert [p.get(i, data) for i in range(len(arr))] == arr
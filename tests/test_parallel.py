@@ -0,0 +1,78 @@
+import pytest
+
+from bitpack.factory import create
+from bitpack.parallel import parallel_compress, parallel_decompress
+from bitpack.scenarios import skewed, uniform_u32
+
+N = 40_000
+
+@pytest.mark.parametrize("kind,arr", [
+    ("crossing", uniform_u32(N, 13)),
+    ("aligned", uniform_u32(N, 5)),
+    ("overflow", skewed(N, 6, 20, 0.01)),
+])
+def test_parallel_compress_matches_serial(kind, arr):
+    serial = create(kind).compress(arr)
+    par = parallel_compress(kind, arr, jobs=3)
+    assert par.to_bytes() == serial.to_bytes()
+
+def test_parallel_compress_falls_back_to_serial():
+    arr = [1, 2, 3, 4095]
+    for kind in ("blocked", "crossing"):
+        serial = create(kind).compress(arr)
+        assert parallel_compress(kind, arr, jobs=4).to_bytes() == serial.to_bytes()
+
+def test_parallel_compress_auto_with_transform():
+    arr = uniform_u32(N, 13)  # N >= 2 * MIN_CHUNK_VALUES
+    par = parallel_compress("auto", arr, jobs=2, transform="for")
+    assert par.to_bytes() == create("auto", transform="for").compress(arr).to_bytes()
+
+def test_parallel_compress_auto_keeps_options():
+    arr = sorted(uniform_u32(N, 24))  # auto => eliasfano
+    par = parallel_compress("auto", arr, jobs=2, sample_rate=32)
+    assert par.to_bytes() == create("auto", sample_rate=32).compress(arr).to_bytes()
+    assert par.to_bytes() != create("auto").compress(arr).to_bytes()
+
+def test_parallel_overflow_sampled_matches_serial():
+    arr = skewed(N, 6, 20, 0.01)
+    serial = create("overflow", sample_size=200).compress(arr)
+    par = parallel_compress("overflow", arr, jobs=2, sample_size=200)
+    assert par.to_bytes() == serial.to_bytes()
+
+def test_cli_compress_jobs(tmp_path):
+    from bitpack import cli
+    arr = skewed(N, 6, 20, 0.01)
+    src = tmp_path / "in.bin"
+    src.write_bytes(b"".join(x.to_bytes(4, "little") for x in arr))
+    bp = tmp_path / "in.bp"
+    assert cli.main(["compress", "--input", str(src), "--format", "overflow", "--out", str(bp),
+                     "--jobs", "2"]) == 0
+    assert bp.read_bytes() == create("overflow").compress(arr).to_bytes()
+
+@pytest.mark.parametrize("kind", ["crossing", "overflow", "blocked"])
+@pytest.mark.parametrize("threads", [False, True])
+def test_parallel_decompress(kind, threads):
+    arr = skewed(N, 6, 20, 0.01)
+    data = create(kind).compress(arr)
+    with parallel_decompress(data, jobs=3, threads=threads) as res:
+        assert len(res) == N
+        assert res.tolist() == arr
+        assert res[N - 1] == arr[-1]
+
+def test_parallel_decompress_numpy_view():
+    np = pytest.importorskip("numpy")
+    arr = uniform_u32(N, 9)
+    with parallel_decompress(create("aligned").compress(arr), jobs=2) as res:
+        view = res.numpy()
+        assert view.dtype == np.uint32 and view.tolist() == arr
+        del view
+
+def test_cli_decompress_jobs(tmp_path):
+    from bitpack import cli
+    arr = skewed(N, 6, 20, 0.01)
+    bp = tmp_path / "in.bp"
+    bp.write_bytes(create("overflow").compress(arr).to_bytes())
+    out = tmp_path / "out.bin"
+    assert cli.main(["decompress", "--file", str(bp), "--format", "overflow", "--out", str(out),
+                     "--jobs", "2"]) == 0
+    assert out.read_bytes() == b"".join(x.to_bytes(4, "little") for x in arr)
@@ -0,0 +1,33 @@
+import pytest
+
+from bitpack import cli
+from bitpack.factory import create
+from bitpack.scenarios import skewed
+
+ARR = skewed(1000, 5, 18, 0.05)
+
+@pytest.mark.parametrize("kind,opts", [
+    ("crossing", {"engine": "python"}),
+    ("crossing", {"engine": "numpy"}),
+    ("aligned", {}),
+    ("overflow", {}),
+])
+def test_decompress_range_matches_slice(kind, opts):
+    packer = create(kind, **opts)
+    data = packer.compress(ARR)
+    for start, stop in [(0, 1000), (0, 0), (3, 4), (31, 97), (500, 1000), (999, 1000)]:
+        out = [0] * (stop - start)
+        packer.decompress_range(start, stop, out, data)
+        assert out == ARR[start:stop]
+    with pytest.raises(IndexError):
+        packer.decompress_range(10, 1001, [0] * 991, data)
+
+def test_cli_slice(tmp_path):
+    src = tmp_path / "in.bin"
+    src.write_bytes(b"".join(x.to_bytes(4, "little") for x in ARR))
+    bp = tmp_path / "in.bp"
+    out = tmp_path / "part.bin"
+    cli.main(["compress", "--input", str(src), "--format", "crossing", "--out", str(bp)])
+    assert cli.main(["slice", "--file", str(bp), "--format", "crossing",
+                     "--start", "100", "--stop", "250", "--out", str(out)]) == 0
+    assert out.read_bytes() == src.read_bytes()[400:1000]
@@ -1,7 +1,12 @@
-from bitpack.crossing import BitPackingCrossing
+import mmap
+import sys
+from array import array
+
 from bitpack.aligned import BitPackingAligned
-from bitpack.overflow import BitPackingOverflow
+from bitpack.crossing import BitPackingCrossing
 from bitpack.header import PackedData
+from bitpack.overflow import BitPackingOverflow
+
 
 def roundtrip(packer, arr):
     data = packer.compress(arr)
@@ -19,3 +24,36 @@ def test_roundtrip_aligned():
 
 def test_roundtrip_overflow():
     roundtrip(BitPackingOverflow(), [1,2,3,1024,4,5,2048])
+
+def test_words_are_compact_u32_array():
+    arr = list(range(4096))  # k=12
+    data = BitPackingCrossing().compress(arr)
+    assert isinstance(data.words, array)
+    assert data.words.itemsize == 4
+    # ~ratio x taille brute (12/32), pas 36 octets par mot
+    assert sys.getsizeof(data.words) < 1.25 * (4 * len(arr) * 12 // 32)
+    # une liste passée au constructeur est convertie
+    assert isinstance(PackedData(words=[1, 2], n=1, kind=0).words, array)
+
+def test_from_bytes_is_a_view_over_the_buffer():
+    data = BitPackingCrossing().compress([1, 2, 3, 4095, 4, 5])
+    buf = bytearray(data.to_bytes())
+    view = PackedData.from_bytes(buf)
+    assert isinstance(view.words, memoryview)
+    assert list(view.words) == list(data.words)
+    buf[-4:] = b"\xff\xff\xff\xff"  # pas de copie : la modification est visible
+    assert view.words[-1] == 0xFFFFFFFF
+
+def test_write_to_matches_to_bytes(tmp_path):
+    data = BitPackingOverflow().compress([1, 2, 3, 1024, 4, 5, 2048])
+    path = tmp_path / "x.bp"
+    with open(path, "wb") as f:
+        size = data.write_to(f)
+    blob = path.read_bytes()
+    assert blob == data.to_bytes() and size == len(blob)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = PackedData.from_bytes(mm)
+        out = [0] * view.n
+        BitPackingOverflow().decompress(out, view)
+        assert out == [1, 2, 3, 1024, 4, 5, 2048]
+        view.words.release()
@@ -0,0 +1,56 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+from bitpack.mapped import MappedPackedArray
+from bitpack.scenarios import skewed
+from bitpack.stream import compress_stream, decompress_stream, iter_frames
+
+ARR = skewed(5000, 6, 20, 0.01)
+RAW = b"".join(x.to_bytes(4, "little") for x in ARR)
+
+def test_stream_roundtrip_in_frames():
+    packed = io.BytesIO()
+    n, frames = compress_stream(io.BytesIO(RAW), packed, "overflow", chunk_values=1024)
+    assert (n, frames) == (5000, 5)
+    assert [f.n for f in iter_frames(io.BytesIO(packed.getvalue()))] == [1024] * 4 + [904]
+    out = io.BytesIO()
+    assert decompress_stream(io.BytesIO(packed.getvalue()), out) == 5000
+    assert out.getvalue() == RAW
+
+def test_stream_empty_input_gives_one_empty_frame():
+    packed = io.BytesIO()
+    assert compress_stream(io.BytesIO(b""), packed) == (0, 1)
+    out = io.BytesIO()
+    assert decompress_stream(io.BytesIO(packed.getvalue()), out) == 0
+
+def test_mapped_reads_multi_frame_file(tmp_path):
+    path = tmp_path / "multi.bp"
+    with open(path, "wb") as f:
+        compress_stream(io.BytesIO(RAW), f, "blocked", chunk_values=777)
+    with MappedPackedArray(str(path)) as m:
+        assert len(m.frames) == 7 and len(m) == 5000
+        assert m.get(776) == ARR[776] and m.get(777) == ARR[777] and m[-1] == ARR[-1]
+        assert m.decompress_range(700, 2400) == ARR[700:2400]
+
+def test_cli_pipes(tmp_path):
+    cmd = [sys.executable, "-m", "bitpack.cli"]
+    root = Path(__file__).resolve().parents[1]
+    packed = subprocess.run(
+        cmd + ["compress", "--input", "-", "--format", "crossing", "--out", "-"],
+        input=RAW, capture_output=True, check=True, cwd=root,
+    ).stdout
+    raw = subprocess.run(cmd + ["decompress", "--file", "-", "--format", "crossing", "--out", "-"],
+                         input=packed, capture_output=True, check=True, cwd=root).stdout
+    assert raw == RAW
+    bad = subprocess.run(cmd + ["decompress", "--file", "-", "--format", "aligned", "--out", "-"],
+                         input=packed, capture_output=True, cwd=root)
+    assert bad.returncode != 0 and b"format mismatch" in bad.stderr
+    bp = tmp_path / "s.bp"
+    bp.write_bytes(packed)
+    raw = subprocess.run(
+        cmd + ["decompress", "--file", str(bp), "--format", "crossing", "--out", "-"],
+        capture_output=True, check=True, cwd=root,
+    ).stdout
+    assert raw == RAW
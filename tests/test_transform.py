@@ -0,0 +1,75 @@
+import io
+import random
+
+import pytest
+
+from bitpack.factory import create, for_data
+from bitpack.header import HEADER_SIZE, PackedData
+from bitpack.mapped import MappedPackedArray
+from bitpack.stream import compress_stream
+from bitpack.transform import TRANSFORM_DELTA, unzigzag, zigzag
+
+
+def _timestamps(n, seed=2):
+    rnd = random.Random(seed)
+    return [3_000_000_000 + 1000 * i + rnd.randrange(4) for i in range(n)]
+
+def _wrapping(n, seed=4):
+    # grands sauts dans les deux sens, y compris autour de 0 et 2^32 - 1
+    rnd = random.Random(seed)
+    return [rnd.choice([0, 1, (1 << 32) - 1, rnd.randrange(1 << 32)]) for _ in range(n)]
+
+def test_zigzag_small_magnitudes():
+    for s in [0, -1, 1, -2, 2, -(1 << 31), (1 << 31) - 1]:
+        z = zigzag(s & 0xFFFFFFFF)
+        assert z < (1 << 32) and unzigzag(z) == s
+    assert [zigzag(s & 0xFFFFFFFF) for s in (0, -1, 1, -2)] == [0, 1, 2, 3]
+
+@pytest.mark.parametrize("transform", ["for", "delta", "delta2"])
+@pytest.mark.parametrize("kind", ["crossing", "aligned", "overflow", "blocked"])
+@pytest.mark.parametrize("gen", [_timestamps, _wrapping])
+def test_transform_roundtrip(transform, kind, gen):
+    arr = gen(1000)
+    packer = create(kind, transform=transform, checkpoint_interval=50)
+    data = PackedData.from_bytes(packer.compress(arr).to_bytes())
+    assert data.version == 2
+    r = for_data(data)
+    assert [r.get(i, data) for i in range(len(arr))] == arr
+    assert r.get_many([999, 0, 500], data) == [arr[999], arr[0], arr[500]]
+    part = [0] * 333
+    r.decompress_range(77, 410, part, data)
+    assert part == arr[77:410]
+    out = [0] * len(arr)
+    r.decompress(out, data)
+    assert out == arr
+
+def test_monotone_column_drops_to_few_bits():
+    arr = _timestamps(4000)
+    assert create("crossing").compress(arr).k == 32
+    assert create("crossing", transform="for").compress(arr).k == 22
+    data = create("crossing", transform="delta").compress(arr)
+    assert data.k == 11 and data.transform == TRANSFORM_DELTA
+    # pas régulier : delta-of-delta ne garde que le bruit
+    assert create("crossing", transform="delta2").compress([5 + 7 * i for i in range(4000)]).k == 0
+
+def test_untransformed_header_stays_v1():
+    data = create("crossing").compress([1, 2, 3])
+    assert data.version == 1 and len(data.to_bytes()) == HEADER_SIZE + 4
+
+def test_empty_and_single():
+    for arr in ([], [42]):
+        data = create("aligned", transform="delta").compress(arr)
+        out = [0] * len(arr)
+        for_data(data).decompress(out, data)
+        assert out == arr
+
+def test_mapped_stream_of_transformed_frames(tmp_path):
+    arr = _timestamps(3000)
+    raw = b"".join(x.to_bytes(4, "little") for x in arr)
+    path = tmp_path / "ts.bp"
+    with open(path, "wb") as f:
+        compress_stream(io.BytesIO(raw), f, "crossing", chunk_values=1000, transform="delta2")
+    with MappedPackedArray(str(path)) as m:
+        assert len(m.frames) == 3 and all(fr.version == 2 for fr in m.frames)
+        assert m.get(1500) == arr[1500]
+        assert m.decompress() == arr
@@ -0,0 +1,90 @@
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from bitpack.core import new_words, read_bits, u32_view, widen_words, write_bits
+from bitpack.factory import create
+from bitpack.header import PackedData
+from bitpack.mapped import MappedPackedArray
+from bitpack.parallel import parallel_decompress
+
+
+def _data(k, n=1000, seed=3):
+    rnd = random.Random(seed)
+    return [rnd.randrange(1 << k) for _ in range(n)]
+
+def test_read_write_bits_64():
+    words = new_words(3, 64)
+    write_bits(words, 60, 20, 0xABCDE, 64)
+    write_bits(words, 128, 64, 0, 64)
+    assert words[0] >> 60 == 0xE and words[1] == 0xABCD
+    assert read_bits(words, 60, 20, 64) == 0xABCDE
+    assert read_bits(words, 61, 3, 64) == 0b111
+
+def test_widen_and_u32_view():
+    w32 = new_words(0)
+    w32.extend([1, 2, 3])
+    w64 = widen_words(w32)
+    assert w64.typecode == "Q" and list(w64) == [1 | 2 << 32, 3]
+    assert list(u32_view(w64)) == [1, 2, 3, 0]
+
+@pytest.mark.parametrize("kind", ["crossing", "aligned"])
+@pytest.mark.parametrize("k", [0, 1, 7, 12, 31, 32])
+def test_roundtrip_64(kind, k):
+    arr = _data(k)
+    p = create(kind, word_bits=64)
+    data = PackedData.from_bytes(p.compress(arr).to_bytes())
+    assert data.word_bits == 64 and data.words.format == "Q"
+    reader = create(kind)
+    assert [reader.get(i, data) for i in range(len(arr))] == arr
+    assert list(reader.get_many([999, 0, 500], data)) == [arr[999], arr[0], arr[500]]
+    out = [0] * 300
+    reader.decompress_range(333, 633, out, data)
+    assert out == arr[333:633]
+
+def test_crossing_64_is_the_32_stream_padded():
+    arr = _data(13, 101)
+    b32 = create("crossing").compress(arr).words.tobytes()
+    b64 = create("crossing", word_bits=64).compress(arr).words.tobytes()
+    assert b64 == b32 + bytes(len(b64) - len(b32)) and len(b64) % 8 == 0
+
+def test_aligned_64_packs_more_lanes():
+    data = create("aligned", word_bits=64).compress(_data(12))
+    assert data.cap == 5 and len(data.words) == 200
+    assert create("aligned").compress(_data(12)).cap == 2
+
+def test_64_rejected_elsewhere():
+    with pytest.raises(ValueError):
+        create("overflow", word_bits=64)
+    with pytest.raises(ValueError):
+        create("aligned", word_bits=64, transform="for")
+
+def test_mapped_and_parallel_64(tmp_path):
+    arr = _data(12, 40000)
+    path = tmp_path / "a.bp"
+    path.write_bytes(create("aligned", word_bits=64).compress(arr).to_bytes())
+    with MappedPackedArray(str(path)) as m:
+        assert m.get(12345) == arr[12345]
+        assert m.decompress_range(0, len(arr)) == arr
+        with parallel_decompress(m.data, 2) as res:
+            assert res.tolist() == arr
+
+def test_cli_word_bits(tmp_path):
+    arr = _data(9, 500)
+    raw = tmp_path / "in.u32"
+    raw.write_bytes(b"".join(x.to_bytes(4, "little") for x in arr))
+    packed = tmp_path / "out.bp"
+    cmd = [sys.executable, "-m", "bitpack.cli"]
+    root = Path(__file__).resolve().parents[1]
+    compress = cmd + ["compress", "--input", str(raw), "--out", str(packed), "--word-bits", "64"]
+    subprocess.run(compress + ["--format", "crossing"], check=True, cwd=root)
+    assert PackedData.from_bytes(packed.read_bytes()).word_bits == 64
+    back = tmp_path / "back.u32"
+    decompress = cmd + ["decompress", "--file", str(packed), "--out", str(back)]
+    subprocess.run(decompress, check=True, cwd=root)
+    assert back.read_bytes() == raw.read_bytes()
+    bad = subprocess.run(compress + ["--format", "blocked"], cwd=root, capture_output=True)
+    assert bad.returncode != 0
@@ -0,0 +1,69 @@
+import io
+import random
+
+import pytest
+
+from bitpack import cli
+from bitpack.factory import create
+from bitpack.header import PackedData, frame_size
+from bitpack.mapped import MappedPackedArray
+from bitpack.stream import compress_stream, iter_frames
+from bitpack.zonemap import add_zone_map, scan_range
+
+rnd = random.Random(21)
+# colonne « horodatée » : croissante par paquets, avec du bruit
+CLUSTERED = [i // 10 + rnd.randrange(50) for i in range(20000)]
+
+def _expected(arr, lo, hi):
+    return [i for i, v in enumerate(arr) if lo <= v <= hi]
+
+@pytest.mark.parametrize("kind", ["crossing", "aligned", "overflow", "blocked", "dict"])
+def test_scan_range_with_zone_map(kind):
+    data = add_zone_map(create(kind).compress(CLUSTERED), 512)
+    assert data.version == 3 and data.zone_count == 40
+    back = PackedData.from_bytes(data.to_bytes())
+    assert list(back.zone_map) == list(data.zone_map)
+    for lo, hi in [(0, 10), (700, 760), (1000, 5000), (3000, 2000), (0, 1 << 32)]:
+        assert list(scan_range(back, lo, hi)) == _expected(CLUSTERED, lo, hi)
+
+def test_zone_map_from_decode_matches_values_and_transform():
+    data = create("crossing", transform="delta").compress(CLUSTERED)
+    a = add_zone_map(data, 1000)
+    b = add_zone_map(data, 1000, CLUSTERED)
+    assert list(a.zone_map) == list(b.zone_map)
+    back = PackedData.from_bytes(a.to_bytes())
+    assert back.version == 3 and back.transform == data.transform
+    assert list(scan_range(back, 1500, 1600)) == _expected(CLUSTERED, 1500, 1600)
+    assert list(scan_range(data, 1500, 1600)) == _expected(CLUSTERED, 1500, 1600)  # sans zone map
+
+def test_frame_size_and_stream_with_zone_maps(tmp_path):
+    src = io.BytesIO(b"".join(x.to_bytes(4, "little") for x in CLUSTERED))
+    out = io.BytesIO()
+    compress_stream(src, out, "aligned", 6000, zone_block=256)
+    blob = out.getvalue()
+    first = add_zone_map(create("aligned").compress(CLUSTERED[:6000]), 256)
+    assert frame_size(blob) == len(first.to_bytes())
+    frames = list(iter_frames(io.BytesIO(blob)))
+    assert [f.zone_count for f in frames] == [24, 24, 24, 8]
+    path = tmp_path / "z.bp"
+    path.write_bytes(blob)
+    with MappedPackedArray(str(path)) as m:
+        assert list(m.scan_range(900, 950)) == _expected(CLUSTERED, 900, 950)
+        assert list(m) == CLUSTERED
+
+def test_cli_zone_map(tmp_path):
+    raw = tmp_path / "in.u32"
+    raw.write_bytes(b"".join(x.to_bytes(4, "little") for x in CLUSTERED))
+    bp = tmp_path / "out.bp"
+    assert cli.main(["compress", "--input", str(raw), "--format", "crossing", "--zone-map", "128",
+                     "--out", str(bp)]) == 0
+    with MappedPackedArray(str(bp)) as m:
+        assert m.data.zone_block == 128
+        assert list(m.scan_range(10, 20)) == _expected(CLUSTERED, 10, 20)
+
+def test_zone_map_validation():
+    data = create("aligned").compress([1, 2, 3])
+    with pytest.raises(ValueError):
+        add_zone_map(data, 0)
+    with pytest.raises(ValueError):
+        PackedData(words=data.words, n=3, kind=data.kind, zone_block=2, zone_map=[1, 2])